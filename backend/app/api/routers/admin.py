@@ -0,0 +1,257 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.event_bus import event_bus
+from app.core.identity import Principal, get_optional_user, resolve_caller, token_cache
+from app.core.jobs import runner as job_runner
+from app.core.outbox import dispatcher
+from app.core.rate_limit import rate_limiter
+from app.core.read_cache import read_cache
+from app.core.revocation import revocations
+from app.core.user_directory import user_directory
+from app.core.writer import writer
+from app.database import get_db
+from app.models import Document, StorageFinding
+from app.services.availability import availability
+from app.services.calendar_feeds import calendar_feeds
+from app.services.dockets import docket_cache
+from app.services.scrubber import scrubber
+from app.services.workload import workload
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+# ===============================================================
+# Pydantic Schemas
+# ===============================================================
+class StorageFindingResponse(BaseModel):
+    id: int
+    kind: str
+    storage_key: str
+    entity: Optional[str]
+    entity_id: Optional[int]
+    detail: Optional[str]
+    quarantined: bool
+    detected_at: Optional[str]
+    last_seen_at: Optional[str]
+    resolved_at: Optional[str]
+
+
+def require_registrar(
+    registrar_email: Optional[str], db: Session, principal: Optional[Principal] = None
+) -> Principal:
+    registrar = resolve_caller(db, principal, registrar_email, "Registrar not found")
+    if registrar.role != "REGISTRAR":
+        raise HTTPException(status_code=403, detail="Only registrars can access admin tools")
+    return registrar
+
+
+# ===============================================================
+# Storage Scrubber
+# ===============================================================
+@router.get("/storage/scrub")
+def get_scrub_status(
+    registrar_email: Optional[str] = Query(None),
+    principal: Optional[Principal] = Depends(get_optional_user),
+    include_resolved: bool = False,
+    limit: int = Query(100, le=1000),
+    db: Session = Depends(get_db)
+):
+    """
+    Registrar: Scrubber progress plus the most recent integrity findings.
+    """
+    require_registrar(registrar_email, db, principal)
+
+    query = db.query(StorageFinding)
+    if not include_resolved:
+        query = query.filter(StorageFinding.resolved_at.is_(None))
+    findings = query.order_by(StorageFinding.last_seen_at.desc()).limit(limit).all()
+
+    return {
+        **scrubber.status(),
+        "findings": [
+            StorageFindingResponse(
+                id=f.id,
+                kind=f.kind,
+                storage_key=f.storage_key,
+                entity=f.entity,
+                entity_id=f.entity_id,
+                detail=f.detail,
+                quarantined=bool(f.quarantined),
+                detected_at=f.detected_at.isoformat() if f.detected_at else None,
+                last_seen_at=f.last_seen_at.isoformat() if f.last_seen_at else None,
+                resolved_at=f.resolved_at.isoformat() if f.resolved_at else None,
+            )
+            for f in findings
+        ],
+    }
+
+
+@router.post("/storage/scrub")
+def trigger_scrub(
+    registrar_email: Optional[str] = Query(None),
+    principal: Optional[Principal] = Depends(get_optional_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Registrar: Start a scrub pass now instead of waiting for the next interval.
+    """
+    require_registrar(registrar_email, db, principal)
+    job_id = scrubber.trigger()
+    return {"message": "Storage scrub pass scheduled", "job_id": job_id, **scrubber.status()}
+
+
+# ===============================================================
+# Compression Savings
+# ===============================================================
+@router.get("/storage/compression")
+def get_compression_savings(
+    registrar_email: Optional[str] = Query(None),
+    principal: Optional[Principal] = Depends(get_optional_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Registrar: Raw vs stored bytes for documents, grouped by codec.
+    """
+    require_registrar(registrar_email, db, principal)
+
+    rows = (
+        db.query(
+            Document.compression,
+            func.count(Document.id),
+            func.coalesce(func.sum(Document.raw_size), 0),
+            func.coalesce(func.sum(Document.stored_size), 0),
+        )
+        .filter(Document.raw_size.isnot(None))
+        .group_by(Document.compression)
+        .all()
+    )
+
+    by_codec = [
+        {
+            "compression": codec or "none",
+            "documents": count,
+            "raw_bytes": raw,
+            "stored_bytes": stored,
+            "saved_bytes": raw - stored,
+        }
+        for codec, count, raw, stored in rows
+    ]
+    raw_total = sum(r["raw_bytes"] for r in by_codec)
+    stored_total = sum(r["stored_bytes"] for r in by_codec)
+    return {
+        "raw_bytes": raw_total,
+        "stored_bytes": stored_total,
+        "saved_bytes": raw_total - stored_total,
+        "ratio": round(stored_total / raw_total, 4) if raw_total else None,
+        "by_compression": by_codec,
+    }
+
+
+# ===============================================================
+# In-process Caches
+# ===============================================================
+@router.get("/caches")
+def get_cache_stats(
+    registrar_email: Optional[str] = Query(None),
+    principal: Optional[Principal] = Depends(get_optional_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Registrar: Size and hit rate of this process's caches.
+    """
+    require_registrar(registrar_email, db, principal)
+    return {
+        "token_claims": token_cache.stats(),
+        "user_directory": user_directory.stats(),
+        "revocations": revocations.stats(),
+        "read_cache": read_cache.stats(),
+        "hearing_availability": availability.stats(),
+        "calendar_feeds": calendar_feeds.stats(),
+        "dockets": docket_cache.stats(),
+        "workload": workload.stats(),
+    }
+
+
+# ===============================================================
+# Rate Limiting
+# ===============================================================
+@router.get("/rate-limits")
+def get_rate_limit_stats(
+    registrar_email: Optional[str] = Query(None),
+    principal: Optional[Principal] = Depends(get_optional_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Registrar: Allowed vs rejected requests per rate limit policy.
+    """
+    require_registrar(registrar_email, db, principal)
+    return rate_limiter.stats()
+
+
+# ===============================================================
+# Push Notifications
+# ===============================================================
+@router.get("/notifications")
+def get_notification_stats(
+    registrar_email: Optional[str] = Query(None),
+    principal: Optional[Principal] = Depends(get_optional_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Registrar: Open push connections and delivery backlog of this worker.
+    """
+    require_registrar(registrar_email, db, principal)
+    return event_bus.stats()
+
+
+# ===============================================================
+# Outbox
+# ===============================================================
+@router.get("/outbox")
+def get_outbox_stats(
+    registrar_email: Optional[str] = Query(None),
+    principal: Optional[Principal] = Depends(get_optional_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Registrar: Domain events waiting for delivery, failures and subscribers.
+    """
+    require_registrar(registrar_email, db, principal)
+    return dispatcher.stats()
+
+
+# ===============================================================
+# Background Jobs
+# ===============================================================
+@router.get("/jobs")
+def get_job_stats(
+    registrar_email: Optional[str] = Query(None),
+    principal: Optional[Principal] = Depends(get_optional_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Registrar: Job queue depth by status and this worker's job pool.
+    """
+    require_registrar(registrar_email, db, principal)
+    return job_runner.stats()
+
+
+# ===============================================================
+# Write Queue
+# ===============================================================
+@router.get("/writer")
+def get_writer_stats(
+    registrar_email: Optional[str] = Query(None),
+    principal: Optional[Principal] = Depends(get_optional_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Registrar: Group-commit batches, queue depth and failed writes.
+    """
+    require_registrar(registrar_email, db, principal)
+    return writer.stats()
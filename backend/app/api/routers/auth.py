@@ -1,12 +1,23 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, validator, Field
 import re
 
 from app.database import get_db
 from app import models
-from app.core.security import verify_password, create_access_token, hash_password
+from app.core.hashing import password_hasher
+from app.core.identity import Principal, get_current_user, get_optional_user
+from app.core.revocation import revocations
+from app.core.security import ACCESS_TOKEN_EXPIRE_MINUTES, create_access_token
+from app.core.tokens import issue_refresh_token, revoke_refresh_token, rotate_refresh_token
+from app.core.writer import writer
 
 # ===============================================================
 # 🔐 Authentication Router
@@ -60,52 +71,131 @@ class UserRegistration(BaseModel):
             raise ValueError(f'Role must be one of: {", ".join(allowed_roles)}')
         return v.upper()
 
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+def _token_response(user: models.User, refresh_token: str) -> dict:
+    """Short-lived access token plus the single-use refresh token that renews it."""
+    access_token = create_access_token(
+        subject=user.email,
+        roles=[user.role],
+        user_id=user.id,
+    )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        "refresh_token": refresh_token,
+        "user": {
+            "id": user.id,
+            "email": user.email,
+            "role": user.role,
+        },
+    }
+
 # ===============================================================
 # 🔑 Login Endpoint
 # ===============================================================
 @router.post("/token")
-def login(
+async def login(
     form: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
 ):
     """
-    Authenticate user and return JWT token + user info.
+    Authenticate user and return JWT token + refresh token + user info.
     - username = email (as per OAuth2PasswordRequestForm standard)
-    - password is validated against the stored bcrypt hash
+    - password is verified in the hashing process pool
+    - legacy SHA256 hashes are upgraded on successful login
     """
 
     # Find user by email (form.username)
-    user = db.query(models.User).filter(models.User.email == form.username).first()
+    user = await run_in_threadpool(
+        lambda: db.query(models.User).filter(models.User.email == form.username).first()
+    )
+
+    valid, rehash = (False, False)
+    if user:
+        valid, rehash = await password_hasher.verify(form.password, user.password_hash)
 
-    if not user or not verify_password(form.password, user.password_hash):
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
 
-    # Create JWT access token
-    access_token = create_access_token(
-        subject=user.email,
-        roles=[user.role],
-    )
+    if not user.is_active:
+        raise HTTPException(status_code=403, detail="Account is disabled")
 
-    # Return token and user details
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "user": {
-            "id": user.id,
-            "email": user.email,
-            "role": user.role,
-        },
-    }
+    # Transparently upgrade legacy or outdated hashes
+    new_hash = await password_hasher.hash(form.password) if rehash else None
+
+    def start_session(wdb: Session):
+        if new_hash:
+            wdb.get(models.User, user.id).password_hash = new_hash
+        return issue_refresh_token(wdb, user.id)
+
+    refresh_token = await writer.run(start_session, actor=user)
+    return _token_response(user, refresh_token)
+
+
+# ===============================================================
+# 🔁 Refresh & Logout
+# ===============================================================
+@router.post("/refresh")
+def refresh_tokens(data: RefreshRequest):
+    """
+    Exchange a refresh token for a new access token and a new refresh token.
+    Each refresh token works once; replaying one revokes the whole session.
+    """
+    user, refresh_token = writer.call(lambda wdb: rotate_refresh_token(wdb, data.refresh_token))
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token reuse detected, please log in again",
+        )
+    return _token_response(user, refresh_token)
+
+
+@router.post("/logout")
+def logout(
+    data: RefreshRequest,
+    principal: Optional[Principal] = Depends(get_optional_user),
+):
+    """
+    End the session: revoke its refresh tokens and, when sent, the bearer token.
+    """
+    def end_session(wdb: Session):
+        if principal is not None and principal.token_id:
+            revocations.revoke_token(
+                wdb,
+                principal.token_id,
+                expires_at=datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+                reason="logout",
+            )
+        revoke_refresh_token(wdb, data.refresh_token)
+
+    writer.call(end_session, actor=principal)
+    return {"message": "Logged out"}
+
+
+# ===============================================================
+# 🪪 Current User
+# ===============================================================
+@router.get("/me")
+async def read_current_user(principal: Principal = Depends(get_current_user)):
+    """
+    Identity behind the bearer token, served from the verified-claims cache.
+    """
+    return {"id": principal.id, "email": principal.email, "role": principal.role}
 
 
 # ===============================================================
 # 🧩 Registration Endpoint
 # ===============================================================
 @router.post("/register")
-def register_user(
+async def register_user(
     user_data: UserRegistration,
     db: Session = Depends(get_db)
 ):
@@ -117,36 +207,42 @@ def register_user(
     - Role: CIVILIAN, REGISTRAR, JUDGE, or PROSECUTOR
     """
 
-    # Check if username already exists
-    existing_username = db.query(models.User).filter(
-        models.User.username == user_data.username
-    ).first()
-    if existing_username:
-        raise HTTPException(status_code=400, detail="Username already taken")
-
-    # Check if email already exists
-    existing_email = db.query(models.User).filter(
-        models.User.email == user_data.email
-    ).first()
-    if existing_email:
-        raise HTTPException(status_code=400, detail="Email already registered")
-
-    # Securely hash password
-    hashed_password = hash_password(user_data.password)
-
-    # Create and save new user
-    new_user = models.User(
-        username=user_data.username,
-        email=user_data.email,
-        password_hash=hashed_password,
-        role=user_data.role
+    # Reject taken usernames/emails before paying for a hash
+    taken = await run_in_threadpool(
+        lambda: db.query(models.User.username, models.User.email).filter(
+            or_(models.User.username == user_data.username, models.User.email == user_data.email)
+        ).first()
     )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    if taken:
+        if taken.username == user_data.username:
+            raise HTTPException(status_code=400, detail="Username already taken")
+        raise HTTPException(status_code=400, detail="Email already registered")
 
-    return {
-        "message": "✅ User registered successfully",
-        "email": new_user.email,
-        "role": new_user.role
-    }
+    # Securely hash password (off the event loop and the threadpool)
+    hashed_password = await password_hasher.hash(user_data.password)
+
+    # Create and save new user; the unique indexes on username and email
+    # still reject a duplicate registered since the check above
+    def save(wdb: Session):
+        new_user = models.User(
+            username=user_data.username,
+            email=user_data.email,
+            password_hash=hashed_password,
+            role=user_data.role
+        )
+        wdb.add(new_user)
+        try:
+            wdb.flush()
+        except IntegrityError as exc:
+            if "users.username" in str(exc.orig):
+                raise HTTPException(status_code=400, detail="Username already taken")
+            if "users.email" in str(exc.orig):
+                raise HTTPException(status_code=400, detail="Email already registered")
+            raise
+        return {
+            "message": "✅ User registered successfully",
+            "email": new_user.email,
+            "role": new_user.role
+        }
+
+    return await writer.run(save)
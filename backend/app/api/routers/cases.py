@@ -1,14 +1,21 @@
-import os
-import shutil
 from datetime import datetime
 from typing import List, Optional
 
 from fastapi import (
-    APIRouter, Depends, HTTPException, UploadFile, File, Form, status
+    APIRouter, Depends, HTTPException, Query, UploadFile, File, Form, status
 )
-from sqlalchemy.orm import Session
-from app.database import SessionLocal
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
+from app.database import SessionLocal, foreign_key_violation
 from app.models import User, Case, CaseNote, Evidence
+from app.core.identity import Principal, get_optional_user, resolve_caller
+from app.core.user_directory import user_directory
+from app.core.read_cache import CASE_DETAIL, CASE_STATUS, read_cache, user_tags
+from app.core.storage import get_storage, iter_upload, new_key, safe_filename
+from app.core.writer import writer
+from app.services.workload import ASSIGNABLE_ROLES, CLOSED_CASE_STATUSES, workload
 from pydantic import BaseModel
 
 # ===============================================================
@@ -83,10 +90,19 @@ class AdminCaseUpdate(BaseModel):
     assigned_to_id: Optional[int] = None
 
 
+class AutoAssignRequest(BaseModel):
+    """Bulk assignment of open, unassigned cases to the least-loaded users of a role"""
+    role: str = "JUDGE"
+    case_ids: Optional[List[int]] = None  # default: the oldest unassigned open cases
+    limit: int = 500
+    dry_run: bool = False
+    registrar_email: Optional[str] = None
+
+
 class AdminFeedbackCreate(BaseModel):
     """Admin feedback schema"""
     case_id: int
-    author_email: str
+    author_email: Optional[str] = None
     note: str
 
 
@@ -118,29 +134,19 @@ class CaseNoteResponse(BaseModel):
 # ===============================================================
 # ⚖️ CASE MANAGEMENT ROUTES
 # ===============================================================
-@router.post("/", response_model=CaseResponse)
-def create_case(
-    case_data: CaseBase,
-    user_email: str,
-    db: Session = Depends(get_db)
-):
-    """Civilian creates a new case (JSON endpoint)."""
-    user = db.query(User).filter(User.email == user_email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
+def _insert_case(db: Session, user: Principal, title: str, description: Optional[str], category: str, notes: Optional[str]):
+    """Write unit shared by both filing endpoints."""
     new_case = Case(
-        title=case_data.title,
-        description=case_data.description,
-        category=case_data.category or "General",
-        notes=case_data.notes,
+        title=title,
+        description=description,
+        category=category,
+        notes=notes,
         status="PENDING",
         created_by_id=user.id
     )
 
     db.add(new_case)
-    db.commit()
-    db.refresh(new_case)
+    db.flush()
 
     return {
         "id": new_case.id,
@@ -155,44 +161,76 @@ def create_case(
     }
 
 
+def _case_with_parties(db: Session, case_id: int) -> Optional[Case]:
+    """The case with its filer and assignee, in one SELECT (the response names both)."""
+    return (
+        db.query(Case)
+        .options(joinedload(Case.created_by), joinedload(Case.assigned_to))
+        .filter(Case.id == case_id)
+        .first()
+    )
+
+
+def _reassign(db: Session, case: Case, user_id: int):
+    case.assigned_to_id = user_id
+    # The loaded assignee is the previous one; reload it lazily after the write
+    db.expire(case, ["assigned_to"])
+
+
+def _flush_or_404(db: Session, detail: str = "Case not found"):
+    """Flush a new row; SQLite's foreign keys stand in for checking its case exists first."""
+    try:
+        db.flush()
+    except IntegrityError as exc:
+        if foreign_key_violation(exc):
+            raise HTTPException(status_code=404, detail=detail)
+        raise
+
+
+def _case_response(case: Case) -> dict:
+    return {
+        "id": case.id,
+        "title": case.title,
+        "description": case.description,
+        "category": case.category,
+        "notes": case.notes,
+        "status": case.status,
+        "created_by": case.created_by.email if case.created_by else None,
+        "assigned_to": case.assigned_to.email if case.assigned_to else None,
+        "created_at": case.created_at.isoformat() if case.created_at else None,
+    }
+
+
+@router.post("/", response_model=CaseResponse)
+async def create_case(
+    case_data: CaseBase,
+    user_email: Optional[str] = None,
+    principal: Optional[Principal] = Depends(get_optional_user),
+    db: Session = Depends(get_db)
+):
+    """Civilian creates a new case (JSON endpoint)."""
+    user = await run_in_threadpool(resolve_caller, db, principal, user_email)
+    return await writer.run(
+        lambda wdb: _insert_case(
+            wdb, user, case_data.title, case_data.description, case_data.category or "General", case_data.notes
+        ),
+        actor=user,
+    )
+
+
 @router.post("/file", response_model=CaseResponse)
-def file_new_case(
+async def file_new_case(
     title: str = Form(...),
     description: str = Form(...),
-    user_email: str = Form(...),
+    user_email: Optional[str] = Form(None),
+    principal: Optional[Principal] = Depends(get_optional_user),
     category: str = Form("General"),
     notes: str = Form(None),
     db: Session = Depends(get_db)
 ):
     """Civilian files a new case (Form endpoint for backward compatibility)."""
-    user = db.query(User).filter(User.email == user_email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    new_case = Case(
-        title=title,
-        description=description,
-        category=category,
-        notes=notes,
-        status="PENDING",
-        created_by_id=user.id
-    )
-
-    db.add(new_case)
-    db.commit()
-    db.refresh(new_case)
-
-    return {
-        "id": new_case.id,
-        "title": new_case.title,
-        "description": new_case.description,
-        "category": new_case.category,
-        "notes": new_case.notes,
-        "status": new_case.status,
-        "created_by": user.email,
-        "assigned_to": None,
-        "created_at": new_case.created_at.isoformat() if new_case.created_at else None,
-    }
+    user = await run_in_threadpool(resolve_caller, db, principal, user_email)
+    return await writer.run(lambda wdb: _insert_case(wdb, user, title, description, category, notes), actor=user)
 
 
 @router.get("/", response_model=List[CaseResponse])
@@ -218,7 +256,7 @@ def get_all_cases(db: Session = Depends(get_db)):
 @router.get("/mine/{email}", response_model=List[CaseResponse])
 def get_user_cases(email: str, db: Session = Depends(get_db)):
     """Get all cases for a specific user (created or assigned)."""
-    user = db.query(User).filter(User.email == email).first()
+    user = user_directory.lookup(db, email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -243,46 +281,40 @@ def get_user_cases(email: str, db: Session = Depends(get_db)):
 
 
 @router.put("/{case_id}", response_model=CaseResponse)
-def update_case(case_id: int, data: CaseUpdate, db: Session = Depends(get_db)):
+def update_case(case_id: int, data: CaseUpdate):
     """Registrar/Judge/Prosecutor updates case status or assignment."""
-    case = db.query(Case).filter(Case.id == case_id).first()
+    return writer.call(lambda wdb: _apply_case_update(wdb, case_id, data))
+
+
+def _apply_case_update(db: Session, case_id: int, data: CaseUpdate):
+    case = _case_with_parties(db, case_id)
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
 
     if data.status:
         case.status = data.status
     if data.assigned_to_id:
-        case.assigned_to_id = data.assigned_to_id
+        _reassign(db, case, data.assigned_to_id)
 
-    db.commit()
-    db.refresh(case)
-
-    return {
-        "id": case.id,
-        "title": case.title,
-        "description": case.description,
-        "category": case.category,
-        "notes": case.notes,
-        "status": case.status,
-        "created_by": case.created_by.email if case.created_by else None,
-        "assigned_to": case.assigned_to.email if case.assigned_to else None,
-        "created_at": case.created_at.isoformat() if case.created_at else None,
-    }
+    db.flush()
+    return _case_response(case)
 
 
 @router.put("/{case_id}/civilian", response_model=CaseResponse)
 def update_case_by_civilian(
     case_id: int,
     data: CaseCivilianUpdate,
-    user_email: str,
+    user_email: Optional[str] = None,
+    principal: Optional[Principal] = Depends(get_optional_user),
     db: Session = Depends(get_db)
 ):
     """Civilian updates their own case (only before review)."""
-    user = db.query(User).filter(User.email == user_email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    user = resolve_caller(db, principal, user_email)
+    return writer.call(lambda wdb: _apply_civilian_update(wdb, user, case_id, data), actor=user)
 
-    case = db.query(Case).filter(Case.id == case_id).first()
+
+def _apply_civilian_update(db: Session, user: Principal, case_id: int, data: CaseCivilianUpdate):
+    case = _case_with_parties(db, case_id)
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
 
@@ -303,33 +335,24 @@ def update_case_by_civilian(
     if data.notes:
         case.notes = data.notes
 
-    db.commit()
-    db.refresh(case)
-
-    return {
-        "id": case.id,
-        "title": case.title,
-        "description": case.description,
-        "category": case.category,
-        "notes": case.notes,
-        "status": case.status,
-        "created_by": case.created_by.email if case.created_by else None,
-        "assigned_to": case.assigned_to.email if case.assigned_to else None,
-        "created_at": case.created_at.isoformat() if case.created_at else None,
-    }
+    db.flush()
+    return _case_response(case)
 
 
 @router.delete("/{case_id}")
 def delete_case(
     case_id: int,
-    user_email: str,
+    user_email: Optional[str] = None,
+    principal: Optional[Principal] = Depends(get_optional_user),
     db: Session = Depends(get_db)
 ):
     """Delete a case (only by creator, and only before review)."""
-    user = db.query(User).filter(User.email == user_email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    user = resolve_caller(db, principal, user_email)
+    writer.call(lambda wdb: _remove_case(wdb, user, case_id), actor=user)
+    return {"message": "Case deleted successfully", "case_id": case_id}
 
+
+def _remove_case(db: Session, user: Principal, case_id: int):
     case = db.query(Case).filter(Case.id == case_id).first()
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -343,9 +366,7 @@ def delete_case(
         raise HTTPException(status_code=400, detail="Cannot delete case after review has started")
 
     db.delete(case)
-    db.commit()
-
-    return {"message": "Case deleted successfully", "case_id": case_id}
+    db.flush()
 
 
 @router.get("/{case_id}/status", response_model=CaseStatusResponse)
@@ -354,6 +375,10 @@ def get_case_status(
     db: Session = Depends(get_db)
 ):
     """Get case status with admin feedback."""
+    return read_cache.get_or_load(CASE_STATUS, case_id, lambda: _load_case_status(db, case_id))
+
+
+def _load_case_status(db: Session, case_id: int):
     case = db.query(Case).filter(Case.id == case_id).first()
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -368,37 +393,39 @@ def get_case_status(
         for note in case.case_notes
     ]
 
-    return {
+    response = {
         "id": case.id,
         "title": case.title,
         "status": case.status,
         "feedback": feedback,
         "created_at": case.created_at.isoformat() if case.created_at else None,
     }
+    return response, user_tags(note.author_id for note in case.case_notes)
 
 
 # ===============================================================
 # 🗒️ CASE NOTES (COMMENTS)
 # ===============================================================
 @router.post("/notes", response_model=CaseNoteResponse)
-def add_case_note(note_data: CaseNoteCreate, db: Session = Depends(get_db)):
+async def add_case_note(note_data: CaseNoteCreate):
     """Add a note/comment to a case (Judge or Prosecutor)."""
-    case = db.query(Case).filter(Case.id == note_data.case_id).first()
-    author = db.query(User).filter(User.id == note_data.author_id).first()
+    return await writer.run(lambda db: _insert_note(db, note_data))
+
 
-    if not case or not author:
+def _insert_note(db: Session, note_data: CaseNoteCreate):
+    author = db.get(User, note_data.author_id)
+    if not author:
         raise HTTPException(status_code=404, detail="Case or author not found")
 
     note = CaseNote(
-        case_id=case.id,
+        case_id=note_data.case_id,
         author_id=author.id,
         note=note_data.note,
         created_at=datetime.utcnow()
     )
 
     db.add(note)
-    db.commit()
-    db.refresh(note)
+    _flush_or_404(db, "Case or author not found")
 
     return {
         "id": note.id,
@@ -426,47 +453,48 @@ def get_case_notes(case_id: int, db: Session = Depends(get_db)):
 # ===============================================================
 # 📂 EVIDENCE UPLOAD & RETRIEVAL
 # ===============================================================
-EVIDENCE_DIR = "uploads/evidence"
-os.makedirs(EVIDENCE_DIR, exist_ok=True)
+EVIDENCE_NAMESPACE = "evidence"
 
 
 @router.post("/{case_id}/upload-evidence")
 def upload_evidence(
     case_id: int,
-    uploader_email: str = Form(...),
+    uploader_email: Optional[str] = Form(None),
+    principal: Optional[Principal] = Depends(get_optional_user),
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
     """Upload evidence file for a case (Civilian or Prosecutor)."""
-    case = db.query(Case).filter(Case.id == case_id).first()
-    if not case:
-        raise HTTPException(status_code=404, detail="Case not found")
+    user = resolve_caller(db, principal, uploader_email, "Uploader not found")
 
-    user = db.query(User).filter(User.email == uploader_email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="Uploader not found")
+    # Stream file to storage under a unique, traversal-safe key
+    safe_name = safe_filename(file.filename)
+    stored = get_storage().save(new_key(EVIDENCE_NAMESPACE, safe_name), iter_upload(file.file))
 
-    # Build safe file path
-    safe_name = os.path.basename(file.filename)
-    file_path = os.path.join(EVIDENCE_DIR, f"{datetime.utcnow().timestamp()}_{safe_name}")
+    # Create DB record
+    try:
+        return writer.call(
+            lambda wdb: _insert_evidence(wdb, user, case_id, safe_name, file.content_type, stored), actor=user
+        )
+    except HTTPException:
+        get_storage().delete(stored.key)  # no row points at it
+        raise
 
-    # Save file to disk
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
 
-    # Create DB record
+def _insert_evidence(db: Session, user: Principal, case_id: int, safe_name: str, filetype: Optional[str], stored):
     new_evidence = Evidence(
-        case_id=case.id,
+        case_id=case_id,
         uploader_id=user.id,                # ✅ matches model
         filename=safe_name,
-        filetype=file.content_type,         # ✅ store MIME type
-        file_path=file_path,                # ✅ consistent field name
+        filetype=filetype,                  # ✅ store MIME type
+        file_path=stored.key,               # ✅ storage key
+        sha256=stored.sha256,
+        stored_size=stored.size,
         uploaded_at=datetime.utcnow()
     )
 
     db.add(new_evidence)
-    db.commit()
-    db.refresh(new_evidence)
+    _flush_or_404(db)
 
     return {
         "message": "Evidence uploaded successfully",
@@ -525,6 +553,10 @@ def admin_get_case_details(
     db: Session = Depends(get_db)
 ):
     """Admin: Get complete case details including evidence and notes."""
+    return read_cache.get_or_load(CASE_DETAIL, case_id, lambda: _load_case_details(db, case_id))
+
+
+def _load_case_details(db: Session, case_id: int):
     case = db.query(Case).filter(Case.id == case_id).first()
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -555,7 +587,7 @@ def admin_get_case_details(
         for n in case.case_notes
     ]
     
-    return {
+    response = {
         "id": case.id,
         "title": case.title,
         "description": case.description,
@@ -576,102 +608,159 @@ def admin_get_case_details(
         "evidences": evidences,
         "case_notes": case_notes,
     }
+    # Emails and roles of these users are embedded in the response
+    user_ids = [case.created_by_id, case.assigned_to_id]
+    user_ids += [n.author_id for n in case.case_notes]
+    user_ids += [e.uploader_id for e in case.evidences]
+    return response, user_tags(user_ids)
 
 
 @router.put("/admin/{case_id}", response_model=CaseResponse)
 def admin_update_case(
     case_id: int,
     update_data: AdminCaseUpdate,
-    admin_email: str,
+    admin_email: Optional[str] = None,
+    principal: Optional[Principal] = Depends(get_optional_user),
     db: Session = Depends(get_db)
 ):
     """Admin: Update case status and assignment."""
-    admin = db.query(User).filter(User.email == admin_email).first()
-    if not admin:
-        raise HTTPException(status_code=404, detail="Admin user not found")
+    admin = resolve_caller(db, principal, admin_email, "Admin user not found")
     
     # Check if user has admin role
     if admin.role not in ["PROSECUTOR", "JUDGE", "REGISTRAR"]:
         raise HTTPException(status_code=403, detail="Not authorized - admin role required")
     
-    case = db.query(Case).filter(Case.id == case_id).first()
+    return writer.call(lambda wdb: _apply_admin_update(wdb, case_id, update_data), actor=admin)
+
+
+def _apply_admin_update(db: Session, case_id: int, update_data: AdminCaseUpdate):
+    case = _case_with_parties(db, case_id)
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
     
-    # Track if status is being changed to REVIEWED
-    old_status = case.status
-    status_changed_to_reviewed = False
-    
-    # Update fields
+    # Update fields (moving to REVIEWED records a CaseStatusChanged event;
+    # app/services/case_workflow.py schedules the hearing from it after
+    # this commit, so the request itself is one transaction)
     if update_data.status:
         case.status = update_data.status
-        if update_data.status.upper() == "REVIEWED" and old_status.upper() != "REVIEWED":
-            status_changed_to_reviewed = True
     
     if update_data.assigned_to_id:
-        case.assigned_to_id = update_data.assigned_to_id
-    
-    db.commit()
-    db.refresh(case)
-    
-    # Auto-create hearing if status changed to REVIEWED
-    if status_changed_to_reviewed:
-        from app.models import Hearing
-        from datetime import timedelta
-        
-        # Check if hearing already exists for this case
-        existing_hearing = db.query(Hearing).filter(Hearing.case_id == case.id).first()
-        
-        if not existing_hearing:
-            # Schedule hearing 7 days from now
-            scheduled_date = datetime.utcnow() + timedelta(days=7)
-            
-            # Create hearing with registrar who updated the case
-            new_hearing = Hearing(
-                case_id=case.id,
-                registrar_id=admin.id,  # The admin who changed status
-                judge_id=None,  # To be assigned later
-                scheduled_date=scheduled_date,
-                location="Main Court Room",
-                notes=f"Hearing automatically scheduled after case review by {admin.email}",
-                status="Scheduled"
-            )
-            
-            db.add(new_hearing)
-            db.commit()
-            db.refresh(new_hearing)
+        _reassign(db, case, update_data.assigned_to_id)
     
+    db.flush()
+    return _case_response(case)
+
+
+# ===============================================================
+# 🧮 WORKLOAD-BALANCED ASSIGNMENT
+# ===============================================================
+def _assignable_role(role: str) -> str:
+    role = (role or "").upper()
+    if role not in ASSIGNABLE_ROLES:
+        raise HTTPException(status_code=400, detail=f"role must be one of {', '.join(ASSIGNABLE_ROLES)}")
+    return role
+
+
+@router.get("/{case_id}/suggest-assignee")
+def suggest_assignee(
+    case_id: int,
+    role: str = "JUDGE",
+    limit: int = Query(3, ge=1, le=20),
+    admin_email: Optional[str] = None,
+    principal: Optional[Principal] = Depends(get_optional_user),
+    db: Session = Depends(get_db)
+):
+    """Admin: The least-loaded judges or prosecutors for a case, lightest first."""
+    admin = resolve_caller(db, principal, admin_email, "Admin user not found")
+    if admin.role not in ["PROSECUTOR", "JUDGE", "REGISTRAR"]:
+        raise HTTPException(status_code=403, detail="Not authorized - admin role required")
+    role = _assignable_role(role)
+
+    case = db.query(Case.id, Case.assigned_to_id).filter(Case.id == case_id).first()
+    if not case:
+        raise HTTPException(status_code=404, detail="Case not found")
+
+    exclude = [case.assigned_to_id] if case.assigned_to_id is not None else []
     return {
-        "id": case.id,
-        "title": case.title,
-        "description": case.description,
-        "category": case.category,
-        "notes": case.notes,
-        "status": case.status,
-        "created_by": case.created_by.email if case.created_by else None,
-        "assigned_to": case.assigned_to.email if case.assigned_to else None,
-        "created_at": case.created_at.isoformat() if case.created_at else None,
+        "case_id": case.id,
+        "role": role,
+        "assigned_to_id": case.assigned_to_id,
+        "assigned_to_load": workload.load_of(case.assigned_to_id) if exclude else None,
+        "suggestions": [s._asdict() for s in workload.least_loaded(role, limit, exclude)],
+    }
+
+
+@router.post("/admin/auto-assign")
+def admin_auto_assign(
+    data: AutoAssignRequest,
+    principal: Optional[Principal] = Depends(get_optional_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Registrar: Assign open, unassigned cases (oldest first) to the users of
+    ``role`` with the lightest workload, one at a time so each assignment
+    counts towards the next. ``dry_run`` returns the plan without saving.
+    """
+    registrar = resolve_caller(db, principal, data.registrar_email, "Registrar not found")
+    if registrar.role != "REGISTRAR":
+        raise HTTPException(status_code=403, detail="Only registrars can auto-assign cases")
+    role = _assignable_role(data.role)
+
+    query = db.query(Case.id).filter(
+        Case.assigned_to_id.is_(None),
+        or_(Case.status.is_(None), func.upper(Case.status).notin_(CLOSED_CASE_STATUSES)),
+    )
+    if data.case_ids is not None:
+        query = query.filter(Case.id.in_(data.case_ids))
+    case_ids = [case_id for (case_id,) in query.order_by(Case.id).limit(max(0, data.limit))]
+
+    exhibits = workload.pending_evidence(case_ids)
+    plan = workload.plan(role, [(case_id, exhibits[case_id]) for case_id in case_ids])
+    if case_ids and not plan:
+        raise HTTPException(status_code=409, detail=f"No active {role.lower()}s to assign cases to")
+
+    assigned = plan
+    if not data.dry_run and plan:
+        def unit(wdb: Session):
+            # Cases assigned by hand since they were read keep their assignee
+            cases = wdb.query(Case).filter(Case.id.in_(list(plan)), Case.assigned_to_id.is_(None)).all()
+            for case in cases:
+                _reassign(wdb, case, plan[case.id].user_id)
+            return {case.id: plan[case.id] for case in cases}
+
+        assigned = writer.call(unit, actor=registrar)
+
+    loads = {}
+    for suggestion in assigned.values():
+        loads[suggestion.user_id] = {"email": suggestion.email, **suggestion.load}
+    return {
+        "role": role,
+        "dry_run": data.dry_run,
+        "assigned": [
+            {"case_id": case_id, "user_id": s.user_id, "email": s.email} for case_id, s in assigned.items()
+        ],
+        "skipped": [case_id for case_id in case_ids if case_id not in assigned],
+        "loads": loads,
     }
 
 
 @router.post("/admin/feedback")
 def admin_add_feedback(
     feedback: AdminFeedbackCreate,
+    principal: Optional[Principal] = Depends(get_optional_user),
     db: Session = Depends(get_db)
 ):
     """Admin: Add feedback/note to a case."""
-    admin = db.query(User).filter(User.email == feedback.author_email).first()
-    if not admin:
-        raise HTTPException(status_code=404, detail="Admin user not found")
+    admin = resolve_caller(db, principal, feedback.author_email, "Admin user not found")
     
     # Check if user has admin role
     if admin.role not in ["PROSECUTOR", "JUDGE", "REGISTRAR"]:
         raise HTTPException(status_code=403, detail="Not authorized - admin role required")
     
-    case = db.query(Case).filter(Case.id == feedback.case_id).first()
-    if not case:
-        raise HTTPException(status_code=404, detail="Case not found")
-    
+    return writer.call(lambda wdb: _insert_feedback(wdb, admin, feedback), actor=admin)
+
+
+def _insert_feedback(db: Session, admin: Principal, feedback: AdminFeedbackCreate):
     note = CaseNote(
         case_id=feedback.case_id,
         author_id=admin.id,
@@ -680,8 +769,7 @@ def admin_add_feedback(
     )
     
     db.add(note)
-    db.commit()
-    db.refresh(note)
+    _flush_or_404(db)
     
     return {
         "id": note.id,
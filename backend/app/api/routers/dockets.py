@@ -0,0 +1,48 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.services.dockets import docket_cache
+
+router = APIRouter(prefix="/dockets", tags=["Dockets"])
+
+
+def _conditional(request: Request, etag: str, content, media_type: str) -> Response:
+    etag = f'"{etag}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}  # always revalidate, usually a 304
+    if etag in request.headers.get("if-none-match", ""):
+        docket_cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type=media_type, headers=headers)
+
+
+# ===============================================================
+# 📋 Daily Cause Lists
+# ===============================================================
+@router.get("/{day}")
+def get_day_docket(day: date, request: Request, room: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    The day's cause list for every courtroom with hearings (or just
+    ``room``), in running order, with case titles, parties and judges.
+    """
+    rooms = docket_cache.day(db, day, room.strip() if room else None)
+    body = '{"date":"%s","rooms":[%s]}' % (day.isoformat(), ",".join(r.json for r in rooms.values()))
+    etag = "-".join(r.etag[:8] for r in rooms.values()) or "empty"
+    return _conditional(request, f"{day.isoformat()}-{etag}", body, "application/json")
+
+
+@router.get("/{day}/{room}.html")
+def get_room_docket_html(day: date, room: str, request: Request, db: Session = Depends(get_db)):
+    """A courtroom's printable cause list for the day (URL-encode the room name)."""
+    docket = docket_cache.room(db, day, room.strip())
+    return _conditional(request, docket.etag + "-html", docket.html, "text/html; charset=utf-8")
+
+
+@router.get("/{day}/{room}.pdf")
+def get_room_docket_pdf(day: date, room: str, request: Request, db: Session = Depends(get_db)):
+    """A courtroom's cause list for the day as an A4 PDF (URL-encode the room name)."""
+    docket = docket_cache.room(db, day, room.strip())
+    return _conditional(request, docket.etag + "-pdf", docket.pdf, "application/pdf")
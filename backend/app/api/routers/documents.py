@@ -1,21 +1,29 @@
 # backend/app/api/routers/documents.py
-import os
-from datetime import datetime
 from typing import List, Optional
 
 from fastapi import (
     APIRouter,
     Depends,
+    Header,
     HTTPException,
+    Query,
     UploadFile,
     File,
     Form,
 )
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from pydantic import BaseModel
 from app.database import SessionLocal
-from app.models import Case, Document, User
+from app.models import Case, Document
+from app.core.compression import SeekableCompressor, SeekableReader, should_compress
+from app.core.identity import Principal, get_optional_user, resolve_caller
+from app.core.user_directory import user_directory
+from app.core.storage import blob_response, get_storage, iter_upload, new_key, safe_filename
+from app.core.writer import writer
+from app.core import config
+from app.services import document_index
 
 
 # ---------------------------------------------------------------------
@@ -23,9 +31,8 @@ from app.models import Case, Document, User
 # ---------------------------------------------------------------------
 router = APIRouter(prefix="/documents", tags=["Documents"])
 
-# Directory where uploaded files will be stored
-UPLOAD_DIR = "uploaded_docs"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+# Storage namespace for uploaded documents
+DOCUMENT_NAMESPACE = "documents"
 
 
 # ---------------------------------------------------------------------
@@ -65,7 +72,8 @@ class DocumentResponse(BaseModel):
 @router.post("/", response_model=DocumentResponse)
 async def upload_document(
     case_id: int = Form(...),
-    uploader_email: str = Form(...),
+    uploader_email: Optional[str] = Form(None),
+    principal: Optional[Principal] = Depends(get_optional_user),
     description: str = Form(""),
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
@@ -74,48 +82,89 @@ async def upload_document(
     Upload a new document for a specific case.
     Civilian, Prosecutor, Judge, or Registrar can upload.
     """
-    user = db.query(User).filter(User.email == uploader_email).first()
+    user = resolve_caller(db, principal, uploader_email, "Uploader not found")
     case = db.query(Case).filter(Case.id == case_id).first()
 
-    if not user:
-        raise HTTPException(status_code=404, detail="Uploader not found")
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
 
-    # Prevent directory traversal & name collisions
-    safe_filename = os.path.basename(file.filename)
-    timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
-    file_path = os.path.join(UPLOAD_DIR, f"{timestamp}_{safe_filename}")
-
-    # Save uploaded file to disk
-    with open(file_path, "wb") as buffer:
-        buffer.write(await file.read())
+    # Prevent directory traversal & name collisions, then stream to storage,
+    # compressing on the way when the MIME type is worth it
+    filename = safe_filename(file.filename)
+    chunks = iter_upload(file.file)
+    compressor = SeekableCompressor() if should_compress(file.content_type) else None
+    if compressor:
+        chunks = compressor.compress(chunks)
+    stored = await run_in_threadpool(
+        get_storage().save, new_key(DOCUMENT_NAMESPACE, filename), chunks
+    )
 
     # Create DB record
+    case_title = case.title
+    return await writer.run(
+        lambda wdb: _insert_document(wdb, user, case_id, case_title, filename, file.content_type, description,
+                                     stored, compressor),
+        actor=user,
+    )
+
+
+def _insert_document(db: Session, user: Principal, case_id: int, case_title: str, filename: str,
+                     file_type: Optional[str], description: Optional[str], stored, compressor):
     new_doc = Document(
-        filename=safe_filename,
-        file_path=file_path,
+        filename=filename,
+        file_path=stored.key,
+        sha256=stored.sha256,
+        stored_size=stored.size,
+        raw_size=compressor.raw_size if compressor else stored.size,
+        compression=compressor.codec if compressor else None,
         uploader_id=user.id,
-        case_id=case.id,
-        file_type=file.content_type,
+        case_id=case_id,
+        file_type=file_type,
         description=description,
     )
 
     db.add(new_doc)
-    db.commit()
-    db.refresh(new_doc)
+    db.flush()
+
+    # Extract and index the contents in the background; the job commits
+    # with the document, so a crash in between cannot lose it
+    if config.EXTRACTION_ENABLED:
+        document_index.queue_extraction(db, new_doc.id, created_by_id=user.id)
 
     return {
         "id": new_doc.id,
         "filename": new_doc.filename,
-        "case_title": case.title,
+        "case_title": case_title,
         "uploader_email": user.email,
-        "upload_date": new_doc.upload_date.isoformat(),
+        "upload_date": new_doc.uploaded_at.isoformat(),
         "file_type": new_doc.file_type,
         "description": new_doc.description,
     }
 
 
+class DocumentSearchHit(BaseModel):
+    document_id: int
+    case_id: int
+    filename: str
+    case_title: Optional[str]
+    snippet: str
+    score: float
+
+
+@router.get("/search", response_model=List[DocumentSearchHit])
+def search_documents(
+    q: str = Query(..., min_length=2),
+    case_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """
+    Full-text search over document contents, names and descriptions.
+    Returns ranked hits with highlighted snippets.
+    """
+    return document_index.search(db, q, case_id=case_id, limit=limit)
+
+
 @router.get("/", response_model=List[DocumentResponse])
 def list_all_documents(db: Session = Depends(get_db)):
     """
@@ -128,7 +177,7 @@ def list_all_documents(db: Session = Depends(get_db)):
             "filename": d.filename,
             "case_title": d.case.title if d.case else None,
             "uploader_email": d.uploader.email if d.uploader else None,
-            "upload_date": d.upload_date.isoformat(),
+            "upload_date": d.uploaded_at.isoformat(),
             "file_type": d.file_type,
             "description": d.description,
         }
@@ -151,7 +200,7 @@ def get_case_documents(case_id: int, db: Session = Depends(get_db)):
             "filename": d.filename,
             "case_title": d.case.title if d.case else None,
             "uploader_email": d.uploader.email if d.uploader else None,
-            "upload_date": d.upload_date.isoformat(),
+            "upload_date": d.uploaded_at.isoformat(),
             "file_type": d.file_type,
             "description": d.description,
         }
@@ -164,7 +213,7 @@ def get_user_documents(email: str, db: Session = Depends(get_db)):
     """
     View all documents uploaded by a specific user.
     """
-    user = db.query(User).filter(User.email == email).first()
+    user = user_directory.lookup(db, email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -176,7 +225,7 @@ def get_user_documents(email: str, db: Session = Depends(get_db)):
             "filename": d.filename,
             "case_title": d.case.title if d.case else None,
             "uploader_email": user.email,
-            "upload_date": d.upload_date.isoformat(),
+            "upload_date": d.uploaded_at.isoformat(),
             "file_type": d.file_type,
             "description": d.description,
         }
@@ -184,20 +233,61 @@ def get_user_documents(email: str, db: Session = Depends(get_db)):
     ]
 
 
-@router.delete("/{doc_id}")
-def delete_document(doc_id: int, db: Session = Depends(get_db)):
+@router.get("/download/{doc_id}")
+def download_document(
+    doc_id: int,
+    range: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
     """
-    Allow authorized users to delete an uploaded document.
+    Download or view a document.
+    Streams the stored file; supports ranged requests.
     """
     doc = db.query(Document).filter(Document.id == doc_id).first()
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    # Remove file from disk if present
-    if doc.file_path and os.path.exists(doc.file_path):
-        os.remove(doc.file_path)
+    storage = get_storage()
+    if not storage.exists(doc.file_path):
+        raise HTTPException(status_code=404, detail="Document file not found on server")
+
+    if doc.compression:
+        # Decompress on the fly; ranges only touch the overlapping frames
+        reader = SeekableReader(storage, doc.file_path, doc.stored_size)
+        read, size = reader.read, reader.size
+    else:
+        read = lambda start, end: storage.read(doc.file_path, start, end)
+        size = storage.size(doc.file_path)
+
+    return blob_response(
+        read,
+        size=size,
+        filename=doc.filename,
+        media_type=doc.file_type,
+        range_header=range,
+    )
 
-    db.delete(doc)
-    db.commit()
+
+@router.delete("/{doc_id}")
+def delete_document(doc_id: int):
+    """
+    Allow authorized users to delete an uploaded document.
+    """
+    file_path = writer.call(lambda wdb: _remove_document(wdb, doc_id))
+
+    # Remove file from storage if present, once the row is gone for good
+    if file_path:
+        get_storage().delete(file_path)
 
     return {"message": "Document deleted successfully"}
+
+
+def _remove_document(db: Session, doc_id: int) -> Optional[str]:
+    doc = db.query(Document).filter(Document.id == doc_id).first()
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    db.delete(doc)
+    document_index.remove_text(db, doc_id)
+    db.flush()
+    return doc.file_path
@@ -1,18 +1,21 @@
-import os
 from fastapi import (
     APIRouter,
     Depends,
+    Header,
     HTTPException,
     UploadFile,
     File,
     Form,
 )
-from fastapi.responses import FileResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import datetime
 from app.database import SessionLocal
-from app.models import Case, Evidence, User
+from app.models import Case, Evidence
+from app.core.identity import Principal, get_optional_user, resolve_caller
+from app.core.user_directory import user_directory
+from app.core.storage import blob_response, get_storage, iter_upload, new_key, safe_filename
+from app.core.writer import writer
 from pydantic import BaseModel
 
 # -------------------------------------------------------
@@ -20,9 +23,8 @@ from pydantic import BaseModel
 # -------------------------------------------------------
 router = APIRouter(prefix="/evidence", tags=["Evidence"])
 
-# Folder for evidence uploads
-EVIDENCE_DIR = "uploaded_evidence"
-os.makedirs(EVIDENCE_DIR, exist_ok=True)
+# Storage namespace for evidence uploads
+EVIDENCE_NAMESPACE = "evidence"
 
 
 # -------------------------------------------------------
@@ -65,7 +67,8 @@ class EvidenceReview(BaseModel):
 @router.post("/", response_model=EvidenceResponse)
 async def upload_evidence(
     case_id: int = Form(...),
-    uploader_email: str = Form(...),
+    uploader_email: Optional[str] = Form(None),
+    principal: Optional[Principal] = Depends(get_optional_user),
     category: str = Form("General"),
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
@@ -74,39 +77,47 @@ async def upload_evidence(
     Upload new evidence (photo, video, pdf, docx, etc.) for a case.
     Civilians and Prosecutors can upload evidence.
     """
-    user = db.query(User).filter(User.email == uploader_email).first()
+    user = resolve_caller(db, principal, uploader_email, "Uploader not found")
     case = db.query(Case).filter(Case.id == case_id).first()
 
-    if not user:
-        raise HTTPException(status_code=404, detail="Uploader not found")
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
 
-    # Save file to disk
-    safe_filename = f"{datetime.utcnow().timestamp()}_{file.filename}"
-    file_path = os.path.join(EVIDENCE_DIR, safe_filename)
-    with open(file_path, "wb") as buffer:
-        buffer.write(await file.read())
+    # Stream file to storage
+    filename = safe_filename(file.filename)
+    stored = await run_in_threadpool(
+        get_storage().save, new_key(EVIDENCE_NAMESPACE, filename), iter_upload(file.file)
+    )
+
+    case_title = case.title
+    return await writer.run(
+        lambda wdb: _insert_evidence(wdb, user, case_id, case_title, filename, file.content_type, category, stored),
+        actor=user,
+    )
+
 
+def _insert_evidence(db: Session, user: Principal, case_id: int, case_title: str, filename: str,
+                     filetype: Optional[str], category: str, stored):
     new_evidence = Evidence(
-        case_id=case.id,
+        case_id=case_id,
         uploader_id=user.id,
-        filename=file.filename,
-        file_path=file_path,
-        filetype=file.content_type,
+        filename=filename,
+        file_path=stored.key,
+        sha256=stored.sha256,
+        stored_size=stored.size,
+        filetype=filetype,
         category=category,
         status="PENDING",
     )
 
     db.add(new_evidence)
-    db.commit()
-    db.refresh(new_evidence)
+    db.flush()
 
     return {
         "id": new_evidence.id,
         "filename": new_evidence.filename,
         "filetype": new_evidence.filetype,
-        "case_title": case.title,
+        "case_title": case_title,
         "uploader_email": user.email,
         "uploaded_at": new_evidence.uploaded_at.isoformat(),
         "category": new_evidence.category,
@@ -170,7 +181,7 @@ def get_user_evidence(email: str, db: Session = Depends(get_db)):
     """
     Retrieve evidence uploaded by a specific user (Civilian, Prosecutor, etc.)
     """
-    user = db.query(User).filter(User.email == email).first()
+    user = user_directory.lookup(db, email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -195,22 +206,21 @@ def get_user_evidence(email: str, db: Session = Depends(get_db)):
 # Review / Approve / Reject Evidence
 # -------------------------------------------------------
 @router.put("/{evidence_id}/review", response_model=EvidenceResponse)
-def review_evidence(
-    evidence_id: int,
-    data: EvidenceReview,
-    db: Session = Depends(get_db),
-):
+async def review_evidence(evidence_id: int, data: EvidenceReview):
     """
     Judge or Registrar updates evidence review status.
     """
+    return await writer.run(lambda db: _apply_review(db, evidence_id, data))
+
+
+def _apply_review(db: Session, evidence_id: int, data: EvidenceReview):
     ev = db.query(Evidence).filter(Evidence.id == evidence_id).first()
     if not ev:
         raise HTTPException(status_code=404, detail="Evidence not found")
 
     ev.status = data.status
     ev.remarks = data.remarks
-    db.commit()
-    db.refresh(ev)
+    db.flush()
 
     return {
         "id": ev.id,
@@ -229,41 +239,54 @@ def review_evidence(
 # Delete Evidence
 # -------------------------------------------------------
 @router.delete("/{evidence_id}")
-def delete_evidence(evidence_id: int, db: Session = Depends(get_db)):
+def delete_evidence(evidence_id: int):
     """
     Allow authorized users to delete uploaded evidence.
     """
+    file_path = writer.call(lambda wdb: _remove_evidence(wdb, evidence_id))
+
+    # The blob goes once the row is gone for good
+    if file_path:
+        get_storage().delete(file_path)
+    return {"message": "Evidence deleted successfully"}
+
+
+def _remove_evidence(db: Session, evidence_id: int) -> Optional[str]:
     ev = db.query(Evidence).filter(Evidence.id == evidence_id).first()
     if not ev:
         raise HTTPException(status_code=404, detail="Evidence not found")
 
-    if os.path.exists(ev.file_path):
-        os.remove(ev.file_path)
-
     db.delete(ev)
-    db.commit()
-    return {"message": "Evidence deleted successfully"}
+    db.flush()
+    return ev.file_path
 
 
 # -------------------------------------------------------
 # Download/View Evidence File
 # -------------------------------------------------------
 @router.get("/download/{evidence_id}")
-def download_evidence(evidence_id: int, db: Session = Depends(get_db)):
+def download_evidence(
+    evidence_id: int,
+    range: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
     """
     Download or view an evidence file.
-    Returns the actual file for viewing/downloading.
+    Streams the stored file; supports ranged requests for large media.
     """
     ev = db.query(Evidence).filter(Evidence.id == evidence_id).first()
     if not ev:
         raise HTTPException(status_code=404, detail="Evidence not found")
-    
-    if not os.path.exists(ev.file_path):
+
+    storage = get_storage()
+    if not ev.file_path or not storage.exists(ev.file_path):
         raise HTTPException(status_code=404, detail="Evidence file not found on server")
-    
-    # Return the file with proper headers
-    return FileResponse(
-        path=ev.file_path,
+
+    # Stream the file with proper headers
+    return blob_response(
+        lambda start, end: storage.read(ev.file_path, start, end),
+        size=storage.size(ev.file_path),
         filename=ev.filename,
-        media_type=ev.filetype or "application/octet-stream"
+        media_type=ev.filetype,
+        range_header=range,
     )
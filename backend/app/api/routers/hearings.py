@@ -1,10 +1,17 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Form, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, joinedload
 from app.database import SessionLocal
-from app.models import Case, Hearing, User
+from app.models import Case, Hearing
+from app.core import config, jobs
+from app.core.identity import Principal, get_optional_user, resolve_caller
+from app.core.writer import writer
+from app.services import auto_scheduler, scheduling
+from app.services.availability import availability
+from app.services.calendar_feeds import calendar_feeds
 
 router = APIRouter(prefix="/hearings", tags=["Hearings"])
 
@@ -22,14 +29,27 @@ def get_db():
 # ---------------------------
 # SCHEMAS
 # ---------------------------
-from pydantic import BaseModel
+from pydantic import BaseModel, validator
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Hearing times are stored as naive UTC; "...Z" or "+02:00" input is converted
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
 
 class HearingCreate(BaseModel):
     case_id: int
     scheduled_date: datetime
     location: str
-    registrar_email: str
+    registrar_email: Optional[str] = None
     judge_id: Optional[int] = None
+    duration_minutes: Optional[int] = None  # defaults to HEARING_DEFAULT_MINUTES
+
+    @validator('scheduled_date')
+    def validate_scheduled_date(cls, v):
+        return _naive_utc(v)
 
 
 class HearingResponse(BaseModel):
@@ -38,6 +58,7 @@ class HearingResponse(BaseModel):
     judge_name: Optional[str]
     registrar_name: str
     scheduled_date: str
+    duration_minutes: Optional[int] = None
     location: str
     status: str
     notes: Optional[str]
@@ -52,6 +73,21 @@ class HearingUpdate(BaseModel):
     status: Optional[str] = None
     notes: Optional[str] = None
     judge_id: Optional[int] = None
+    duration_minutes: Optional[int] = None
+
+    @validator('scheduled_date')
+    def validate_scheduled_date(cls, v):
+        return _naive_utc(v)
+
+
+class AutoScheduleRequest(BaseModel):
+    start_date: Optional[date] = None  # default: HEARING_LEAD_DAYS from today
+    days: Optional[int] = None  # default: HEARING_HORIZON_DAYS
+    slot_minutes: Optional[int] = None  # default: HEARING_DEFAULT_MINUTES
+    rooms: Optional[List[str]] = None  # default: HEARING_ROOMS
+    judge_ids: Optional[List[int]] = None  # default: every active judge
+    dry_run: bool = True
+    registrar_email: Optional[str] = None
 
 
 # ---------------------------
@@ -59,31 +95,39 @@ class HearingUpdate(BaseModel):
 # ---------------------------
 
 @router.post("/", response_model=HearingResponse)
-def schedule_hearing(data: HearingCreate, db: Session = Depends(get_db)):
+async def schedule_hearing(
+    data: HearingCreate,
+    principal: Optional[Principal] = Depends(get_optional_user),
+    db: Session = Depends(get_db),
+):
     """
     Registrar schedules a hearing for a specific case.
-    Optionally assigns a judge.
+    Optionally assigns a judge. 409 when the judge or the courtroom is
+    already booked for part of the hearing.
     """
-    case = db.query(Case).filter(Case.id == data.case_id).first()
-    registrar = db.query(User).filter(User.email == data.registrar_email).first()
+    registrar = await run_in_threadpool(resolve_caller, db, principal, data.registrar_email, "Registrar not found")
+    scheduling.validate_duration(data.duration_minutes)
+    return await writer.run(lambda wdb: _insert_hearing(wdb, registrar, data), actor=registrar)
+
 
+def _insert_hearing(db: Session, registrar: Principal, data: HearingCreate):
+    case = db.query(Case).filter(Case.id == data.case_id).first()
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
-    if not registrar:
-        raise HTTPException(status_code=404, detail="Registrar not found")
 
     hearing = Hearing(
         case_id=data.case_id,
         registrar_id=registrar.id,
         judge_id=data.judge_id,
         scheduled_date=data.scheduled_date,
-        location=data.location,
+        duration_minutes=data.duration_minutes,
+        location=data.location.strip(),
         status="SCHEDULED"
     )
+    scheduling.ensure_bookable(db, hearing)
 
     db.add(hearing)
-    db.commit()
-    db.refresh(hearing)
+    db.flush()
 
     return {
         "id": hearing.id,
@@ -91,16 +135,123 @@ def schedule_hearing(data: HearingCreate, db: Session = Depends(get_db)):
         "judge_name": hearing.judge.email if hearing.judge else None,
         "registrar_name": registrar.email,
         "scheduled_date": hearing.scheduled_date.isoformat(),
+        "duration_minutes": scheduling.duration_of(hearing),
         "location": hearing.location,
         "status": hearing.status,
         "notes": hearing.notes,
     }
 
 
+@router.post("/auto-schedule")
+def auto_schedule_hearings(
+    data: AutoScheduleRequest,
+    principal: Optional[Principal] = Depends(get_optional_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Registrar: book every REVIEWED case that has no hearing yet, picking a
+    judge, courtroom and slot for each without double booking anyone.
+    A dry run (the default) returns the plan without writing it; otherwise
+    the plan is made and saved by a background job, see ``GET /jobs/{id}``.
+    """
+    registrar = resolve_caller(db, principal, data.registrar_email, "Registrar not found")
+    if registrar.role != "REGISTRAR":
+        raise HTTPException(status_code=403, detail="Only registrars can auto-schedule hearings")
+    scheduling.validate_duration(data.slot_minutes)
+    if data.days is not None and not 1 <= data.days <= 366:
+        raise HTTPException(status_code=400, detail="days must be between 1 and 366")
+
+    if data.dry_run:
+        plan = auto_scheduler.plan(
+            db, data.start_date, data.days, data.slot_minutes, data.rooms, data.judge_ids
+        )
+        return {"dry_run": True, **plan.to_dict()}
+
+    payload = auto_scheduler.job_payload(
+        registrar.id, data.start_date, data.days, data.slot_minutes, data.rooms, data.judge_ids
+    )
+    job_id = writer.call(
+        lambda wdb: jobs.enqueue(wdb, auto_scheduler.AUTO_SCHEDULE_JOB, payload, created_by_id=registrar.id),
+        actor=registrar,
+    )
+    return {"dry_run": False, "job_id": job_id, "message": "Auto-scheduling queued"}
+
+
+@router.get("/availability")
+def get_availability(
+    judge_id: Optional[int] = None,
+    room: Optional[str] = None,
+    duration: int = Query(None, description="Minutes; defaults to HEARING_DEFAULT_MINUTES"),
+    after: Optional[datetime] = None,
+    limit: int = Query(5, ge=1, le=50),
+):
+    """
+    Next free start times for a hearing of ``duration`` minutes with this
+    judge and/or in this courtroom, at or after ``after`` (default: now),
+    within sitting hours. Answered from in-memory availability bitmaps, so
+    it never touches the hearings table.
+    """
+    if judge_id is None and not (room and room.strip()):
+        raise HTTPException(status_code=400, detail="Give a judge_id, a room or both")
+    duration = duration or config.HEARING_DEFAULT_MINUTES
+    scheduling.validate_duration(duration)
+    room = room.strip() if room else None
+
+    starts = availability.next_free(duration, judge_id=judge_id, room=room, after=after, limit=limit)
+    return {
+        "judge_id": judge_id,
+        "room": room,
+        "duration_minutes": duration,
+        "slots": [
+            {"scheduled_date": s.isoformat(), "ends_at": (s + timedelta(minutes=duration)).isoformat()}
+            for s in starts
+        ],
+    }
+
+
+def _calendar(
+    db: Session,
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    judge_id: Optional[int] = None,
+    room: Optional[str] = None,
+):
+    """
+    Hearings starting in ``[date_from, date_to)``, in time order, with the
+    case and users they name loaded in the same query. With a judge or a
+    room the range is a scan of the (judge_id / location, scheduled_date)
+    index; without either, of the scheduled_date index.
+    """
+    date_from, date_to = _naive_utc(date_from), _naive_utc(date_to)
+    if date_from and date_to and date_to <= date_from:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    query = db.query(Hearing).options(
+        joinedload(Hearing.case), joinedload(Hearing.judge), joinedload(Hearing.registrar)
+    )
+    if judge_id is not None:
+        query = query.filter(Hearing.judge_id == judge_id)
+    if room:
+        query = query.filter(Hearing.location == room.strip())
+    if date_from:
+        query = query.filter(Hearing.scheduled_date >= date_from)
+    if date_to:
+        query = query.filter(Hearing.scheduled_date < date_to)
+    return query.order_by(Hearing.scheduled_date, Hearing.id).all()
+
+
 @router.get("/", response_model=List[HearingResponse])
-def get_all_hearings(db: Session = Depends(get_db)):
-    """Registrar: View all hearings in the system."""
-    hearings = db.query(Hearing).all()
+def get_all_hearings(
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    judge_id: Optional[int] = None,
+    room: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Registrar: Hearings starting between ``from`` and ``to`` (either may be
+    left open), optionally for one judge and/or courtroom.
+    """
+    hearings = _calendar(db, date_from, date_to, judge_id, room)
     return [
         {
             "id": h.id,
@@ -108,6 +259,7 @@ def get_all_hearings(db: Session = Depends(get_db)):
             "judge_name": h.judge.email if h.judge else None,
             "registrar_name": h.registrar.email if h.registrar else None,
             "scheduled_date": h.scheduled_date.isoformat(),
+            "duration_minutes": scheduling.duration_of(h),
             "location": h.location,
             "status": h.status,
             "notes": h.notes,
@@ -130,6 +282,7 @@ def get_case_hearings(case_id: int, db: Session = Depends(get_db)):
             "judge_name": h.judge.email if h.judge else None,
             "registrar_name": h.registrar.email if h.registrar else None,
             "scheduled_date": h.scheduled_date.isoformat(),
+            "duration_minutes": scheduling.duration_of(h),
             "location": h.location,
             "status": h.status,
             "notes": h.notes,
@@ -139,9 +292,14 @@ def get_case_hearings(case_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/judge/{judge_id}", response_model=List[HearingResponse])
-def get_judge_hearings(judge_id: int, db: Session = Depends(get_db)):
-    """View all hearings assigned to a particular judge."""
-    hearings = db.query(Hearing).filter(Hearing.judge_id == judge_id).all()
+def get_judge_hearings(
+    judge_id: int,
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    db: Session = Depends(get_db),
+):
+    """View the hearings assigned to a particular judge, optionally between ``from`` and ``to``."""
+    hearings = _calendar(db, date_from, date_to, judge_id=judge_id)
     return [
         {
             "id": h.id,
@@ -149,6 +307,7 @@ def get_judge_hearings(judge_id: int, db: Session = Depends(get_db)):
             "judge_name": h.judge.email if h.judge else None,
             "registrar_name": h.registrar.email if h.registrar else None,
             "scheduled_date": h.scheduled_date.isoformat(),
+            "duration_minutes": scheduling.duration_of(h),
             "location": h.location,
             "status": h.status,
             "notes": h.notes,
@@ -157,29 +316,69 @@ def get_judge_hearings(judge_id: int, db: Session = Depends(get_db)):
     ]
 
 
+def _ics_response(request: Request, key) -> Response:
+    body, etag = calendar_feeds.get(key)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}  # always revalidate, usually a 304
+    if etag in request.headers.get("if-none-match", ""):
+        calendar_feeds.not_modified += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="text/calendar; charset=utf-8", headers=headers)
+
+
+@router.get("/calendar/judge/{judge_id}.ics")
+def get_judge_calendar(judge_id: int, request: Request):
+    """iCalendar feed of a judge's hearings, for calendar apps to subscribe to."""
+    return _ics_response(request, ("judge", judge_id))
+
+
+@router.get("/calendar/room/{room}.ics")
+def get_room_calendar(room: str, request: Request):
+    """iCalendar feed of a courtroom's hearings (URL-encode the room name)."""
+    return _ics_response(request, ("room", room.strip()))
+
+
 @router.put("/{hearing_id}", response_model=HearingResponse)
-def update_hearing(hearing_id: int, data: HearingUpdate, db: Session = Depends(get_db)):
+async def update_hearing(hearing_id: int, data: HearingUpdate):
     """
     Update hearing details (Registrar or Judge).
-    Can update date, location, notes, or status.
+    Can update date, duration, location, notes, or status. Moving the
+    hearing or changing its judge is rejected (409) on a double booking.
     """
-    hearing = db.query(Hearing).filter(Hearing.id == hearing_id).first()
+    scheduling.validate_duration(data.duration_minutes)
+    return await writer.run(lambda wdb: _apply_hearing_update(wdb, hearing_id, data))
+
+
+def _apply_hearing_update(db: Session, hearing_id: int, data: HearingUpdate):
+    # One SELECT for everything the response names
+    hearing = (
+        db.query(Hearing)
+        .options(joinedload(Hearing.case), joinedload(Hearing.judge), joinedload(Hearing.registrar))
+        .filter(Hearing.id == hearing_id)
+        .first()
+    )
     if not hearing:
         raise HTTPException(status_code=404, detail="Hearing not found")
+    was_active = scheduling.is_active(hearing)
 
     if data.scheduled_date:
         hearing.scheduled_date = data.scheduled_date
+    if data.duration_minutes:
+        hearing.duration_minutes = data.duration_minutes
     if data.location:
-        hearing.location = data.location
+        hearing.location = data.location.strip()
     if data.status:
         hearing.status = data.status
     if data.notes:
         hearing.notes = data.notes
     if data.judge_id:
         hearing.judge_id = data.judge_id
+        db.expire(hearing, ["judge"])  # the loaded judge is the previous one
+
+    # Only a change to when, where or who can create a double booking
+    if data.scheduled_date or data.duration_minutes or data.location or data.judge_id or not was_active:
+        scheduling.ensure_bookable(db, hearing)
 
-    db.commit()
-    db.refresh(hearing)
+    db.flush()
 
     return {
         "id": hearing.id,
@@ -187,6 +386,7 @@ def update_hearing(hearing_id: int, data: HearingUpdate, db: Session = Depends(g
         "judge_name": hearing.judge.email if hearing.judge else None,
         "registrar_name": hearing.registrar.email if hearing.registrar else None,
         "scheduled_date": hearing.scheduled_date.isoformat(),
+        "duration_minutes": scheduling.duration_of(hearing),
         "location": hearing.location,
         "status": hearing.status,
         "notes": hearing.notes,
@@ -194,13 +394,16 @@ def update_hearing(hearing_id: int, data: HearingUpdate, db: Session = Depends(g
 
 
 @router.delete("/{hearing_id}")
-def delete_hearing(hearing_id: int, db: Session = Depends(get_db)):
+def delete_hearing(hearing_id: int):
     """Allow Registrar to delete or cancel a hearing."""
+    writer.call(lambda wdb: _remove_hearing(wdb, hearing_id))
+    return {"message": "Hearing deleted successfully"}
+
+
+def _remove_hearing(db: Session, hearing_id: int):
     hearing = db.query(Hearing).filter(Hearing.id == hearing_id).first()
     if not hearing:
         raise HTTPException(status_code=404, detail="Hearing not found")
 
     db.delete(hearing)
-    db.commit()
-
-    return {"message": "Hearing deleted successfully"}
+    db.flush()
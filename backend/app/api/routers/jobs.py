@@ -0,0 +1,71 @@
+import json
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.core.identity import Principal, get_optional_user, resolve_caller
+from app.database import get_db
+from app.models import Job
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+# ===============================================================
+# Pydantic Schemas
+# ===============================================================
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str
+    priority: int
+    attempts: int
+    max_attempts: int
+    run_after: Optional[str]
+    created_at: Optional[str]
+    started_at: Optional[str]
+    finished_at: Optional[str]
+    result: Optional[Any]
+    last_error: Optional[str]
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+# ===============================================================
+# Job Status
+# ===============================================================
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(
+    job_id: int,
+    user_email: Optional[str] = Query(None),
+    principal: Optional[Principal] = Depends(get_optional_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Status of a background job. Visible to the user who queued it and to
+    registrars.
+    """
+    caller = resolve_caller(db, principal, user_email)
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if caller.role != "REGISTRAR" and job.created_by_id != caller.id:
+        raise HTTPException(status_code=403, detail="Not authorized to view this job")
+
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "priority": job.priority,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "run_after": _iso(job.run_after),
+        "created_at": _iso(job.created_at),
+        "started_at": _iso(job.started_at),
+        "finished_at": _iso(job.finished_at),
+        "result": json.loads(job.result) if job.result else None,
+        "last_error": job.last_error,
+    }
@@ -0,0 +1,138 @@
+import asyncio
+import json
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core import config
+from app.core.event_bus import Subscription, event_bus
+from app.core.identity import Principal, authenticate, bearer_scheme
+from app.services import notifications  # noqa: F401 - registers the outbox subscriber feeding the bus
+
+router = APIRouter(prefix="/notifications", tags=["Notifications"])
+
+
+# ===============================================================
+# Helpers
+# ===============================================================
+def _caller(credentials: Optional[HTTPAuthorizationCredentials], token: Optional[str]) -> Tuple[Principal, str]:
+    """
+    Browsers cannot set headers on ``EventSource`` / ``WebSocket``, so the
+    access token may also come as ``?token=``.
+    """
+    raw = credentials.credentials if credentials is not None else token
+    if not raw:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    return authenticate(raw), raw
+
+
+def _subscribe(principal: Principal, last_event_id: Optional[str]) -> Subscription:
+    """Resume after ``<instance>-<id>``; ids from another worker or a restart force a resync."""
+    if not last_event_id:
+        return event_bus.subscribe(principal)
+    instance, _, number = last_event_id.rpartition("-")
+    if instance == event_bus.instance and number.isdigit():
+        return event_bus.subscribe(principal, int(number))
+    subscription = event_bus.subscribe(principal)
+    subscription.lagged = True
+    return subscription
+
+
+def _wire(message: dict) -> dict:
+    return {**message, "id": f"{event_bus.instance}-{message['id']}"}
+
+
+def _still_valid(token: str) -> bool:
+    try:
+        authenticate(token)
+    except HTTPException:
+        return False
+    return True
+
+
+# ===============================================================
+# Server-Sent Events
+# ===============================================================
+@router.get("/stream")
+async def stream_notifications(
+    token: Optional[str] = Query(None),
+    last_event_id: Optional[str] = Header(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+):
+    """
+    Push channel for case, evidence and hearing updates visible to the
+    caller. Registrars see every case; everyone else sees the cases they
+    filed, are assigned to or judge a hearing for.
+    """
+    principal, raw = _caller(credentials, token)
+
+    async def events():
+        subscription = _subscribe(principal, last_event_id)
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                batch = await subscription.next_batch(config.NOTIFY_HEARTBEAT_SECONDS)
+                if batch is None:
+                    if not _still_valid(raw):
+                        yield "event: unauthorized\ndata: {}\n\n"
+                        return
+                    yield ": ping\n\n"
+                    continue
+                for message in map(_wire, batch):
+                    yield f"id: {message['id']}\nevent: {message['type']}\ndata: {json.dumps(message)}\n\n"
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ===============================================================
+# WebSocket
+# ===============================================================
+@router.websocket("/ws")
+async def notifications_socket(
+    websocket: WebSocket,
+    token: Optional[str] = Query(None),
+    last_event_id: Optional[str] = Query(None),
+):
+    """Same events as ``/notifications/stream``, one JSON message each."""
+    try:
+        principal, raw = _caller(None, token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+
+    subscription = _subscribe(principal, last_event_id)
+    # Clients only listen; reading is how a disconnect is noticed
+    receiver = asyncio.create_task(_read_until_closed(websocket))
+    receiver.add_done_callback(lambda _: subscription.wakeup.set())
+    try:
+        while not receiver.done():
+            batch = await subscription.next_batch(config.NOTIFY_HEARTBEAT_SECONDS)
+            if batch is None:
+                if not _still_valid(raw):
+                    await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+                    return
+                await websocket.send_json({"type": "ping"})
+                continue
+            for message in batch:
+                await websocket.send_json(_wire(message))
+    except (WebSocketDisconnect, RuntimeError):
+        pass  # the client went away mid-send
+    finally:
+        event_bus.unsubscribe(subscription)
+        receiver.cancel()
+
+
+async def _read_until_closed(websocket: WebSocket):
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
@@ -1,10 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Form
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel
 from app.database import SessionLocal
-from app.models import Payment, User, Case
+from app.models import Payment, Case
+from app.core.identity import Principal, get_optional_user, resolve_caller
+from app.core.user_directory import user_directory
+from app.core.writer import writer
 
 router = APIRouter(prefix="/payments", tags=["Payments"])
 
@@ -25,7 +29,7 @@ def get_db():
 # -------------------------------------------------------
 class PaymentCreate(BaseModel):
     case_id: int
-    payer_email: str
+    payer_email: Optional[str] = None
     amount: float
     payment_type: str  # e.g., "FILING_FEE", "FINE", "PENALTY"
     reference: Optional[str] = None
@@ -55,18 +59,21 @@ class PaymentUpdate(BaseModel):
 # -------------------------------------------------------
 
 @router.post("/", response_model=PaymentResponse)
-def make_payment(
+async def make_payment(
     data: PaymentCreate,
+    principal: Optional[Principal] = Depends(get_optional_user),
     db: Session = Depends(get_db)
 ):
     """
     Civilian makes a payment for a case.
     """
-    payer = db.query(User).filter(User.email == data.payer_email).first()
+    payer = await run_in_threadpool(resolve_caller, db, principal, data.payer_email, "Payer not found")
+    return await writer.run(lambda wdb: _insert_payment(wdb, payer, data), actor=payer)
+
+
+def _insert_payment(db: Session, payer: Principal, data: PaymentCreate):
     case = db.query(Case).filter(Case.id == data.case_id).first()
 
-    if not payer:
-        raise HTTPException(status_code=404, detail="Payer not found")
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
 
@@ -80,8 +87,7 @@ def make_payment(
     )
 
     db.add(new_payment)
-    db.commit()
-    db.refresh(new_payment)
+    db.flush()
 
     return {
         "id": new_payment.id,
@@ -145,7 +151,7 @@ def get_user_payments(email: str, db: Session = Depends(get_db)):
     """
     Retrieve all payments made by a user.
     """
-    user = db.query(User).filter(User.email == email).first()
+    user = user_directory.lookup(db, email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -167,11 +173,20 @@ def get_user_payments(email: str, db: Session = Depends(get_db)):
 
 
 @router.put("/{payment_id}", response_model=PaymentResponse)
-def update_payment(payment_id: int, data: PaymentUpdate, db: Session = Depends(get_db)):
+def update_payment(payment_id: int, data: PaymentUpdate):
     """
     Registrar confirms or updates payment details (status, reference).
     """
-    payment = db.query(Payment).filter(Payment.id == payment_id).first()
+    return writer.call(lambda wdb: _apply_payment_update(wdb, payment_id, data))
+
+
+def _apply_payment_update(db: Session, payment_id: int, data: PaymentUpdate):
+    payment = (
+        db.query(Payment)
+        .options(joinedload(Payment.payer), joinedload(Payment.case))
+        .filter(Payment.id == payment_id)
+        .first()
+    )
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
 
@@ -180,8 +195,7 @@ def update_payment(payment_id: int, data: PaymentUpdate, db: Session = Depends(g
     if data.reference:
         payment.reference = data.reference
 
-    db.commit()
-    db.refresh(payment)
+    db.flush()
 
     return {
         "id": payment.id,
@@ -196,14 +210,18 @@ def update_payment(payment_id: int, data: PaymentUpdate, db: Session = Depends(g
 
 
 @router.delete("/{payment_id}")
-def delete_payment(payment_id: int, db: Session = Depends(get_db)):
+def delete_payment(payment_id: int):
     """
     Delete a payment record (Admin or Registrar only).
     """
+    writer.call(lambda wdb: _remove_payment(wdb, payment_id))
+    return {"message": "Payment deleted successfully"}
+
+
+def _remove_payment(db: Session, payment_id: int):
     payment = db.query(Payment).filter(Payment.id == payment_id).first()
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
 
     db.delete(payment)
-    db.commit()
-    return {"message": "Payment deleted successfully"}
+    db.flush()
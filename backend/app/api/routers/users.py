@@ -1,10 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import csv
+import io
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from pydantic import BaseModel
+from typing import AsyncIterator, Dict, List, Optional
+from pydantic import BaseModel, ValidationError
 from datetime import datetime
-from app.database import get_db
+from app.database import SessionLocal, foreign_key_violation, get_db
 from app.models import User, Case
+from app.api.routers.auth import UserRegistration
+from app.core import config
+from app.core.hashing import password_hasher
+from app.core.identity import Principal, get_optional_user, resolve_caller
+from app.core.revocation import revocations
+from app.core.user_directory import user_directory
+from app.core.read_cache import ROLE_USERS, read_cache
+from app.core.writer import writer
+from app.services.workload import _member, workload
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -34,16 +50,15 @@ class UserUpdate(BaseModel):
 # ===============================================================
 @router.get("/all", response_model=List[UserResponse])
 def list_all_users(
-    registrar_email: str = Query(...),
+    registrar_email: Optional[str] = Query(None),
+    principal: Optional[Principal] = Depends(get_optional_user),
     db: Session = Depends(get_db)
 ):
     """
     Registrar: View all users in the system with stats.
     """
     # Verify registrar
-    registrar = db.query(User).filter(User.email == registrar_email).first()
-    if not registrar:
-        raise HTTPException(status_code=404, detail="Registrar not found")
+    registrar = resolve_caller(db, principal, registrar_email, "Registrar not found")
     
     if registrar.role != "REGISTRAR":
         raise HTTPException(status_code=403, detail="Only registrars can view all users")
@@ -85,8 +100,12 @@ def get_users_by_role(
     if role_upper not in valid_roles:
         raise HTTPException(status_code=400, detail=f"Invalid role. Must be one of: {', '.join(valid_roles)}")
     
-    users = db.query(User).filter(User.role == role_upper).all()
-    
+    return read_cache.get_or_load(ROLE_USERS, role_upper, lambda: _load_users_by_role(db, role_upper))
+
+
+def _load_users_by_role(db: Session, role: str):
+    users = db.query(User).filter(User.role == role).all()
+
     return [
         {
             "id": u.id,
@@ -95,7 +114,7 @@ def get_users_by_role(
             "role": u.role
         }
         for u in users
-    ]
+    ], ()
 
 
 # ===============================================================
@@ -104,16 +123,15 @@ def get_users_by_role(
 @router.get("/{user_id}", response_model=UserResponse)
 def get_user_details(
     user_id: int,
-    registrar_email: str = Query(...),
+    registrar_email: Optional[str] = Query(None),
+    principal: Optional[Principal] = Depends(get_optional_user),
     db: Session = Depends(get_db)
 ):
     """
     Registrar: Get detailed info about a specific user.
     """
     # Verify registrar
-    registrar = db.query(User).filter(User.email == registrar_email).first()
-    if not registrar:
-        raise HTTPException(status_code=404, detail="Registrar not found")
+    registrar = resolve_caller(db, principal, registrar_email, "Registrar not found")
     
     if registrar.role != "REGISTRAR":
         raise HTTPException(status_code=403, detail="Only registrars can view user details")
@@ -142,20 +160,32 @@ def get_user_details(
 @router.put("/{user_id}/toggle-status")
 def toggle_user_status(
     user_id: int,
-    registrar_email: str = Query(...),
+    registrar_email: Optional[str] = Query(None),
+    principal: Optional[Principal] = Depends(get_optional_user),
     db: Session = Depends(get_db)
 ):
     """
     Registrar: Enable or disable a user account.
     """
     # Verify registrar
-    registrar = db.query(User).filter(User.email == registrar_email).first()
-    if not registrar:
-        raise HTTPException(status_code=404, detail="Registrar not found")
+    registrar = resolve_caller(db, principal, registrar_email, "Registrar not found")
     
     if registrar.role != "REGISTRAR":
         raise HTTPException(status_code=403, detail="Only registrars can manage users")
     
+    try:
+        return writer.call(lambda wdb: _toggle_status(wdb, registrar, user_id), actor=registrar)
+    except HTTPException:
+        raise
+    except Exception:
+        # If is_active column doesn't exist, we'll need to add it
+        raise HTTPException(
+            status_code=500, 
+            detail="Unable to update user status. Database may need migration."
+        )
+
+
+def _toggle_status(db: Session, registrar: Principal, user_id: int):
     # Get user
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
@@ -169,26 +199,19 @@ def toggle_user_status(
     current_status = getattr(user, 'is_active', True)
     new_status = not current_status
     
-    # Try to set the status
-    try:
-        user.is_active = new_status
-        db.commit()
-        db.refresh(user)
-        
-        status_text = "enabled" if new_status else "disabled"
-        return {
-            "message": f"User {status_text} successfully",
-            "user_id": user.id,
-            "email": user.email,
-            "is_active": new_status
-        }
-    except Exception as e:
-        # If is_active column doesn't exist, we'll need to add it
-        db.rollback()
-        raise HTTPException(
-            status_code=500, 
-            detail="Unable to update user status. Database may need migration."
-        )
+    user.is_active = new_status
+    if not new_status:
+        # Cut off live sessions immediately, not when their tokens expire
+        revocations.revoke_user(db, user.id, reason="disabled")
+    db.flush()
+    
+    status_text = "enabled" if new_status else "disabled"
+    return {
+        "message": f"User {status_text} successfully",
+        "user_id": user.id,
+        "email": user.email,
+        "is_active": new_status
+    }
 
 
 # ===============================================================
@@ -197,7 +220,8 @@ def toggle_user_status(
 @router.delete("/{user_id}")
 def delete_user(
     user_id: int,
-    registrar_email: str = Query(...),
+    registrar_email: Optional[str] = Query(None),
+    principal: Optional[Principal] = Depends(get_optional_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -205,13 +229,15 @@ def delete_user(
     WARNING: This will cascade delete all related data.
     """
     # Verify registrar
-    registrar = db.query(User).filter(User.email == registrar_email).first()
-    if not registrar:
-        raise HTTPException(status_code=404, detail="Registrar not found")
+    registrar = resolve_caller(db, principal, registrar_email, "Registrar not found")
     
     if registrar.role != "REGISTRAR":
         raise HTTPException(status_code=403, detail="Only registrars can delete users")
     
+    return writer.call(lambda wdb: _remove_user(wdb, registrar, user_id), actor=registrar)
+
+
+def _remove_user(db: Session, registrar: Principal, user_id: int):
     # Get user
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
@@ -226,8 +252,17 @@ def delete_user(
     user_role = user.role
     
     # Delete user (will cascade due to model relationships)
+    revocations.revoke_user(db, user.id, reason="deleted")
     db.delete(user)
-    db.commit()
+    try:
+        db.flush()
+    except IntegrityError as exc:
+        # Notes, payments or hearings that are not deleted with the user still name them
+        if foreign_key_violation(exc):
+            raise HTTPException(
+                status_code=409, detail="User still has records in other cases; disable the account instead"
+            )
+        raise
     
     return {
         "message": "User deleted successfully",
@@ -246,20 +281,23 @@ def delete_user(
 def update_user_role(
     user_id: int,
     new_role: str = Query(..., regex="^(CIVILIAN|REGISTRAR|JUDGE|PROSECUTOR)$"),
-    registrar_email: str = Query(...),
+    registrar_email: Optional[str] = Query(None),
+    principal: Optional[Principal] = Depends(get_optional_user),
     db: Session = Depends(get_db)
 ):
     """
     Registrar: Change a user's role.
     """
     # Verify registrar
-    registrar = db.query(User).filter(User.email == registrar_email).first()
-    if not registrar:
-        raise HTTPException(status_code=404, detail="Registrar not found")
+    registrar = resolve_caller(db, principal, registrar_email, "Registrar not found")
     
     if registrar.role != "REGISTRAR":
         raise HTTPException(status_code=403, detail="Only registrars can change user roles")
     
+    return writer.call(lambda wdb: _change_role(wdb, registrar, user_id, new_role), actor=registrar)
+
+
+def _change_role(db: Session, registrar: Principal, user_id: int, new_role: str):
     # Get user
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
@@ -271,9 +309,10 @@ def update_user_role(
     
     old_role = user.role
     user.role = new_role.upper()
+    # Live tokens still carry the old role
+    revocations.revoke_user(db, user.id, reason="role_changed")
     
-    db.commit()
-    db.refresh(user)
+    db.flush()
     
     return {
         "message": "User role updated successfully",
@@ -282,3 +321,203 @@ def update_user_role(
         "old_role": old_role,
         "new_role": user.role
     }
+
+
+# ===============================================================
+# Bulk Registration (Registrar Only)
+# ===============================================================
+BULK_INSERT_BATCH = 500
+BULK_REQUIRED_FIELDS = {"username", "email", "password"}
+
+
+def _parse_bulk_rows(raw: bytes, is_json: bool) -> List[dict]:
+    """CSV (header: username,email,password[,role]) or a JSON list of objects."""
+    try:
+        text = raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+
+    if is_json:
+        try:
+            payload = json.loads(text)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON")
+        rows = payload.get("users") if isinstance(payload, dict) else payload
+        if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+            raise HTTPException(status_code=400, detail='JSON must be a list of users or {"users": [...]}')
+        return rows
+
+    reader = csv.DictReader(io.StringIO(text))
+    header = {(name or "").strip().lower() for name in reader.fieldnames or []}
+    missing = BULK_REQUIRED_FIELDS - header
+    if missing:
+        raise HTTPException(status_code=400, detail=f"CSV is missing columns: {', '.join(sorted(missing))}")
+    return [
+        {(k or "").strip().lower(): (v or "").strip() for k, v in row.items() if k}
+        for row in reader
+    ]
+
+
+def _existing_accounts(usernames: List[str], emails: List[str]):
+    """One set-based query for every username/email already taken."""
+    db = SessionLocal()
+    try:
+        rows = db.query(User.username, User.email).filter(
+            or_(User.username.in_(usernames), User.email.in_(emails))
+        ).all()
+    finally:
+        db.close()
+    return {r.username for r in rows}, {r.email for r in rows}
+
+
+def _insert_batch(db: Session, batch: List[dict]) -> Dict[str, Optional[int]]:
+    """Write unit: one executemany; returns email -> new id (None if lost a race)."""
+    try:
+        with db.begin_nested():
+            created = db.execute(insert(User).returning(User.id, User.email), batch).all()
+        return {email: user_id for user_id, email in created}
+    except IntegrityError:
+        pass
+
+    # Someone registered one of these meanwhile: fall back to row by row
+    ids = {}
+    for row in batch:
+        try:
+            with db.begin_nested():
+                ids[row["email"]] = db.execute(insert(User).returning(User.id), row).scalar_one()
+        except IntegrityError:
+            ids[row["email"]] = None
+    return ids
+
+
+def _row_result(index: int, row: dict, status: str, **extra) -> dict:
+    return {
+        "event": "row",
+        "row": index + 1,
+        "username": row.get("username"),
+        "email": row.get("email"),
+        "status": status,
+        **extra,
+    }
+
+
+async def _bulk_register(rows: List[dict], registrar: Principal) -> AsyncIterator[dict]:
+    """Validate, de-duplicate, hash and insert; yields progress and per-row results."""
+    total = len(rows)
+    valid = []  # (row index, UserRegistration)
+    seen_usernames, seen_emails = set(), set()
+
+    for index, row in enumerate(rows):
+        fields = {k: row.get(k) for k in ("username", "email", "password", "role") if row.get(k) not in (None, "")}
+        try:
+            user = UserRegistration(**fields)
+        except ValidationError as exc:
+            detail = "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors())
+            yield _row_result(index, row, "error", detail=detail)
+            continue
+        if user.username in seen_usernames or user.email in seen_emails:
+            yield _row_result(index, row, "error", detail="Duplicate username or email within the file")
+            continue
+        seen_usernames.add(user.username)
+        seen_emails.add(user.email)
+        valid.append((index, user))
+    yield {"event": "progress", "stage": "validated", "done": total, "total": total}
+
+    if valid:
+        taken_usernames, taken_emails = await run_in_threadpool(
+            _existing_accounts, [u.username for _, u in valid], [u.email for _, u in valid]
+        )
+        remaining = []
+        for index, user in valid:
+            if user.username in taken_usernames:
+                yield _row_result(index, rows[index], "error", detail="Username already taken")
+            elif user.email in taken_emails:
+                yield _row_result(index, rows[index], "error", detail="Email already registered")
+            else:
+                remaining.append((index, user))
+        valid = remaining
+    yield {"event": "progress", "stage": "checked", "done": len(valid), "total": total}
+
+    hashes: List[Optional[str]] = [None] * len(valid)
+    hashed = 0
+    async for offset, batch in password_hasher.hash_many([u.password for _, u in valid]):
+        hashes[offset:offset + len(batch)] = batch
+        hashed += len(batch)
+        yield {"event": "progress", "stage": "hashing", "done": hashed, "total": len(valid)}
+
+    created = 0
+    for start in range(0, len(valid), BULK_INSERT_BATCH):
+        chunk = valid[start:start + BULK_INSERT_BATCH]
+        records = [
+            {"username": u.username, "email": u.email, "password_hash": hashes[start + i], "role": u.role}
+            for i, (_, u) in enumerate(chunk)
+        ]
+        ids = await writer.run(lambda db: _insert_batch(db, records), actor=registrar)
+        # Core inserts skip the commit hooks, so drop the cached role lists
+        # and add the new judges/prosecutors to the workload counters here
+        for role in {r["role"] for r in records}:
+            read_cache.invalidate(ROLE_USERS, role)
+        for index, user in chunk:
+            user_directory.invalidate(user.email)  # drop cached "unknown email" entries
+            user_id = ids.get(user.email)
+            if user_id is None:
+                yield _row_result(index, rows[index], "error", detail="Username or email already registered")
+            else:
+                workload.update(("user", user_id), (user.email, _member(user.role, True)), None)
+                created += 1
+                yield _row_result(index, rows[index], "created", id=user_id, role=user.role)
+        yield {"event": "progress", "stage": "inserting", "done": start + len(chunk), "total": len(valid)}
+
+    yield {"event": "summary", "total": total, "created": created, "failed": total - created}
+
+
+@router.post("/bulk")
+async def bulk_create_users(
+    request: Request,
+    stream: bool = Query(False, description="Stream NDJSON progress events instead of one JSON reply"),
+    registrar_email: Optional[str] = Query(None),
+    principal: Optional[Principal] = Depends(get_optional_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Registrar: Register many users at once.
+    Body: a CSV upload (multipart field ``file`` or ``text/csv`` body with
+    columns username,email,password[,role]) or JSON (a list of users or
+    ``{"users": [...]}``). Every row gets its own result.
+    """
+    registrar = await run_in_threadpool(resolve_caller, db, principal, registrar_email, "Registrar not found")
+    if registrar.role != "REGISTRAR":
+        raise HTTPException(status_code=403, detail="Only registrars can register users in bulk")
+
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or not hasattr(upload, "read"):
+            raise HTTPException(status_code=400, detail="Missing file field")
+        raw = await upload.read()
+        is_json = (upload.filename or "").lower().endswith(".json") or "json" in (upload.content_type or "")
+    else:
+        raw = await request.body()
+        is_json = "json" in content_type
+
+    rows = _parse_bulk_rows(raw, is_json)
+    if not rows:
+        raise HTTPException(status_code=400, detail="No users to register")
+    if len(rows) > config.USER_IMPORT_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {config.USER_IMPORT_MAX_ROWS} users per request")
+
+    if stream:
+        async def ndjson():
+            async for event in _bulk_register(rows, registrar):
+                yield json.dumps(event) + "\n"
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    results, summary = [], None
+    async for event in _bulk_register(rows, registrar):
+        if event["event"] == "row":
+            results.append({k: v for k, v in event.items() if k != "event"})
+        elif event["event"] == "summary":
+            summary = {k: v for k, v in event.items() if k != "event"}
+    results.sort(key=lambda r: r["row"])
+    return {**summary, "results": results}
@@ -0,0 +1,167 @@
+import bisect
+import struct
+from typing import Iterable, Iterator, List, Optional
+
+from app.core import config
+from app.core.storage import StorageBackend
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# ===============================================================
+# 🗜️ Seekable zstd Compression
+# ===============================================================
+# Blobs are written in the zstd "seekable format": a sequence of independent
+# zstd frames, each holding at most COMPRESSION_FRAME_SIZE raw bytes, followed
+# by a skippable frame containing the seek table. Any zstd tool can still
+# decompress the whole blob, and a ranged read only needs the frames that
+# overlap the requested range.
+
+CODEC = "zstd"
+
+_SKIPPABLE_MAGIC = 0x184D2A5E
+_SEEKABLE_MAGIC = 0x8F92EAB1
+_FOOTER = struct.Struct("<IBI")  # number_of_frames, descriptor, seekable magic
+_ENTRY = struct.Struct("<II")  # compressed_size, decompressed_size
+
+# MIME types worth compressing (text PDFs, Word documents, transcripts...)
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/pdf",
+    "application/msword",
+    "application/rtf",
+    "application/json",
+    "application/xml",
+    "application/vnd.openxmlformats-officedocument.",
+    "application/vnd.oasis.opendocument.",
+)
+# Already-compressed media, never worth a pass
+INCOMPRESSIBLE_TYPES = (
+    "image/",
+    "video/",
+    "audio/",
+    "application/zip",
+    "application/gzip",
+    "application/x-7z-compressed",
+    "application/x-rar-compressed",
+    "application/zstd",
+)
+
+
+def should_compress(content_type: Optional[str]) -> bool:
+    """Decide from the MIME type whether an upload should be compressed."""
+    if not config.COMPRESSION_ENABLED or zstandard is None or not content_type:
+        return False
+    content_type = content_type.lower()
+    if content_type.startswith(INCOMPRESSIBLE_TYPES):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def _reframe(chunks: Iterable[bytes], frame_size: int) -> Iterator[bytes]:
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer.extend(chunk)
+        while len(buffer) >= frame_size:
+            yield bytes(buffer[:frame_size])
+            del buffer[:frame_size]
+    if buffer:
+        yield bytes(buffer)
+
+
+class SeekableCompressor:
+    """
+    Streams raw chunks into seekable zstd output.
+
+    The first frame doubles as a probe: if it does not compress below
+    ``min_ratio`` (e.g. a scanned PDF full of JPEGs) the blob is stored raw
+    and ``codec`` is left as ``None``. ``raw_size`` is known once the
+    generator returned by :meth:`compress` is exhausted.
+    """
+
+    def __init__(
+        self,
+        level: int = config.COMPRESSION_LEVEL,
+        frame_size: int = config.COMPRESSION_FRAME_SIZE,
+        min_ratio: float = config.COMPRESSION_MIN_RATIO,
+    ):
+        if zstandard is None:
+            raise RuntimeError("zstd compression requires the zstandard package")
+        self.compressor = zstandard.ZstdCompressor(level=level)
+        self.frame_size = frame_size
+        self.min_ratio = min_ratio
+        self.codec: Optional[str] = CODEC
+        self.raw_size = 0
+        self.entries: List[tuple] = []
+
+    def compress(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        for index, raw in enumerate(_reframe(chunks, self.frame_size)):
+            self.raw_size += len(raw)
+            if self.codec is None:
+                yield raw
+                continue
+            frame = self.compressor.compress(raw)
+            if index == 0 and len(frame) > len(raw) * self.min_ratio:
+                self.codec = None
+                yield raw
+                continue
+            self.entries.append((len(frame), len(raw)))
+            yield frame
+        if self.codec is not None:
+            yield self._seek_table()
+
+    def _seek_table(self) -> bytes:
+        body = b"".join(_ENTRY.pack(c, d) for c, d in self.entries)
+        body += _FOOTER.pack(len(self.entries), 0, _SEEKABLE_MAGIC)
+        return struct.pack("<II", _SKIPPABLE_MAGIC, len(body)) + body
+
+
+class SeekableReader:
+    """
+    Random access to a seekable zstd blob through ranged storage reads.
+    Only the seek table and the frames overlapping a range are fetched.
+    """
+
+    def __init__(self, storage: StorageBackend, key: str, stored_size: Optional[int] = None):
+        if zstandard is None:
+            raise RuntimeError("zstd decompression requires the zstandard package")
+        self.storage = storage
+        self.key = key
+        self.decompressor = zstandard.ZstdDecompressor()
+        self._load_seek_table(stored_size if stored_size is not None else storage.size(key))
+
+    def _read(self, start: int, end: int) -> bytes:
+        return b"".join(self.storage.read(self.key, start, end))
+
+    def _load_seek_table(self, stored_size: int):
+        footer_start = stored_size - _FOOTER.size
+        frames, descriptor, magic = _FOOTER.unpack(self._read(footer_start, stored_size))
+        if magic != _SEEKABLE_MAGIC:
+            raise ValueError(f"{self.key} is not a seekable zstd blob")
+        entry_size = _ENTRY.size + (4 if descriptor & 0x80 else 0)  # optional checksums
+        table = self._read(footer_start - frames * entry_size, footer_start)
+
+        self.compressed_offsets = [0]
+        self.raw_offsets = [0]
+        for i in range(frames):
+            compressed, raw = _ENTRY.unpack_from(table, i * entry_size)
+            self.compressed_offsets.append(self.compressed_offsets[-1] + compressed)
+            self.raw_offsets.append(self.raw_offsets[-1] + raw)
+        self.size = self.raw_offsets[-1]
+
+    def read(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yield the raw bytes in ``[start, end)``."""
+        end = self.size if end is None else min(end, self.size)
+        frame = bisect.bisect_right(self.raw_offsets, start) - 1
+        while start < end and frame < len(self.raw_offsets) - 1:
+            raw = self.decompressor.decompress(
+                self._read(self.compressed_offsets[frame], self.compressed_offsets[frame + 1]),
+                max_output_size=self.raw_offsets[frame + 1] - self.raw_offsets[frame],
+            )
+            base = self.raw_offsets[frame]
+            piece = raw[start - base:end - base]
+            yield piece
+            start += len(piece)
+            frame += 1
@@ -0,0 +1,223 @@
+import os
+
+# ===============================================================
+# ⚙️ Runtime Configuration
+# ===============================================================
+# Every setting can be overridden with a JIRAMS_* environment variable
+# so several app nodes can share one configuration.
+
+
+def _env(name: str, default: str) -> str:
+    return os.getenv(f"JIRAMS_{name}", default)
+
+
+# ===============================================================
+# 📦 File Storage
+# ===============================================================
+STORAGE_BACKEND = _env("STORAGE_BACKEND", "local")  # "local" or "s3"
+
+# Local driver: root directory for sharded blobs
+STORAGE_ROOT = _env("STORAGE_ROOT", "storage")
+
+# S3-compatible driver
+S3_BUCKET = _env("S3_BUCKET", "jirams")
+S3_PREFIX = _env("S3_PREFIX", "")
+S3_ENDPOINT_URL = _env("S3_ENDPOINT_URL", "") or None  # e.g. http://localhost:9000
+S3_REGION = _env("S3_REGION", "us-east-1")
+
+# Chunk size used when streaming uploads and downloads
+STORAGE_CHUNK_SIZE = int(_env("STORAGE_CHUNK_SIZE", str(1024 * 1024)))
+# S3 multipart part size (S3 requires >= 5 MiB for every part but the last)
+S3_PART_SIZE = int(_env("S3_PART_SIZE", str(8 * 1024 * 1024)))
+
+# ===============================================================
+# 🧹 Storage Scrubber
+# ===============================================================
+SCRUB_ENABLED = _env("SCRUB_ENABLED", "1") == "1"
+SCRUB_MODE = _env("SCRUB_MODE", "report")  # "report" or "quarantine"
+SCRUB_INTERVAL_SECONDS = float(_env("SCRUB_INTERVAL_SECONDS", str(6 * 3600)))
+SCRUB_BATCH_SIZE = int(_env("SCRUB_BATCH_SIZE", "200"))
+# Read budget for hashing blobs, so scrubbing never starves serving I/O
+SCRUB_BYTES_PER_SECOND = int(_env("SCRUB_BYTES_PER_SECOND", str(8 * 1024 * 1024)))
+# Pause between batches of rows or keys
+SCRUB_BATCH_PAUSE_SECONDS = float(_env("SCRUB_BATCH_PAUSE_SECONDS", "0.5"))
+# Blobs younger than this may belong to an upload whose row is not committed yet
+SCRUB_ORPHAN_GRACE_SECONDS = float(_env("SCRUB_ORPHAN_GRACE_SECONDS", "3600"))
+
+# ===============================================================
+# 🗜️ At-rest Compression (documents)
+# ===============================================================
+COMPRESSION_ENABLED = _env("COMPRESSION_ENABLED", "1") == "1"
+COMPRESSION_LEVEL = int(_env("COMPRESSION_LEVEL", "6"))
+# Raw bytes per independent zstd frame; a ranged read decompresses at most
+# the frames overlapping the requested range
+COMPRESSION_FRAME_SIZE = int(_env("COMPRESSION_FRAME_SIZE", str(512 * 1024)))
+# Store raw when the first frame does not shrink below this ratio
+COMPRESSION_MIN_RATIO = float(_env("COMPRESSION_MIN_RATIO", "0.9"))
+
+# ===============================================================
+# 🔎 Document Text Extraction
+# ===============================================================
+EXTRACTION_ENABLED = _env("EXTRACTION_ENABLED", "1") == "1"
+EXTRACTION_WORKERS = int(_env("EXTRACTION_WORKERS", "2"))  # default size of the job process pool
+# Extracted text beyond this many characters is not indexed
+EXTRACTION_MAX_CHARS = int(_env("EXTRACTION_MAX_CHARS", str(2_000_000)))
+
+# ===============================================================
+# 🔐 Password Hashing
+# ===============================================================
+PASSWORD_SCHEME = _env("PASSWORD_SCHEME", "bcrypt")  # "bcrypt" or "argon2"
+BCRYPT_ROUNDS = int(_env("BCRYPT_ROUNDS", "12"))
+ARGON2_TIME_COST = int(_env("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_KIB = int(_env("ARGON2_MEMORY_KIB", str(64 * 1024)))
+ARGON2_PARALLELISM = int(_env("ARGON2_PARALLELISM", "1"))
+# Dedicated hashing processes (kept off the request threadpool)
+HASH_WORKERS = int(_env("HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+# Hash jobs allowed in flight / waiting before new logins get 503
+HASH_MAX_CONCURRENCY = int(_env("HASH_MAX_CONCURRENCY", str(HASH_WORKERS * 2)))
+HASH_MAX_QUEUE = int(_env("HASH_MAX_QUEUE", "256"))
+
+# ===============================================================
+# 🎟️ Authentication
+# ===============================================================
+# Decoded access-token claims kept in memory (keyed by token hash)
+TOKEN_CACHE_SIZE = int(_env("TOKEN_CACHE_SIZE", "10000"))
+# Accept the legacy *_email parameters when no bearer token is sent
+AUTH_ALLOW_EMAIL_FALLBACK = _env("AUTH_ALLOW_EMAIL_FALLBACK", "1") == "1"
+
+# ===============================================================
+# 📇 User Directory Cache
+# ===============================================================
+USER_CACHE_SIZE = int(_env("USER_CACHE_SIZE", "50000"))
+USER_CACHE_TTL_SECONDS = float(_env("USER_CACHE_TTL_SECONDS", "300"))
+# Unknown emails are remembered for less time than known ones
+USER_CACHE_NEGATIVE_TTL_SECONDS = float(_env("USER_CACHE_NEGATIVE_TTL_SECONDS", "30"))
+
+# ===============================================================
+# 🔁 Token Lifetimes & Revocation
+# ===============================================================
+ACCESS_TOKEN_EXPIRE_MINUTES = int(_env("ACCESS_TOKEN_EXPIRE_MINUTES", "10"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(_env("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+# Bloom filter sizing for the revocation deny-list
+REVOCATION_BLOOM_CAPACITY = int(_env("REVOCATION_BLOOM_CAPACITY", "100000"))
+REVOCATION_BLOOM_ERROR_RATE = float(_env("REVOCATION_BLOOM_ERROR_RATE", "0.001"))
+# Rebuild from the deny-list table this often (picks up other workers' revocations)
+REVOCATION_RELOAD_SECONDS = float(_env("REVOCATION_RELOAD_SECONDS", "30"))
+
+# ===============================================================
+# 🚦 Rate Limiting
+# ===============================================================
+RATE_LIMIT_ENABLED = _env("RATE_LIMIT_ENABLED", "1") == "1"
+RATE_LIMIT_BACKEND = _env("RATE_LIMIT_BACKEND", "memory")  # "memory" or "redis" (shared by all workers)
+REDIS_URL = _env("REDIS_URL", "redis://localhost:6379/0")
+# "<requests>/<seconds>": bucket size and refill period per client
+RATE_LIMIT_AUTH = _env("RATE_LIMIT_AUTH", "10/60")  # login / register
+RATE_LIMIT_UPLOAD = _env("RATE_LIMIT_UPLOAD", "30/60")  # evidence & document uploads
+RATE_LIMIT_DEFAULT = _env("RATE_LIMIT_DEFAULT", "600/60")  # every other route
+RATE_LIMIT_SHARDS = int(_env("RATE_LIMIT_SHARDS", "16"))
+RATE_LIMIT_MAX_KEYS = int(_env("RATE_LIMIT_MAX_KEYS", "100000"))
+# Only behind a proxy that sets X-Forwarded-For
+RATE_LIMIT_TRUST_FORWARDED = _env("RATE_LIMIT_TRUST_FORWARDED", "0") == "1"
+
+# ===============================================================
+# 👥 Bulk User Import
+# ===============================================================
+USER_IMPORT_MAX_ROWS = int(_env("USER_IMPORT_MAX_ROWS", "5000"))
+
+# ===============================================================
+# 📚 Read Cache (case detail / status, role user lists)
+# ===============================================================
+READ_CACHE_SIZE = int(_env("READ_CACHE_SIZE", "5000"))  # entries per namespace
+READ_CACHE_TTL_SECONDS = float(_env("READ_CACHE_TTL_SECONDS", "120"))
+READ_CACHE_BACKEND = _env("READ_CACHE_BACKEND", "memory")  # "memory" or "redis" (shared, see REDIS_URL)
+
+# ===============================================================
+# 🔔 Push Notifications (SSE / WebSocket)
+# ===============================================================
+NOTIFY_QUEUE_SIZE = int(_env("NOTIFY_QUEUE_SIZE", "100"))  # undelivered events per client before a resync
+NOTIFY_HISTORY_SIZE = int(_env("NOTIFY_HISTORY_SIZE", "1000"))  # events kept for Last-Event-ID replay
+NOTIFY_HEARTBEAT_SECONDS = float(_env("NOTIFY_HEARTBEAT_SECONDS", "25"))
+
+# ===============================================================
+# 📮 Transactional Outbox
+# ===============================================================
+OUTBOX_POLL_SECONDS = float(_env("OUTBOX_POLL_SECONDS", "1"))  # picks up events committed by other workers
+OUTBOX_BATCH_SIZE = int(_env("OUTBOX_BATCH_SIZE", "200"))
+OUTBOX_LEASE_SECONDS = float(_env("OUTBOX_LEASE_SECONDS", "30"))
+OUTBOX_MAX_ATTEMPTS = int(_env("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_RETENTION_HOURS = float(_env("OUTBOX_RETENTION_HOURS", "24"))
+
+# ===============================================================
+# 🧵 Background Jobs
+# ===============================================================
+JOB_THREAD_WORKERS = int(_env("JOB_THREAD_WORKERS", "4"))  # I/O-bound jobs (database, storage, email)
+JOB_PROCESS_WORKERS = int(_env("JOB_PROCESS_WORKERS", str(EXTRACTION_WORKERS)))  # CPU-bound jobs (parsing, rendering)
+JOB_POLL_SECONDS = float(_env("JOB_POLL_SECONDS", "2"))  # picks up jobs enqueued by other workers
+JOB_LEASE_SECONDS = float(_env("JOB_LEASE_SECONDS", "60"))  # renewed while a job runs
+JOB_MAX_ATTEMPTS = int(_env("JOB_MAX_ATTEMPTS", "5"))
+JOB_RETRY_BASE_SECONDS = float(_env("JOB_RETRY_BASE_SECONDS", "5"))  # doubled after every failed attempt
+JOB_RETRY_MAX_SECONDS = float(_env("JOB_RETRY_MAX_SECONDS", "900"))
+JOB_RETENTION_HOURS = float(_env("JOB_RETENTION_HOURS", "72"))
+
+# ===============================================================
+# 🔄 Delta Sync Feed
+# ===============================================================
+SYNC_PAGE_SIZE = int(_env("SYNC_PAGE_SIZE", "500"))  # changes per /sync response unless ?limit= asks for fewer
+SYNC_MAX_PAGE_SIZE = int(_env("SYNC_MAX_PAGE_SIZE", "5000"))
+SYNC_TOMBSTONE_RETENTION_DAYS = float(_env("SYNC_TOMBSTONE_RETENTION_DAYS", "30"))  # older cursors must resync
+
+# ===============================================================
+# ✍️ Single-writer Queue
+# ===============================================================
+WRITER_ENABLED = _env("WRITER_ENABLED", "1") == "1"  # 0 = routes write on the caller's thread
+WRITE_BATCH_SIZE = int(_env("WRITE_BATCH_SIZE", "64"))  # units of work per group commit
+WRITE_BATCH_WINDOW_MS = float(_env("WRITE_BATCH_WINDOW_MS", "2"))  # wait this long for more writes to join a batch
+WRITE_QUEUE_SIZE = int(_env("WRITE_QUEUE_SIZE", "2000"))  # pending writes before callers get a 503
+
+# ===============================================================
+# 🗓️ Hearing Scheduling
+# ===============================================================
+HEARING_DEFAULT_MINUTES = int(_env("HEARING_DEFAULT_MINUTES", "60"))  # length of a hearing that doesn't say
+HEARING_MAX_MINUTES = int(_env("HEARING_MAX_MINUTES", "480"))  # longest bookable hearing; bounds the overlap scan
+# Auto-scheduler: courtrooms it books (comma-separated), sitting hours on weekdays,
+# how soon the first hearing may be and how far ahead it looks
+HEARING_ROOMS = [r.strip() for r in _env("HEARING_ROOMS", "Main Court Room").split(",") if r.strip()]
+HEARING_DAY_START = _env("HEARING_DAY_START", "09:00")
+HEARING_DAY_END = _env("HEARING_DAY_END", "17:00")
+HEARING_LEAD_DAYS = int(_env("HEARING_LEAD_DAYS", "7"))
+HEARING_HORIZON_DAYS = int(_env("HEARING_HORIZON_DAYS", "90"))
+
+# ===============================================================
+# 📅 Calendar Feeds (.ics)
+# ===============================================================
+CALENDAR_PAST_DAYS = int(_env("CALENDAR_PAST_DAYS", "30"))  # how far back a feed reaches
+CALENDAR_CACHE_FEEDS = int(_env("CALENDAR_CACHE_FEEDS", "500"))  # rendered feeds kept per worker
+CALENDAR_MAX_AGE_SECONDS = int(_env("CALENDAR_MAX_AGE_SECONDS", "3600"))  # full re-render (case titles, window)
+
+# ===============================================================
+# ⚖️ Workload Balancing (case assignment)
+# ===============================================================
+# A user's score: open cases, upcoming hearings and pending evidence, weighted
+WORKLOAD_CASE_WEIGHT = float(_env("WORKLOAD_CASE_WEIGHT", "1"))
+WORKLOAD_HEARING_WEIGHT = float(_env("WORKLOAD_HEARING_WEIGHT", "0.5"))
+WORKLOAD_EVIDENCE_WEIGHT = float(_env("WORKLOAD_EVIDENCE_WEIGHT", "0.25"))
+# Full recount this often (hearings that have passed, other workers' deletes)
+WORKLOAD_RELOAD_SECONDS = int(_env("WORKLOAD_RELOAD_SECONDS", "900"))
+
+# ===============================================================
+# 📋 Cause Lists (dockets)
+# ===============================================================
+DOCKET_CACHE_ENTRIES = int(_env("DOCKET_CACHE_ENTRIES", "500"))  # rendered courtroom lists kept per worker
+DOCKET_COURT_NAME = _env("DOCKET_COURT_NAME", "JIRAMS Court")  # heading of printed cause lists
+
+# ===============================================================
+# 🚀 Production Server (serve.py)
+# ===============================================================
+SERVER_HOST = _env("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(_env("SERVER_PORT", "8000"))
+SERVER_WORKERS = int(_env("SERVER_WORKERS", str(os.cpu_count() or 1)))  # worker processes
+SERVER_THREADS = int(_env("SERVER_THREADS", "40"))  # threadpool for sync routes, per worker
+SERVER_GRACEFUL_TIMEOUT = float(_env("SERVER_GRACEFUL_TIMEOUT", "30"))  # in-flight requests get this long on stop/reload
+# Create tables and seed users when app.main is imported; serve.py turns it
+# off and does it once in the master instead
+INIT_ON_IMPORT = _env("INIT_ON_IMPORT", "1") == "1"
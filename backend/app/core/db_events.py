@@ -0,0 +1,149 @@
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, NamedTuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "jirams_committed_changes"
+_FLUSHED_KEY = "jirams_flushed_changes"
+
+
+# ===============================================================
+# 🔔 After-commit Change Hooks
+# ===============================================================
+# Row changes are captured at flush time (while attribute history is still
+# available) and handed to listeners only once the transaction commits, so
+# caches are never invalidated for work that is rolled back. Each change is
+# tagged with the SAVEPOINT it was flushed in: releasing a savepoint hands
+# its changes to the enclosing transaction, rolling one back drops them,
+# and only the outermost COMMIT runs the hooks.
+
+class Change(NamedTuple):
+    op: str  # "insert", "update" or "delete"
+    model: type
+    id: Any
+    values: Dict[str, Any]  # column values after the flush (before it, for deletes)
+    previous: Dict[str, Any]  # old values of the columns an update changed
+
+
+_listeners: Dict[type, List[Callable[[List[Change]], None]]] = defaultdict(list)
+_flush_listeners: Dict[type, List[Callable[[Session, List[Change]], None]]] = defaultdict(list)
+
+
+def on_commit(*models: type):
+    """
+    Decorator registering ``handler(changes)`` to run after every commit
+    that inserted, updated or deleted rows of any of ``models``.
+    """
+    def decorator(handler: Callable[[List[Change]], None]):
+        for model in models:
+            _listeners[model].append(handler)
+        return handler
+    return decorator
+
+
+def on_flush(*models: type):
+    """
+    Decorator registering ``handler(session, changes)`` to run after each
+    flush that touched ``models``, inside the same transaction. Objects the
+    handler adds to the session are flushed before the commit completes.
+    """
+    def decorator(handler: Callable[[Session, List[Change]], None]):
+        for model in models:
+            _flush_listeners[model].append(handler)
+        return handler
+    return decorator
+
+
+def _snapshot(op: str, obj) -> Change:
+    state = inspect(obj)
+    values, previous = {}, {}
+    for attr in state.mapper.column_attrs:
+        history = state.attrs[attr.key].history
+        if op == "update" and history.deleted:
+            previous[attr.key] = history.deleted[0]
+        values[attr.key] = state.dict.get(attr.key)
+    return Change(op, type(obj), state.identity[0] if state.identity else values.get("id"), values, previous)
+
+
+@event.listens_for(Session, "after_flush")
+def _capture(session: Session, flush_context):
+    if not _listeners and not _flush_listeners:
+        return
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    flushed = []
+    for op, objects in (("insert", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for obj in objects:
+            model = type(obj)
+            if model not in _listeners and model not in _flush_listeners:
+                continue
+            if op == "update" and not session.is_modified(obj, include_collections=False):
+                continue
+            change = _snapshot(op, obj)
+            if model in _listeners:
+                pending.append((session.get_nested_transaction(), change))
+            if model in _flush_listeners:
+                flushed.append(change)
+    if flushed:
+        session.info[_FLUSHED_KEY] = flushed
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _run_flush_handlers(session: Session, flush_context):
+    flushed = session.info.pop(_FLUSHED_KEY, None)
+    if not flushed:
+        return
+    by_handler = defaultdict(list)
+    for change in flushed:
+        for handler in _flush_listeners.get(change.model, ()):
+            by_handler[handler].append(change)
+    # Unlike after-commit handlers, a failure here aborts the transaction
+    for handler, changes in by_handler.items():
+        handler(session, changes)
+
+
+def _enclosing_savepoint(savepoint):
+    parent = savepoint.parent
+    while parent is not None and not parent.nested:
+        parent = parent.parent
+    return parent
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch(session: Session):
+    savepoint = session.get_nested_transaction()
+    if savepoint is not None:
+        # RELEASE SAVEPOINT: nothing is visible to other connections yet
+        enclosing = _enclosing_savepoint(savepoint)
+        pending = session.info.get(_PENDING_KEY, ())
+        for i, (tag, change) in enumerate(pending):
+            if tag is savepoint:
+                pending[i] = (enclosing, change)
+        return
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    by_handler = defaultdict(list)
+    for _, change in pending:
+        for handler in _listeners.get(change.model, ()):
+            by_handler[handler].append(change)
+    for handler, changes in by_handler.items():
+        try:
+            handler(changes)
+        except Exception:
+            logger.exception("After-commit handler %s failed", getattr(handler, "__name__", handler))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session: Session):
+    savepoint = session.get_nested_transaction()
+    if savepoint is None:
+        session.info.pop(_PENDING_KEY, None)
+    elif _PENDING_KEY in session.info:
+        # ROLLBACK TO SAVEPOINT: drop that unit's changes, keep the rest of the batch
+        session.info[_PENDING_KEY] = [
+            (tag, change) for tag, change in session.info[_PENDING_KEY] if tag is not savepoint
+        ]
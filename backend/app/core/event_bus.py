@@ -0,0 +1,212 @@
+import asyncio
+import itertools
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set
+
+from app.core import config
+from app.core.identity import Principal
+
+
+# ===============================================================
+# 📣 Events
+# ===============================================================
+class Event(NamedTuple):
+    id: int
+    type: str  # e.g. "case.updated", "hearing.rescheduled"
+    case_id: Optional[int]
+    data: Dict[str, Any]
+    user_ids: FrozenSet[int]  # users who may see it
+    roles: FrozenSet[str]  # roles that see it for every case
+    at: float
+
+    def visible_to(self, principal: Principal) -> bool:
+        return principal.id in self.user_ids or principal.role in self.roles
+
+    def as_message(self) -> dict:
+        return {"id": self.id, "type": self.type, "case_id": self.case_id, "data": self.data, "at": self.at}
+
+
+RESYNC = "resync"  # sent instead of events a slow client missed
+
+
+# ===============================================================
+# 📬 Subscriptions
+# ===============================================================
+class Subscription:
+    """
+    One connected client. Holds at most ``maxsize`` undelivered events;
+    when a client falls further behind, its backlog is dropped and it is
+    told to resync (refetch) instead, so publishers never block and a stuck
+    connection costs bounded memory.
+    """
+
+    __slots__ = ("principal", "maxsize", "pending", "wakeup", "last_id", "lagged", "dropped", "delivered")
+
+    def __init__(self, principal: Principal, maxsize: int):
+        self.principal = principal
+        self.maxsize = maxsize
+        self.pending: deque = deque()
+        self.wakeup = asyncio.Event()
+        self.last_id = 0
+        self.lagged = False
+        self.dropped = 0
+        self.delivered = 0
+
+    def offer(self, event: Event):
+        if len(self.pending) >= self.maxsize:
+            self.dropped += len(self.pending)
+            self.pending.clear()
+            self.lagged = True
+        self.pending.append(event)
+        self.wakeup.set()
+
+    async def next_batch(self, timeout: float) -> Optional[List[dict]]:
+        """
+        Messages ready for this client, or ``None`` after ``timeout``
+        seconds of silence (time for a heartbeat).
+        """
+        if not self.pending and not self.lagged:
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+        messages = []
+        if self.lagged:
+            self.lagged = False
+            messages.append({"id": self.last_id, "type": RESYNC, "case_id": None, "data": {}, "at": time.time()})
+        while self.pending:
+            event = self.pending.popleft()
+            if event.id > self.last_id:  # replayed history may overlap live events
+                self.last_id = event.id
+                messages.append(event.as_message())
+        self.delivered += len(messages)
+        return messages
+
+
+# ===============================================================
+# 🚌 Event Bus
+# ===============================================================
+class EventBus:
+    """
+    In-process fan-out of domain events to connected clients.
+
+    ``publish`` may be called from any thread (commit hooks run in the
+    request's worker thread); delivery happens on the event loop. Clients
+    are indexed by user id and role so an event only touches the
+    connections allowed to see it, however many idle ones are open. The
+    last ``history`` events are kept for ``Last-Event-ID`` replay.
+    """
+
+    def __init__(self, queue_size: int = config.NOTIFY_QUEUE_SIZE, history: int = config.NOTIFY_HISTORY_SIZE):
+        self.queue_size = queue_size
+        self.history: deque = deque(maxlen=history)
+        self.instance = uuid.uuid4().hex[:8]  # event ids are only meaningful within one process
+        self._by_user: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._by_role: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.published = 0
+
+    # -----------------------------------------------------------
+    # Publishing
+    # -----------------------------------------------------------
+    def publish(
+        self,
+        type: str,
+        case_id: Optional[int],
+        data: Dict[str, Any],
+        user_ids: Iterable[Optional[int]] = (),
+        roles: Iterable[str] = (),
+    ) -> Event:
+        with self._lock:
+            event = Event(
+                id=next(self._ids),
+                type=type,
+                case_id=case_id,
+                data=data,
+                user_ids=frozenset(u for u in user_ids if u is not None),
+                roles=frozenset(roles),
+                at=time.time(),
+            )
+            self.history.append(event)
+            self.published += 1
+            loop = self._loop
+        if loop is None or loop.is_closed():
+            return event  # nobody connected yet; replay still has it
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver(event)
+        else:
+            loop.call_soon_threadsafe(self._deliver, event)
+        return event
+
+    def _deliver(self, event: Event):
+        targets = set()
+        for user_id in event.user_ids:
+            targets |= self._by_user.get(user_id, set())
+        for role in event.roles:
+            targets |= self._by_role.get(role, set())
+        for subscription in targets:
+            subscription.offer(event)
+
+    # -----------------------------------------------------------
+    # Subscribing (event loop only)
+    # -----------------------------------------------------------
+    def subscribe(self, principal: Principal, last_event_id: Optional[int] = None) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(principal, self.queue_size)
+        self._by_user[principal.id].add(subscription)
+        self._by_role[principal.role].add(subscription)
+
+        if last_event_id is not None:
+            subscription.last_id = last_event_id
+            with self._lock:
+                missed = [e for e in self.history if e.id > last_event_id]
+                oldest = self.history[0].id if self.history else None
+            if oldest is not None and oldest > last_event_id + 1:
+                subscription.lagged = True  # part of the gap is no longer in history
+            for event in missed:
+                if event.visible_to(principal):
+                    subscription.offer(event)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for index, key in ((self._by_user, subscription.principal.id), (self._by_role, subscription.principal.role)):
+            members = index.get(key)
+            if members is not None:
+                members.discard(subscription)
+                if not members:
+                    del index[key]
+
+    def stats(self) -> dict:
+        subscriptions = set().union(*self._by_user.values()) if self._by_user else set()
+        return {
+            "connections": len(subscriptions),
+            "users": len(self._by_user),
+            "published": self.published,
+            "history": len(self.history),
+            "backlog": sum(len(s.pending) for s in subscriptions),
+            "dropped": sum(s.dropped for s in subscriptions),
+        }
+
+
+event_bus = EventBus()
+
+
+def _reset_after_fork():
+    # Forked workers must not share event ids (Last-Event-ID) with each other
+    event_bus.instance = uuid.uuid4().hex[:8]
+    event_bus.history.clear()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
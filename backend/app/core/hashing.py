@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+import hmac
+import multiprocessing
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, List, Optional, Tuple
+
+import bcrypt
+from fastapi import HTTPException
+
+from app.core import config
+
+try:
+    from argon2 import PasswordHasher as Argon2Hasher
+    from argon2.exceptions import InvalidHashError, VerifyMismatchError
+except ImportError:  # pragma: no cover - optional dependency
+    Argon2Hasher = None
+
+# ===============================================================
+# 🔐 Password Hash Schemes
+# ===============================================================
+# Stored hashes are self-describing:
+#   $2b$...      bcrypt
+#   $argon2id$.. argon2
+#   64 hex chars legacy unsalted SHA-256 (upgraded on next successful login)
+
+_LEGACY_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+_BCRYPT_MAX_BYTES = 72  # bcrypt ignores (bcrypt>=5 rejects) anything longer
+
+
+def _argon2() -> "Argon2Hasher":
+    if Argon2Hasher is None:
+        raise RuntimeError("The argon2 password scheme requires argon2-cffi")
+    return Argon2Hasher(
+        time_cost=config.ARGON2_TIME_COST,
+        memory_cost=config.ARGON2_MEMORY_KIB,
+        parallelism=config.ARGON2_PARALLELISM,
+    )
+
+
+def is_legacy_hash(hashed: str) -> bool:
+    return bool(_LEGACY_SHA256.match(hashed or ""))
+
+
+def hash_password_sync(password: str) -> str:
+    """Hash with the configured scheme and cost (CPU-bound: run it in the pool)."""
+    if config.PASSWORD_SCHEME == "argon2":
+        return _argon2().hash(password)
+    salt = bcrypt.gensalt(rounds=config.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode()[:_BCRYPT_MAX_BYTES], salt).decode()
+
+
+def verify_password_sync(password: str, hashed: str) -> bool:
+    """Verify against any supported scheme, including legacy SHA-256."""
+    if not hashed:
+        return False
+    if hashed.startswith("$2"):
+        return bcrypt.checkpw(password.encode()[:_BCRYPT_MAX_BYTES], hashed.encode())
+    if hashed.startswith("$argon2"):
+        try:
+            return _argon2().verify(hashed, password)
+        except (VerifyMismatchError, InvalidHashError):
+            return False
+    if is_legacy_hash(hashed):
+        candidate = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(candidate, hashed)
+    return False
+
+
+def needs_rehash(hashed: str) -> bool:
+    """True when a hash uses another scheme or cost than the configured one."""
+    if config.PASSWORD_SCHEME == "argon2":
+        return not hashed.startswith("$argon2") or _argon2().check_needs_rehash(hashed)
+    if not hashed.startswith("$2"):
+        return True
+    return int(hashed.split("$")[2]) != config.BCRYPT_ROUNDS
+
+
+def verify_and_check(password: str, hashed: str) -> Tuple[bool, bool]:
+    """Return ``(valid, needs_rehash)`` in one round trip to the pool."""
+    valid = verify_password_sync(password, hashed)
+    return valid, valid and needs_rehash(hashed)
+
+
+def hash_batch(passwords: List[str]) -> List[str]:
+    return [hash_password_sync(password) for password in passwords]
+
+
+# ===============================================================
+# ⚙️ Non-blocking Hashing Service
+# ===============================================================
+class PasswordHasher:
+    """
+    Runs bcrypt/argon2 in a dedicated, bounded process pool so bursts of
+    logins neither block the event loop nor pin the threadpool that sync
+    routes run on.
+
+    At most ``max_concurrency`` hash jobs are in flight; up to ``max_queue``
+    more may wait for a slot, after which callers get a 503 with
+    ``Retry-After`` instead of queueing without bound.
+    """
+
+    def __init__(
+        self,
+        workers: int = config.HASH_WORKERS,
+        max_concurrency: int = config.HASH_MAX_CONCURRENCY,
+        max_queue: int = config.HASH_MAX_QUEUE,
+    ):
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._waiting = 0
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[loop]
+
+    async def _run(self, fn, *args):
+        if self._waiting >= self.max_concurrency + self.max_queue:
+            raise HTTPException(
+                status_code=503,
+                detail="Authentication service busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        self._waiting += 1
+        try:
+            async with self._semaphore():
+                return await asyncio.wrap_future(self._executor().submit(fn, *args))
+        finally:
+            self._waiting -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password_sync, password)
+
+    async def hash_many(self, passwords: List[str], batch_size: int = 4) -> AsyncIterator[Tuple[int, List[str]]]:
+        """
+        Hash a large list (bulk imports), yielding ``(offset, hashes)`` as
+        batches finish. At most one batch per worker is in flight so logins
+        still get a pool slot between batches.
+        """
+        batches = [(i, passwords[i:i + batch_size]) for i in range(0, len(passwords), batch_size)]
+        batches.reverse()
+        pending = {}
+        try:
+            while batches or pending:
+                while batches and len(pending) < self.workers:
+                    offset, batch = batches.pop()
+                    pending[asyncio.ensure_future(self._run(hash_batch, batch))] = offset
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield pending.pop(task), task.result()
+        finally:
+            for task in pending:  # consumer went away (e.g. client disconnected)
+                task.cancel()
+
+    async def verify(self, password: str, hashed: str) -> Tuple[bool, bool]:
+        """Return ``(valid, needs_rehash)``."""
+        if is_legacy_hash(hashed):
+            # Unsalted SHA-256 is cheap; no need for a trip to the pool
+            return verify_and_check(password, hashed)
+        return await self._run(verify_and_check, password, hashed)
+
+    def warm_up(self):
+        """Start the worker processes ahead of the first login."""
+        pool = self._executor()
+        for _ in range(self.workers):
+            pool.submit(needs_rehash, "")
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+password_hasher = PasswordHasher()
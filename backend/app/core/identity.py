@@ -0,0 +1,138 @@
+import hashlib
+from typing import NamedTuple, Optional
+
+import jwt
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.orm import Session
+
+from app.core import config, outbox
+from app.core.cache import MISSING, TTLCache
+from app.core.revocation import revocations
+from app.core.security import ALGORITHM, SECRET_KEY
+from app.core.user_directory import user_directory
+
+# ===============================================================
+# 🪪 Authenticated Principal
+# ===============================================================
+class Principal(NamedTuple):
+    """Identity carried by a verified access token (no DB row needed)."""
+    id: int
+    email: str
+    role: str
+    token_id: Optional[str] = None  # jti claim
+    issued_at: Optional[int] = None  # iat claim
+
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+# Verified claims keyed by SHA-256 of the raw token; each entry expires
+# together with the token's own ``exp`` claim.
+token_cache = TTLCache(maxsize=config.TOKEN_CACHE_SIZE)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def verify_token(token: str) -> Principal:
+    """Verify an access token, serving repeat presentations from memory."""
+    key = hashlib.sha256(token.encode()).digest()
+    principal = token_cache.get(key)
+    if principal is not MISSING:
+        return principal
+
+    try:
+        claims = jwt.decode(
+            token,
+            SECRET_KEY,
+            algorithms=[ALGORITHM],
+            options={"require": ["exp", "sub"]},
+        )
+    except jwt.ExpiredSignatureError:
+        raise _unauthorized("Token has expired")
+    except jwt.InvalidTokenError:
+        raise _unauthorized("Invalid authentication token")
+
+    if "uid" not in claims:
+        raise _unauthorized("Token is missing the user id, please log in again")
+
+    roles = claims.get("roles") or []
+    principal = Principal(
+        id=int(claims["uid"]),
+        email=claims["sub"],
+        role=roles[0] if roles else "",
+        token_id=claims.get("jti"),
+        issued_at=claims.get("iat"),
+    )
+    token_cache.set(key, principal, expires_at=claims["exp"])
+    return principal
+
+
+def authenticate(token: str) -> Principal:
+    """``verify_token`` plus the revocation check every request gets."""
+    principal = verify_token(token)
+    if revocations.is_revoked(principal.id, principal.token_id, principal.issued_at):
+        raise _unauthorized("Token has been revoked")
+    return principal
+
+
+# ===============================================================
+# 🔌 FastAPI Dependencies
+# ===============================================================
+async def get_optional_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> Optional[Principal]:
+    """The caller's principal, or ``None`` when no bearer token was sent."""
+    if credentials is None:
+        return None
+    return authenticate(credentials.credentials)
+
+
+async def get_current_user(
+    principal: Optional[Principal] = Depends(get_optional_user),
+) -> Principal:
+    """Require a valid bearer token."""
+    if principal is None:
+        raise _unauthorized("Not authenticated")
+    return principal
+
+
+def require_role(*roles: str):
+    """Dependency factory: a valid token whose role is one of ``roles``."""
+    async def dependency(principal: Principal = Depends(get_current_user)) -> Principal:
+        if principal.role not in roles:
+            raise HTTPException(status_code=403, detail="Insufficient role for this action")
+        return principal
+    return dependency
+
+
+def resolve_caller(
+    db: Session,
+    principal: Optional[Principal],
+    email: Optional[str],
+    not_found: str = "User not found",
+) -> Principal:
+    """
+    Identify the caller of routes that still accept a ``*_email`` parameter.
+
+    A bearer token always wins; the email lookup is kept for older clients
+    while ``AUTH_ALLOW_EMAIL_FALLBACK`` is enabled and is served from the
+    user directory cache. Domain events recorded through ``db`` are
+    attributed to the caller.
+    """
+    if principal is None:
+        if not email or not config.AUTH_ALLOW_EMAIL_FALLBACK:
+            raise _unauthorized("Not authenticated")
+        user = user_directory.lookup(db, email)
+        if not user:
+            raise HTTPException(status_code=404, detail=not_found)
+        if not user.is_active:
+            raise HTTPException(status_code=403, detail="Account is disabled")
+        principal = Principal(id=user.id, email=user.email, role=user.role)
+    outbox.set_actor(db, principal.id, principal.email)
+    return principal
@@ -0,0 +1,442 @@
+import json
+import logging
+import multiprocessing
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import event, func, or_, and_, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from app.core import config
+from app.database import SessionLocal
+from app.models import Job
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+_WAKE_KEY = "jirams_wake_job_runner"
+
+
+# ===============================================================
+# 🧾 Job Handlers
+# ===============================================================
+class JobHandler(NamedTuple):
+    kind: str
+    func: Callable[[Dict[str, Any]], Any]
+    pool: str  # "thread" or "process"
+    max_attempts: int
+
+
+_handlers: Dict[str, JobHandler] = {}
+
+
+def handler(kind: str, pool: str = "thread", max_attempts: int = config.JOB_MAX_ATTEMPTS):
+    """
+    Decorator registering ``func(payload) -> result`` for jobs of ``kind``.
+
+    ``pool="process"`` runs it in a worker process (CPU-bound parsing,
+    rendering); it must then be a module-level function and open its own
+    database session. Jobs may run more than once (retries, an expired
+    lease), so handlers must be idempotent.
+    """
+    if pool not in ("thread", "process"):
+        raise ValueError(f"Unknown job pool {pool!r}")
+
+    def decorator(func):
+        _handlers[kind] = JobHandler(kind, func, pool, max_attempts)
+        return func
+    return decorator
+
+
+# ===============================================================
+# ➕ Enqueueing
+# ===============================================================
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    priority: int = 0,
+    dedupe_key: Optional[str] = None,
+    run_after: Optional[datetime] = None,
+    created_by_id: Optional[int] = None,
+) -> int:
+    """
+    Add a job in the caller's transaction and return its id. While a job
+    with the same ``dedupe_key`` is queued or running, that job's id is
+    returned instead of creating a second one.
+    """
+    spec = _handlers.get(kind)
+    now = datetime.utcnow()
+    values = dict(
+        kind=kind,
+        payload=json.dumps(payload or {}, default=str),
+        status=QUEUED,
+        priority=priority,
+        dedupe_key=dedupe_key,
+        attempts=0,
+        max_attempts=spec.max_attempts if spec else config.JOB_MAX_ATTEMPTS,
+        run_after=run_after or now,
+        created_by_id=created_by_id,
+        created_at=now,
+    )
+    statement = insert(Job).values(**values).returning(Job.id)
+    if dedupe_key is not None:
+        statement = statement.on_conflict_do_nothing(
+            index_elements=["dedupe_key"], index_where=Job.status.in_((QUEUED, RUNNING))
+        )
+    job_id = db.execute(statement).scalar()
+    if job_id is None:
+        job_id = db.execute(
+            select(Job.id).where(Job.dedupe_key == dedupe_key, Job.status.in_((QUEUED, RUNNING)))
+        ).scalar()
+    # Core inserts skip the commit hooks; wake the runner once this commits.
+    # One listener per session, however many jobs it enqueues.
+    if _WAKE_KEY not in db.info:
+        event.listen(db, "after_commit", _wake_runner)
+    db.info[_WAKE_KEY] = True
+    return job_id
+
+
+def _wake_runner(session: Session):
+    # after_commit also fires when a SAVEPOINT is released
+    if not session.in_nested_transaction() and session.info.get(_WAKE_KEY):
+        session.info[_WAKE_KEY] = False
+        runner.wake()
+
+
+def submit(kind: str, payload: Optional[Dict[str, Any]] = None, **options) -> int:
+    """``enqueue`` in a transaction of its own."""
+    db = SessionLocal()
+    try:
+        job_id = enqueue(db, kind, payload, **options)
+        db.commit()
+        return job_id
+    finally:
+        db.close()
+
+
+def _backoff(attempts: int) -> float:
+    base = config.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+    return min(base, config.JOB_RETRY_MAX_SECONDS) * random.uniform(0.8, 1.2)
+
+
+# ===============================================================
+# 🏃 Runner
+# ===============================================================
+class ClaimedJob(NamedTuple):
+    id: int
+    kind: str
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+
+
+class JobRunner:
+    """
+    Pool of slot threads that claim jobs from the ``jobs`` table.
+
+    Each slot claims one runnable job with a single ``UPDATE ... RETURNING``
+    (so workers in other processes never get the same job), runs it on the
+    thread or process executor its handler asks for, and renews the lease
+    while it runs. A job whose worker died is reclaimed once its lease
+    expires, or failed if that was its last attempt. Failures are retried
+    with exponential backoff until ``max_attempts``; a worker process that
+    dies takes its pool down with it, so the process pool is then replaced.
+    """
+
+    def __init__(
+        self,
+        threads: int = config.JOB_THREAD_WORKERS,
+        processes: int = config.JOB_PROCESS_WORKERS,
+        poll_interval: float = config.JOB_POLL_SECONDS,
+        lease_seconds: float = config.JOB_LEASE_SECONDS,
+        session_factory=SessionLocal,
+    ):
+        self.threads = threads
+        self.processes = processes
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.session_factory = session_factory
+        self.name = f"{socket.gethostname()}:{os.getpid()}"  # refreshed in start(), after a fork
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._slots: List[threading.Thread] = []
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._purged_at = 0.0
+        self._abandoned_at = 0.0
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+
+    # -----------------------------------------------------------
+    # Lifecycle
+    # -----------------------------------------------------------
+    def start(self):
+        if self._slots:
+            return
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._stopping.clear()
+        if self.threads:
+            self._thread_pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="job")
+        if self.processes:
+            self._process_pool = self._new_process_pool()
+        for pool, count in (("thread", self.threads), ("process", self.processes)):
+            for index in range(count):
+                slot = threading.Thread(
+                    target=self._slot, args=(pool,), name=f"job-{pool}-{index}", daemon=True
+                )
+                slot.start()
+                self._slots.append(slot)
+        logger.info("Job runner started (%s thread, %s process workers)", self.threads, self.processes)
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        self._wakeup.set()
+        for slot in self._slots:
+            slot.join(timeout)
+        self._slots = []
+        for pool in (self._thread_pool, self._process_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._thread_pool = self._process_pool = None
+
+    def wake(self):
+        self._wakeup.set()
+
+    def _new_process_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context("spawn"))
+
+    def _replace_process_pool(self, broken: ProcessPoolExecutor) -> Optional[ProcessPoolExecutor]:
+        """Swap a broken process pool for a fresh one (once, whichever slot notices first)."""
+        with self._lock:
+            if self._process_pool is broken and not self._stopping.is_set():
+                logger.warning("Job process pool broke (a worker died); starting a new one")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._process_pool = self._new_process_pool()
+            return self._process_pool
+
+    # -----------------------------------------------------------
+    # Slots
+    # -----------------------------------------------------------
+    def _kinds(self, pool: str) -> List[str]:
+        return [kind for kind, spec in _handlers.items() if spec.pool == pool]
+
+    def _slot(self, pool: str):
+        while not self._stopping.is_set():
+            try:
+                job = self.claim(self._kinds(pool))
+            except Exception:
+                logger.exception("Claiming a job failed")
+                job = None
+            if job is None:
+                self._housekeeping()
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            try:
+                self._execute(job, pool)
+            except Exception:
+                # e.g. the pools closed during shutdown; the lease hands it on
+                logger.exception("Running job %s failed", job.id)
+
+    def _housekeeping(self):
+        now = time.monotonic()
+        with self._lock:
+            # A lease only expires every lease_seconds, so look that often
+            abandoned = now - self._abandoned_at >= self.lease_seconds
+            if abandoned:
+                self._abandoned_at = now
+            purge = now - self._purged_at >= 3600
+            if purge:
+                self._purged_at = now
+        if abandoned:
+            try:
+                self.fail_abandoned()
+            except Exception:
+                logger.exception("Failing abandoned jobs failed")
+        if purge:
+            try:
+                self.purge()
+            except Exception:
+                logger.exception("Purging finished jobs failed")
+
+    def claim(self, kinds: List[str]) -> Optional[ClaimedJob]:
+        if not kinds:
+            return None
+        now = datetime.utcnow()
+        runnable = (
+            select(Job.id)
+            .where(
+                Job.kind.in_(kinds),
+                or_(
+                    and_(Job.status == QUEUED, Job.run_after <= now),
+                    and_(  # worker died, attempts left
+                        Job.status == RUNNING, Job.lease_until < now, Job.attempts < Job.max_attempts
+                    ),
+                ),
+            )
+            .order_by(Job.priority.desc(), Job.run_after, Job.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        db = self.session_factory()
+        try:
+            row = db.execute(
+                update(Job)
+                .where(Job.id == runnable)
+                .values(
+                    status=RUNNING,
+                    attempts=Job.attempts + 1,
+                    lease_until=now + timedelta(seconds=self.lease_seconds),
+                    worker=self.name,
+                    started_at=now,
+                )
+                .returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts)
+                .execution_options(synchronize_session=False)
+            ).first()
+            db.commit()
+        finally:
+            db.close()
+        if row is None:
+            return None
+        return ClaimedJob(row.id, row.kind, json.loads(row.payload), row.attempts, row.max_attempts)
+
+    def _execute(self, job: ClaimedJob, pool: str):
+        spec = _handlers[job.kind]
+        executor = self._process_pool if pool == "process" else self._thread_pool
+        try:
+            future = executor.submit(spec.func, job.payload)
+        except BrokenProcessPool:
+            # Broken by another job's worker; run this one on the new pool
+            executor = self._replace_process_pool(executor)
+            future = executor.submit(spec.func, job.payload)
+        renew_every = max(1.0, self.lease_seconds / 3)
+        while True:
+            try:
+                result = future.result(timeout=renew_every)
+                break
+            except FutureTimeout:
+                self._update(job.id, lease_until=datetime.utcnow() + timedelta(seconds=self.lease_seconds))
+            except BrokenProcessPool as exc:
+                self._replace_process_pool(executor)
+                self._failed(job, exc)
+                return
+            except Exception as exc:
+                self._failed(job, exc)
+                return
+        self._update(
+            job.id,
+            status=SUCCEEDED,
+            result=json.dumps(result, default=str) if result is not None else None,
+            last_error=None,
+            lease_until=None,
+            finished_at=datetime.utcnow(),
+        )
+        with self._lock:
+            self.completed += 1
+
+    def _failed(self, job: ClaimedJob, exc: Exception):
+        error = f"{type(exc).__name__}: {exc}"
+        if job.attempts >= job.max_attempts:
+            logger.error("Job %s (%s) failed for good: %s", job.id, job.kind, error)
+            self._update(job.id, status=FAILED, last_error=error, lease_until=None, finished_at=datetime.utcnow())
+            with self._lock:
+                self.failed += 1
+            return
+        delay = _backoff(job.attempts)
+        logger.warning("Job %s (%s) failed, retrying in %.0fs: %s", job.id, job.kind, delay, error)
+        self._update(
+            job.id,
+            status=QUEUED,
+            last_error=error,
+            lease_until=None,
+            run_after=datetime.utcnow() + timedelta(seconds=delay),
+        )
+        with self._lock:
+            self.retried += 1
+
+    def _update(self, job_id: int, **values):
+        db = self.session_factory()
+        try:
+            db.query(Job).filter(Job.id == job_id, Job.worker == self.name).update(
+                values, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    # -----------------------------------------------------------
+    # Housekeeping
+    # -----------------------------------------------------------
+    def fail_abandoned(self) -> int:
+        """Fail jobs whose worker died during their last allowed attempt."""
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            failed = (
+                db.query(Job)
+                .filter(Job.status == RUNNING, Job.lease_until < now, Job.attempts >= Job.max_attempts)
+                .update(
+                    dict(
+                        status=FAILED,
+                        last_error="Worker lost on the last attempt (lease expired)",
+                        lease_until=None,
+                        finished_at=now,
+                    ),
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+        if failed:
+            logger.error("%s job(s) failed for good: worker lost on the last attempt", failed)
+            with self._lock:
+                self.failed += failed
+        return failed
+
+    def purge(self, older_than: timedelta = timedelta(hours=config.JOB_RETENTION_HOURS)) -> int:
+        """Delete finished jobs past the retention window."""
+        db = self.session_factory()
+        try:
+            deleted = (
+                db.query(Job)
+                .filter(Job.status.in_((SUCCEEDED, FAILED)), Job.finished_at < datetime.utcnow() - older_than)
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        db = self.session_factory()
+        try:
+            counts = dict(db.query(Job.status, func.count(Job.id)).group_by(Job.status).all())
+        finally:
+            db.close()
+        return {
+            "worker": self.name,
+            "running": bool(self._slots),
+            "thread_workers": self.threads,
+            "process_workers": self.processes,
+            "jobs": {status: counts.get(status, 0) for status in (QUEUED, RUNNING, SUCCEEDED, FAILED)},
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "kinds": {kind: spec.pool for kind, spec in sorted(_handlers.items())},
+        }
+
+
+runner = JobRunner()
@@ -0,0 +1,369 @@
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.core import config
+from app.core.db_events import on_commit
+from app.database import SessionLocal
+from app.models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+# Domain event types
+CASE_FILED = "CaseFiled"
+CASE_UPDATED = "CaseUpdated"  # title, description, category, notes or filer ("changed" lists which)
+CASE_STATUS_CHANGED = "CaseStatusChanged"
+CASE_ASSIGNED = "CaseAssigned"
+CASE_NOTE_ADDED = "CaseNoteAdded"
+CASE_DELETED = "CaseDeleted"
+EVIDENCE_UPLOADED = "EvidenceUploaded"
+EVIDENCE_REVIEWED = "EvidenceReviewed"
+HEARING_SCHEDULED = "HearingScheduled"
+HEARING_UPDATED = "HearingUpdated"
+HEARING_CANCELLED = "HearingCancelled"
+PAYMENT_RECORDED = "PaymentRecorded"
+
+_ACTOR_KEY = "jirams_actor"
+
+
+class DomainEvent(NamedTuple):
+    id: int
+    type: str
+    entity: str
+    entity_id: Optional[int]
+    case_id: Optional[int]
+    actor_id: Optional[int]
+    payload: Dict[str, Any]
+    created_at: datetime
+
+
+# ===============================================================
+# ✍️ Recording (inside the caller's transaction)
+# ===============================================================
+def set_actor(db: Session, user_id: Optional[int], email: Optional[str] = None):
+    """Attribute events recorded by this session to ``user_id`` (``None`` clears it)."""
+    if user_id is None:
+        db.info.pop(_ACTOR_KEY, None)
+    else:
+        db.info[_ACTOR_KEY] = (user_id, email)
+
+
+def record(
+    db: Session,
+    type: str,
+    entity: str,
+    entity_id: Optional[int],
+    case_id: Optional[int] = None,
+    payload: Optional[Dict[str, Any]] = None,
+):
+    """Queue a domain event; it is stored only if the transaction commits."""
+    actor_id, actor_email = db.info.get(_ACTOR_KEY, (None, None))
+    payload = dict(payload or {})
+    if actor_email:
+        payload.setdefault("actor_email", actor_email)
+    db.add(OutboxEvent(
+        type=type,
+        entity=entity,
+        entity_id=entity_id,
+        case_id=case_id,
+        actor_id=actor_id,
+        payload=json.dumps(payload, default=str),
+        created_at=datetime.utcnow(),
+    ))
+
+
+def _to_event(row) -> DomainEvent:
+    return DomainEvent(
+        id=row.id,
+        type=row.type,
+        entity=row.entity,
+        entity_id=row.entity_id,
+        case_id=row.case_id,
+        actor_id=row.actor_id,
+        payload=json.loads(row.payload),
+        created_at=row.created_at,
+    )
+
+
+_CLAIMED_COLUMNS = (
+    OutboxEvent.id, OutboxEvent.type, OutboxEvent.entity, OutboxEvent.entity_id, OutboxEvent.case_id,
+    OutboxEvent.actor_id, OutboxEvent.payload, OutboxEvent.created_at, OutboxEvent.attempts,
+)
+
+
+# ===============================================================
+# 📬 Subscribers
+# ===============================================================
+Handler = Callable[[List[DomainEvent]], None]
+
+# Broadcast handlers run in every worker (local caches, push connections);
+# exclusive handlers run once per event across all workers (projections,
+# follow-up writes) and are retried until they succeed.
+_broadcast: Dict[str, List[Handler]] = defaultdict(list)
+_exclusive: Dict[str, List[Handler]] = defaultdict(list)
+
+
+def subscribe(*types: str, broadcast: bool = False):
+    """
+    Decorator registering ``handler(events)`` for batches of ``types``.
+    Exclusive handlers are delivered at least once (a batch is retried if
+    any handler fails), so they must be idempotent.
+    """
+    def decorator(handler: Handler):
+        registry = _broadcast if broadcast else _exclusive
+        for event_type in types:
+            registry[event_type].append(handler)
+        return handler
+    return decorator
+
+
+def _run(registry: Dict[str, List[Handler]], events: List[DomainEvent]) -> Optional[str]:
+    """Call each interested handler once with its events; return the first error."""
+    by_handler = defaultdict(list)
+    for event in events:
+        for handler in registry.get(event.type, ()):
+            by_handler[handler].append(event)
+    error = None
+    for handler, batch in by_handler.items():
+        try:
+            handler(batch)
+        except Exception as exc:
+            logger.exception("Outbox subscriber %s failed", getattr(handler, "__name__", handler))
+            error = error or f"{getattr(handler, '__name__', handler)}: {exc}"
+    return error
+
+
+# ===============================================================
+# 🚚 Dispatcher
+# ===============================================================
+class OutboxDispatcher:
+    """
+    Delivers committed outbox rows to subscribers off the request path.
+
+    A commit in this worker wakes the dispatcher at once; rows written by
+    other workers are picked up by polling every ``OUTBOX_POLL_SECONDS``.
+    Broadcast handlers follow an in-memory cursor (SQLite commits rows in
+    id order). Exclusive handlers claim a batch with a lease so only one
+    worker runs them; a failing batch is retried with backoff and parked
+    after ``OUTBOX_MAX_ATTEMPTS``.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        batch_size: int = config.OUTBOX_BATCH_SIZE,
+        poll_interval: float = config.OUTBOX_POLL_SECONDS,
+        lease_seconds: float = config.OUTBOX_LEASE_SECONDS,
+        max_attempts: int = config.OUTBOX_MAX_ATTEMPTS,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.cursor: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._purged_at = 0.0
+        self.broadcast_delivered = 0
+        self.exclusive_delivered = 0
+        self.failures = 0
+
+    # -----------------------------------------------------------
+    # Lifecycle
+    # -----------------------------------------------------------
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run_forever(), name="outbox-dispatcher")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def wake(self):
+        """Thread-safe nudge after a local commit wrote outbox rows."""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wakeup.set)
+
+    async def _run_forever(self):
+        if self.cursor is None:
+            # Caches and connections start empty, so older events are moot
+            self.cursor = await asyncio.to_thread(self._max_id)
+        while True:
+            self._wakeup.clear()
+            try:
+                busy = await asyncio.to_thread(self.dispatch_once)
+            except Exception:
+                logger.exception("Outbox dispatch failed")
+                busy = False
+            if busy:
+                await asyncio.sleep(0)  # drain the backlog, but let requests in
+                continue
+            if time.monotonic() - self._purged_at > 3600:
+                self._purged_at = time.monotonic()
+                try:
+                    await asyncio.to_thread(self.purge)
+                except Exception:
+                    logger.exception("Purging the outbox failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    # -----------------------------------------------------------
+    # One pass (runs in a worker thread)
+    # -----------------------------------------------------------
+    def _max_id(self) -> int:
+        db = self.session_factory()
+        try:
+            return db.query(func.max(OutboxEvent.id)).scalar() or 0
+        finally:
+            db.close()
+
+    def dispatch_once(self) -> bool:
+        """Deliver up to one batch per mode; True if more may be waiting."""
+        if self.cursor is None:
+            self.cursor = self._max_id()
+        busy = self._dispatch_broadcast()
+        return self._dispatch_exclusive() or busy
+
+    def _dispatch_broadcast(self) -> bool:
+        db = self.session_factory()
+        try:
+            rows = (
+                db.query(OutboxEvent)
+                .filter(OutboxEvent.id > self.cursor)
+                .order_by(OutboxEvent.id)
+                .limit(self.batch_size)
+                .all()
+            )
+            events = [_to_event(row) for row in rows]
+        finally:
+            db.close()
+        if not events:
+            return False
+        _run(_broadcast, events)  # best effort: a cache miss or a resync heals it
+        self.cursor = events[-1].id
+        self.broadcast_delivered += len(events)
+        return len(events) == self.batch_size
+
+    def _dispatch_exclusive(self) -> bool:
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            claimable = (
+                select(OutboxEvent.id)
+                .where(
+                    OutboxEvent.dispatched_at.is_(None),
+                    (OutboxEvent.claimed_until.is_(None)) | (OutboxEvent.claimed_until < now),
+                )
+                .order_by(OutboxEvent.id)
+                .limit(self.batch_size)
+            )
+            # One statement claims the batch, so two workers never share it
+            rows = db.execute(
+                update(OutboxEvent)
+                .where(OutboxEvent.id.in_(claimable))
+                .values(claimed_until=now + timedelta(seconds=self.lease_seconds), attempts=OutboxEvent.attempts + 1)
+                .returning(*_CLAIMED_COLUMNS)
+                .execution_options(synchronize_session=False)
+            ).all()
+            db.commit()
+        finally:
+            db.close()
+        if not rows:
+            return False
+
+        rows = sorted(rows, key=lambda r: r.id)
+        events = [_to_event(r) for r in rows]
+        error = _run(_exclusive, events)
+        attempts = max(r.attempts for r in rows)
+        ids = [r.id for r in rows]
+
+        db = self.session_factory()
+        try:
+            query = db.query(OutboxEvent).filter(OutboxEvent.id.in_(ids))
+            if error is None:
+                query.update({"dispatched_at": datetime.utcnow(), "last_error": None}, synchronize_session=False)
+                self.exclusive_delivered += len(rows)
+            elif attempts >= self.max_attempts:
+                # Park the batch; it stays visible in /admin/outbox
+                query.update({"dispatched_at": datetime.utcnow(), "last_error": error}, synchronize_session=False)
+                self.failures += 1
+                logger.error("Giving up on outbox events %s after %s attempts", ids, attempts)
+            else:
+                retry_at = datetime.utcnow() + timedelta(seconds=min(2 ** attempts, 300))
+                query.update({"claimed_until": retry_at, "last_error": error}, synchronize_session=False)
+                self.failures += 1
+            db.commit()
+        finally:
+            db.close()
+        return error is None and len(rows) == self.batch_size
+
+    # -----------------------------------------------------------
+    # Housekeeping
+    # -----------------------------------------------------------
+    def purge(self, older_than: timedelta = timedelta(hours=config.OUTBOX_RETENTION_HOURS)) -> int:
+        """Delete successfully dispatched rows past the retention window."""
+        db = self.session_factory()
+        try:
+            deleted = (
+                db.query(OutboxEvent)
+                .filter(
+                    OutboxEvent.dispatched_at < datetime.utcnow() - older_than,
+                    OutboxEvent.last_error.is_(None),
+                )
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        db = self.session_factory()
+        try:
+            pending = db.query(func.count(OutboxEvent.id)).filter(OutboxEvent.dispatched_at.is_(None)).scalar()
+            failed = (
+                db.query(func.count(OutboxEvent.id))
+                .filter(OutboxEvent.dispatched_at.isnot(None), OutboxEvent.last_error.isnot(None))
+                .scalar()
+            )
+        finally:
+            db.close()
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "cursor": self.cursor,
+            "pending": pending,
+            "failed": failed,
+            "broadcast_delivered": self.broadcast_delivered,
+            "exclusive_delivered": self.exclusive_delivered,
+            "failures": self.failures,
+            "subscribers": {
+                "broadcast": sorted({h.__name__ for hs in _broadcast.values() for h in hs}),
+                "exclusive": sorted({h.__name__ for hs in _exclusive.values() for h in hs}),
+            },
+        }
+
+
+dispatcher = OutboxDispatcher()
+
+
+@on_commit(OutboxEvent)
+def _wake_dispatcher(changes):
+    dispatcher.wake()
@@ -0,0 +1,257 @@
+import logging
+import math
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, NamedTuple, Optional, Pattern, Tuple
+
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+
+from app.core import config
+from app.core.identity import verify_token
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - optional dependency
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+
+# ===============================================================
+# 🚦 Rate Limit Policies
+# ===============================================================
+class RatePolicy(NamedTuple):
+    name: str
+    methods: Optional[Tuple[str, ...]]  # None = any method
+    path: Optional[Pattern]  # None = any path
+    rate: float  # tokens added per second
+    burst: float  # bucket capacity
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.methods is not None and method not in self.methods:
+            return False
+        return self.path is None or bool(self.path.match(path))
+
+
+def parse_rate(spec: str) -> Tuple[float, float]:
+    """``"10/60"`` -> 10 requests per 60 s: (refill rate per second, burst)."""
+    count, seconds = spec.split("/")
+    return float(count) / float(seconds), float(count)
+
+
+def default_policies() -> Tuple[RatePolicy, ...]:
+    """First match wins; the last policy covers every other route."""
+    return (
+        # Each call costs a bcrypt/argon2 hash
+        RatePolicy("auth", ("POST",), re.compile(r"^/auth/(token|register)$"), *parse_rate(config.RATE_LIMIT_AUTH)),
+        # Streams a file to storage
+        RatePolicy(
+            "upload",
+            ("POST",),
+            re.compile(r"^/(evidence|documents)/?$|^/cases/\d+/upload-evidence$"),
+            *parse_rate(config.RATE_LIMIT_UPLOAD),
+        ),
+        RatePolicy("default", None, None, *parse_rate(config.RATE_LIMIT_DEFAULT)),
+    )
+
+
+# ===============================================================
+# 🪣 Token Bucket Backends
+# ===============================================================
+class MemoryBuckets:
+    """
+    Process-local token buckets split over independently locked shards so
+    concurrent requests for different clients never wait on one lock.
+    Each shard keeps at most ``max_keys / shards`` buckets; the least
+    recently used (longest idle, hence already refilled) is dropped first.
+    """
+
+    def __init__(self, shards: int = config.RATE_LIMIT_SHARDS, max_keys: int = config.RATE_LIMIT_MAX_KEYS):
+        self._shards = [(threading.Lock(), OrderedDict()) for _ in range(shards)]
+        self.max_keys_per_shard = max(1, max_keys // shards)
+
+    def take_sync(self, key: str, rate: float, burst: float, cost: float = 1.0) -> Tuple[bool, float]:
+        lock, buckets = self._shards[zlib.crc32(key.encode()) % len(self._shards)]
+        now = time.monotonic()
+        with lock:
+            state = buckets.get(key)
+            if state is None:
+                tokens = burst
+            else:
+                tokens = min(burst, state[0] + (now - state[1]) * rate)
+                buckets.move_to_end(key)
+            if tokens >= cost:
+                allowed, retry_after = True, 0.0
+                tokens -= cost
+            else:
+                allowed, retry_after = False, (cost - tokens) / rate
+            buckets[key] = (tokens, now)
+            if len(buckets) > self.max_keys_per_shard:
+                buckets.popitem(last=False)
+        return allowed, retry_after
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> Tuple[bool, float]:
+        return self.take_sync(key, rate, burst, cost)
+
+    def __len__(self) -> int:
+        return sum(len(buckets) for _lock, buckets in self._shards)
+
+
+# Atomic refill-and-take on the Redis server, using the server clock so
+# every app node agrees on time.
+_REDIS_TAKE = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 't', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 't', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, tostring(retry)}
+"""
+
+
+class RedisBuckets:
+    """
+    Token buckets shared by every worker and node through Redis. If Redis
+    is unreachable requests are let through (and logged) rather than
+    failing the whole API.
+    """
+
+    def __init__(self, url: str = config.REDIS_URL, prefix: str = "jirams:ratelimit:", client=None):
+        if client is None:
+            if aioredis is None:
+                raise RuntimeError("The redis rate limit backend requires the redis package")
+            client = aioredis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(_REDIS_TAKE)
+        self.errors = 0
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> Tuple[bool, float]:
+        try:
+            allowed, retry_after = await self._script(keys=[self.prefix + key], args=[rate, burst, cost])
+        except Exception:
+            self.errors += 1
+            logger.exception("Rate limit backend unavailable; allowing request")
+            return True, 0.0
+        return bool(int(allowed)), float(retry_after)
+
+
+def create_backend():
+    if config.RATE_LIMIT_BACKEND == "redis":
+        return RedisBuckets()
+    return MemoryBuckets()
+
+
+# ===============================================================
+# 🛡️ Rate Limiter
+# ===============================================================
+class RateLimiter:
+    """
+    Picks the policy for a request and charges its bucket. Authenticated
+    callers are limited per principal, everyone else per client IP.
+    """
+
+    def __init__(self, policies: Optional[Iterable[RatePolicy]] = None, backend=None):
+        self.policies = tuple(policies) if policies is not None else default_policies()
+        self._backend = backend
+        self.allowed: Dict[str, int] = {p.name: 0 for p in self.policies}
+        self.limited: Dict[str, int] = {p.name: 0 for p in self.policies}
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = create_backend()
+        return self._backend
+
+    def policy_for(self, method: str, path: str) -> Optional[RatePolicy]:
+        for policy in self.policies:
+            if policy.matches(method, path):
+                return policy
+        return None
+
+    @staticmethod
+    def client_key(scope) -> str:
+        headers = dict(scope.get("headers") or ())
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        if authorization[:7].lower() == "bearer ":
+            try:
+                return f"user:{verify_token(authorization[7:].strip()).id}"
+            except HTTPException:
+                pass  # invalid token: fall back to the address; the route will reject it
+        if config.RATE_LIMIT_TRUST_FORWARDED and b"x-forwarded-for" in headers:
+            return "ip:" + headers[b"x-forwarded-for"].decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    async def check(self, scope) -> Optional[float]:
+        """``None`` if the request may proceed, else seconds until it may retry."""
+        policy = self.policy_for(scope["method"], scope["path"])
+        if policy is None:
+            return None
+        allowed, retry_after = await self.backend.take(
+            f"{policy.name}:{self.client_key(scope)}", policy.rate, policy.burst
+        )
+        if allowed:
+            self.allowed[policy.name] += 1
+            return None
+        self.limited[policy.name] += 1
+        return retry_after
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "policies": [
+                {
+                    "name": p.name,
+                    "per_minute": round(p.rate * 60, 2),
+                    "burst": p.burst,
+                    "allowed": self.allowed[p.name],
+                    "limited": self.limited[p.name],
+                }
+                for p in self.policies
+            ],
+        }
+
+
+rate_limiter = RateLimiter()
+
+
+class RateLimitMiddleware:
+    """ASGI middleware answering 429 + ``Retry-After`` once a bucket is empty."""
+
+    def __init__(self, app, limiter: RateLimiter = rate_limiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        retry_after = await self.limiter.check(scope)
+        if retry_after is None:
+            await self.app(scope, receive, send)
+            return
+        response = JSONResponse(
+            {"detail": "Too many requests, please slow down"},
+            status_code=429,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        await response(scope, receive, send)
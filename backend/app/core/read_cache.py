@@ -0,0 +1,441 @@
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from app.core import config, outbox
+from app.core.cache import MISSING, TTLCache
+from app.core.db_events import Change, on_commit
+from app.models import Case, CaseNote, Evidence, User
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+Tag = Tuple[str, Any]
+
+# Namespaces
+CASE_DETAIL = "case_detail"  # GET /cases/admin/{id}
+CASE_STATUS = "case_status"  # GET /cases/{id}/status
+ROLE_USERS = "role_users"  # GET /users/role/{role}
+
+
+# ===============================================================
+# 📦 Value Encoding
+# ===============================================================
+_TABLE = 1  # msgpack ext type: list of dicts sharing one key set
+
+
+def _compact(value):
+    """
+    Rewrite lists of same-shaped dicts (the usual response rows) as
+    ``(keys, rows)`` tables so each key is stored once, not once per row.
+    """
+    if isinstance(value, dict):
+        return {k: _compact(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [_compact(v) for v in value]
+        if len(items) > 1 and all(isinstance(v, dict) for v in items):
+            keys = list(items[0])
+            if all(list(v) == keys for v in items[1:]):
+                body = msgpack.packb([keys, [list(v.values()) for v in items]], use_bin_type=True)
+                return msgpack.ExtType(_TABLE, body)
+        return items
+    return value
+
+
+def _expand(code: int, data: bytes):
+    if code != _TABLE:
+        return msgpack.ExtType(code, data)
+    keys, rows = msgpack.unpackb(data, raw=False, ext_hook=_expand, strict_map_key=False)
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def encode_value(value) -> bytes:
+    return msgpack.packb(_compact(value), use_bin_type=True)
+
+
+def decode_value(data: bytes):
+    return msgpack.unpackb(data, raw=False, ext_hook=_expand, strict_map_key=False)
+
+
+# ===============================================================
+# 🌐 Shared Backend (Redis protocol)
+# ===============================================================
+# Store only if nothing was invalidated since the loader started
+_REDIS_SET = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+for i = 3, #KEYS do
+    redis.call('SADD', KEYS[i], KEYS[1])
+    redis.call('PEXPIRE', KEYS[i], ARGV[3])
+end
+return 1
+"""
+
+# KEYS[1] is a value key or, with ARGV[3] == 'tag', a tag set of value keys
+_REDIS_INVALIDATE = """
+local keys = {KEYS[1]}
+if ARGV[3] == 'tag' then
+    keys = redis.call('SMEMBERS', KEYS[1])
+    redis.call('DEL', KEYS[1])
+end
+local removed = 0
+for _, key in ipairs(keys) do
+    removed = removed + redis.call('DEL', key)
+end
+redis.call('INCR', KEYS[2])
+redis.call('PUBLISH', ARGV[1], ARGV[2])
+return removed
+"""
+
+
+class RedisCacheBackend:
+    """
+    Second tier shared by every worker: values are msgpack-encoded in
+    Redis, and each invalidation is broadcast on a pub/sub channel so all
+    workers drop their in-process copy too. Redis errors are logged and
+    treated as misses; the API keeps answering from the database.
+    """
+
+    def __init__(self, url: str = config.REDIS_URL, prefix: str = "jirams:cache:", client=None):
+        if msgpack is None:
+            raise RuntimeError("The redis read cache backend requires the msgpack package")
+        if client is None:
+            if redis is None:
+                raise RuntimeError("The redis read cache backend requires the redis package")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self.channel = prefix + "invalidate"
+        self.origin = uuid.uuid4().hex  # lets a worker skip its own broadcasts
+        self._epoch_key = prefix + "epoch"
+        self._set_script = client.register_script(_REDIS_SET)
+        self._invalidate_script = client.register_script(_REDIS_INVALIDATE)
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, name: str, key: Hashable) -> str:
+        return f"{self.prefix}{name}:{key}"
+
+    def _tag_key(self, tag: Tag) -> str:
+        return f"{self.prefix}tag:{tag[0]}:{tag[1]}"
+
+    def _failed(self, action: str):
+        self.errors += 1
+        logger.exception("Shared cache unavailable (%s)", action)
+
+    def get(self, name: str, key: Hashable):
+        """``(value, tags)`` or ``MISSING``."""
+        try:
+            data = self.client.get(self._key(name, key))
+        except Exception:
+            self._failed("get")
+            return MISSING
+        if data is None:
+            self.misses += 1
+            return MISSING
+        self.hits += 1
+        value, tags = decode_value(data)
+        return value, [tuple(tag) for tag in tags]
+
+    def epoch(self) -> Optional[bytes]:
+        try:
+            return self.client.get(self._epoch_key) or b"0"
+        except Exception:
+            self._failed("epoch")
+            return None
+
+    def set(self, name: str, key: Hashable, value, tags: Iterable[Tag], epoch: Optional[bytes], ttl: float):
+        if epoch is None:
+            return
+        keys = [self._key(name, key), self._epoch_key] + [self._tag_key(t) for t in tags]
+        try:
+            data = encode_value([value, [list(t) for t in tags]])
+            self._set_script(keys=keys, args=[epoch, data, int(ttl * 1000)])
+        except Exception:
+            self._failed("set")
+
+    def _broadcast(self, target: str, message: list, is_tag: bool):
+        payload = msgpack.packb([self.origin] + message, use_bin_type=True)
+        try:
+            self._invalidate_script(
+                keys=[target, self._epoch_key], args=[self.channel, payload, "tag" if is_tag else "key"]
+            )
+        except Exception:
+            self._failed("invalidate")
+
+    def invalidate(self, name: str, key: Hashable):
+        self._broadcast(self._key(name, key), ["key", name, key], is_tag=False)
+
+    def invalidate_tag(self, tag: Tag):
+        self._broadcast(self._tag_key(tag), ["tag", list(tag)], is_tag=True)
+
+    def listen(self, on_message: Callable[[list], None], on_reconnect: Callable[[], None]):
+        """Apply other workers' invalidations in a daemon thread."""
+        threading.Thread(
+            target=self._listen, args=(on_message, on_reconnect), name="read-cache-invalidations", daemon=True
+        ).start()
+
+    def _listen(self, on_message, on_reconnect):
+        delay = 1.0
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Broadcasts sent while disconnected are lost; start clean
+                on_reconnect()
+                delay = 1.0
+                for message in pubsub.listen():
+                    origin, *body = msgpack.unpackb(message["data"], raw=False)
+                    if origin != self.origin:
+                        on_message(body)
+            except Exception:
+                self._failed("subscribe")
+                time.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "errors": self.errors,
+        }
+
+
+def create_shared_backend():
+    """``None`` (in-process only) unless ``READ_CACHE_BACKEND=redis``."""
+    if config.READ_CACHE_BACKEND == "redis":
+        return RedisCacheBackend()
+    return None
+
+
+# ===============================================================
+# 📚 Read-through Cache
+# ===============================================================
+class ReadCache:
+    """
+    Namespaced read-through cache for rendered responses.
+
+    Each namespace is a bounded in-process LRU with TTL, optionally backed
+    by a shared second tier (see ``RedisCacheBackend``). Entries may carry tags (e.g.
+    ``("user", 7)`` for every user whose email is embedded in a response)
+    so a change to a row can evict exactly the responses built from it.
+    A value loaded while an invalidation happened is returned but not
+    stored, so a slow reader can never re-cache data a writer just replaced.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = config.READ_CACHE_SIZE,
+        ttl: float = config.READ_CACHE_TTL_SECONDS,
+        shared=MISSING,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._shared = shared  # MISSING = build from config on first use
+        self.namespaces: Dict[str, TTLCache] = {}
+        self.invalidations: Dict[str, int] = defaultdict(int)
+        self._tags: Dict[Tag, Set[Tuple[str, Hashable]]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self._epoch = 0
+
+    @property
+    def shared(self) -> Optional[RedisCacheBackend]:
+        if self._shared is MISSING:
+            with self._lock:
+                if self._shared is MISSING:
+                    shared = create_shared_backend()
+                    if shared is not None:
+                        shared.listen(self._apply_remote, self._clear_local)
+                    self._shared = shared
+        return self._shared
+
+    def namespace(self, name: str) -> TTLCache:
+        cache = self.namespaces.get(name)
+        if cache is None:
+            cache = self.namespaces.setdefault(name, TTLCache(maxsize=self.maxsize, ttl=self.ttl))
+        return cache
+
+    def get_or_load(
+        self,
+        name: str,
+        key: Hashable,
+        loader: Callable[[], Tuple[Any, Iterable[Tag]]],
+    ) -> Any:
+        """
+        Return the cached value, or run ``loader()`` which returns
+        ``(value, tags)``. Exceptions (e.g. a 404) are never cached.
+        """
+        cache = self.namespace(name)
+        value = cache.get(key)
+        if value is not MISSING:
+            return value
+
+        epoch = self._epoch
+        shared = self.shared
+        if shared is not None:
+            found = shared.get(name, key)
+            if found is not MISSING:
+                value, tags = found
+                self._store(name, key, value, tags, epoch)
+                return value
+            shared_epoch = shared.epoch()
+
+        value, tags = loader()
+        tags = list(tags)
+        self._store(name, key, value, tags, epoch)
+        if shared is not None:
+            shared.set(name, key, value, tags, shared_epoch, self.ttl)
+        return value
+
+    def _store(self, name: str, key: Hashable, value, tags: Iterable[Tag], epoch: int):
+        with self._lock:
+            if epoch == self._epoch:
+                self.namespace(name).set(key, value)
+                for tag in tags:
+                    self._tags[tag].add((name, key))
+
+    def invalidate(self, name: str, key: Hashable):
+        self._invalidate_local(name, key)
+        if self.shared is not None:
+            self.shared.invalidate(name, key)
+
+    def invalidate_tag(self, tag: Tag):
+        self._invalidate_local_tag(tag)
+        if self.shared is not None:
+            self.shared.invalidate_tag(tag)
+
+    def _apply_remote(self, message: list):
+        """An invalidation broadcast by another worker."""
+        if message[0] == "key":
+            self._invalidate_local(message[1], message[2])
+        elif message[0] == "tag":
+            self._invalidate_local_tag(tuple(message[1]))
+
+    def _invalidate_local(self, name: str, key: Hashable):
+        with self._lock:
+            self._epoch += 1
+            if self.namespace(name).delete(key):
+                self.invalidations[name] += 1
+
+    def _invalidate_local_tag(self, tag: Tag):
+        with self._lock:
+            self._epoch += 1
+            for name, key in self._tags.pop(tag, ()):
+                if self.namespace(name).delete(key):
+                    self.invalidations[name] += 1
+            if len(self._tags) > self.maxsize * 4:
+                self._prune_tags()
+
+    def _prune_tags(self):
+        """Forget tag references to entries already evicted by LRU/TTL."""
+        for tag in list(self._tags):
+            live = {(n, k) for n, k in self._tags[tag] if self.namespace(n).get(k) is not MISSING}
+            if live:
+                self._tags[tag] = live
+            else:
+                del self._tags[tag]
+
+    def _clear_local(self):
+        with self._lock:
+            self._epoch += 1
+            for cache in self.namespaces.values():
+                cache.clear()
+            self._tags.clear()
+
+    def clear(self):
+        """Drop this worker's entries (the shared tier expires by TTL)."""
+        self._clear_local()
+
+    def stats(self) -> dict:
+        stats = {
+            name: {**cache.stats(), "invalidations": self.invalidations[name]}
+            for name, cache in sorted(self.namespaces.items())
+        }
+        shared = self.shared
+        stats["shared"] = shared.stats() if shared is not None else {"backend": "memory"}
+        return stats
+
+
+read_cache = ReadCache()
+
+
+# ===============================================================
+# 🔔 Invalidation Hooks
+# ===============================================================
+def _case_ids(change: Change) -> Set[int]:
+    ids = {change.values.get("case_id"), change.previous.get("case_id")}
+    ids.discard(None)
+    return ids
+
+
+@on_commit(Case)
+def _invalidate_cases(changes: List[Change]):
+    for change in changes:
+        read_cache.invalidate(CASE_DETAIL, change.id)
+        read_cache.invalidate(CASE_STATUS, change.id)
+
+
+@on_commit(CaseNote)
+def _invalidate_case_notes(changes: List[Change]):
+    for change in changes:
+        for case_id in _case_ids(change):
+            read_cache.invalidate(CASE_DETAIL, case_id)
+            read_cache.invalidate(CASE_STATUS, case_id)
+
+
+@on_commit(Evidence)
+def _invalidate_evidence(changes: List[Change]):
+    for change in changes:
+        for case_id in _case_ids(change):
+            read_cache.invalidate(CASE_DETAIL, case_id)
+
+
+@on_commit(User)
+def _invalidate_users(changes: List[Change]):
+    for change in changes:
+        renamed = {"email", "role", "username"} & change.previous.keys()
+        if change.op != "update" or renamed:
+            for role in {change.values.get("role"), change.previous.get("role")} - {None}:
+                read_cache.invalidate(ROLE_USERS, role)
+        if change.op == "delete" or {"email", "role"} & change.previous.keys():
+            # Responses that embed this user's email or role
+            read_cache.invalidate_tag(("user", change.id))
+
+
+def user_tags(user_ids: Iterable[Optional[int]]) -> List[Tag]:
+    return [("user", user_id) for user_id in set(user_ids) if user_id is not None]
+
+
+@outbox.subscribe(
+    outbox.CASE_UPDATED, outbox.CASE_STATUS_CHANGED, outbox.CASE_ASSIGNED, outbox.CASE_DELETED,
+    outbox.CASE_NOTE_ADDED, outbox.EVIDENCE_UPLOADED, outbox.EVIDENCE_REVIEWED,
+    broadcast=True,
+)
+def evict_case_responses(events: List[outbox.DomainEvent]):
+    """
+    Writes committed by other workers. The hooks above only see this
+    worker's commits; with the Redis backend pub/sub already covers it.
+    """
+    if read_cache.shared is not None:
+        return
+    for event in events:
+        read_cache._invalidate_local(CASE_DETAIL, event.case_id)
+        read_cache._invalidate_local(CASE_STATUS, event.case_id)
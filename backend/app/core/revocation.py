@@ -0,0 +1,236 @@
+import calendar
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core import config
+from app.core.cache import MISSING, TTLCache
+from app.core.db_events import Change, on_commit
+from app.database import SessionLocal
+from app.models import RefreshToken, RevokedToken
+
+logger = logging.getLogger(__name__)
+
+
+# ===============================================================
+# 🌸 Bloom Filter
+# ===============================================================
+class BloomFilter:
+    """Fixed-size bit array with ``k`` hash positions per key (no deletes)."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self._array[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+def _timestamp(value: datetime) -> int:
+    return calendar.timegm(value.utctimetuple())
+
+
+def user_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def token_key(token_id: str) -> str:
+    return f"token:{token_id}"
+
+
+# ===============================================================
+# 🚫 Revocation List
+# ===============================================================
+class RevocationList:
+    """
+    O(1) per-request revocation check.
+
+    Every live deny-list row is hashed into an in-memory bloom filter, so
+    the common case (token not revoked) costs a few bit lookups. Only a
+    filter hit, i.e. a revoked token or a rare false positive, is confirmed
+    against the ``revoked_tokens`` table, and that answer is cached. The
+    filter is rebuilt from the table on startup and every
+    ``REVOCATION_RELOAD_SECONDS`` so revocations made by other workers are
+    picked up and expired rows are dropped.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        capacity: int = config.REVOCATION_BLOOM_CAPACITY,
+        error_rate: float = config.REVOCATION_BLOOM_ERROR_RATE,
+        reload_interval: float = config.REVOCATION_RELOAD_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.reload_interval = reload_interval
+        self.bloom = BloomFilter(capacity, error_rate)
+        self._confirmed = TTLCache(maxsize=10000, ttl=reload_interval)
+        self._lock = threading.Lock()
+        self._loaded_at = 0.0
+        self._recent = []  # (monotonic time, key) added since the last load
+        self.bloom_hits = 0
+        self.false_positives = 0
+
+    # -----------------------------------------------------------
+    # Loading
+    # -----------------------------------------------------------
+    def load(self):
+        """Rebuild the filter from live deny-list rows, purging expired ones."""
+        now = datetime.utcnow()
+        started = time.monotonic()
+        db = self.session_factory()
+        try:
+            db.query(RevokedToken).filter(RevokedToken.expires_at <= now).delete(synchronize_session=False)
+            db.commit()
+            keys = [key for (key,) in db.query(RevokedToken.key).filter(RevokedToken.expires_at > now)]
+        finally:
+            db.close()
+
+        bloom = BloomFilter(max(self.capacity, len(keys) * 2), self.error_rate)
+        for key in keys:
+            bloom.add(key)
+        with self._lock:
+            # Keep revocations committed here while the table was being read
+            recent = [key for at, key in self._recent if at >= started]
+            for key in recent:
+                bloom.add(key)
+            self._recent = [(at, key) for at, key in self._recent if at >= started]
+            self.bloom = bloom
+            self._confirmed.clear()
+            self._loaded_at = time.monotonic()
+        logger.info("Loaded %s revoked token entries", len(keys))
+
+    def _maybe_reload(self):
+        if time.monotonic() - self._loaded_at < self.reload_interval:
+            return
+        with self._lock:
+            if time.monotonic() - self._loaded_at < self.reload_interval:
+                return
+            self._loaded_at = time.monotonic()  # one reloader; others keep the old filter
+        # Rebuild off the request path; checks keep using the current filter
+        threading.Thread(target=self._reload, name="revocation-reload", daemon=True).start()
+
+    def _reload(self):
+        try:
+            self.load()
+        except Exception:
+            logger.exception("Reloading the revocation list failed")
+
+    # -----------------------------------------------------------
+    # Checking
+    # -----------------------------------------------------------
+    def _revoked_at(self, key: str) -> Optional[int]:
+        """Latest revocation time recorded for ``key`` (None if not revoked)."""
+        cached = self._confirmed.get(key)
+        if cached is not MISSING:
+            return cached
+        db = self.session_factory()
+        try:
+            row = (
+                db.query(RevokedToken.revoked_at)
+                .filter(RevokedToken.key == key, RevokedToken.expires_at > datetime.utcnow())
+                .order_by(RevokedToken.revoked_at.desc())
+                .first()
+            )
+        finally:
+            db.close()
+        revoked_at = _timestamp(row.revoked_at) if row else None
+        if revoked_at is None:
+            self.false_positives += 1
+        self._confirmed.set(key, revoked_at)
+        return revoked_at
+
+    def is_revoked(self, user_id: int, token_id: Optional[str], issued_at: Optional[int]) -> bool:
+        self._maybe_reload()
+        bloom = self.bloom
+
+        key = user_key(user_id)
+        if key in bloom:
+            self.bloom_hits += 1
+            revoked_at = self._revoked_at(key)
+            if revoked_at is not None and (issued_at is None or issued_at <= revoked_at):
+                return True
+
+        if token_id:
+            key = token_key(token_id)
+            if key in bloom:
+                self.bloom_hits += 1
+                if self._revoked_at(key) is not None:
+                    return True
+        return False
+
+    # -----------------------------------------------------------
+    # Revoking (joins the caller's transaction)
+    # -----------------------------------------------------------
+    def revoke_user(self, db: Session, user_id: int, reason: str):
+        """
+        Invalidate every access and refresh token issued to ``user_id`` so
+        far. Takes effect when the caller commits.
+        """
+        now = datetime.utcnow()
+        db.add(RevokedToken(
+            key=user_key(user_id),
+            reason=reason,
+            revoked_at=now,
+            # Access tokens issued before now are all expired after this
+            expires_at=now + timedelta(minutes=config.ACCESS_TOKEN_EXPIRE_MINUTES),
+        ))
+        db.query(RefreshToken).filter(
+            RefreshToken.user_id == user_id,
+            RefreshToken.revoked_at.is_(None),
+        ).update({"revoked_at": now}, synchronize_session=False)
+
+    def revoke_token(self, db: Session, token_id: str, expires_at: datetime, reason: str):
+        """Invalidate a single access token (e.g. on logout)."""
+        db.add(RevokedToken(
+            key=token_key(token_id),
+            reason=reason,
+            revoked_at=datetime.utcnow(),
+            expires_at=expires_at,
+        ))
+
+    def _added(self, keys: List[str]):
+        with self._lock:
+            now = time.monotonic()
+            for key in keys:
+                self.bloom.add(key)
+                self._confirmed.delete(key)
+                self._recent.append((now, key))
+
+    def stats(self) -> dict:
+        return {
+            "entries": self.bloom.count,
+            "bloom_bits": self.bloom.bits,
+            "bloom_hashes": self.bloom.hashes,
+            "bloom_hits": self.bloom_hits,
+            "false_positives": self.false_positives,
+        }
+
+
+revocations = RevocationList()
+
+
+@on_commit(RevokedToken)
+def _publish_revocations(changes: List[Change]):
+    revocations._added([c.values["key"] for c in changes if c.op == "insert"])
@@ -1,27 +1,32 @@
 from datetime import datetime, timedelta
 from typing import List, Optional, Union
+import uuid
+
 import jwt
-import hashlib
+
+from app.core import config
+from app.core.hashing import hash_password_sync, verify_password_sync
 
 # ===============================================================
 # 🔐 Security Configuration
 # ===============================================================
 SECRET_KEY = "secret"
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+ACCESS_TOKEN_EXPIRE_MINUTES = config.ACCESS_TOKEN_EXPIRE_MINUTES  # kept short: refresh tokens renew it
 
 # ===============================================================
-# 🧩 Password Utilities (Simple SHA256 - No Bcrypt)
+# 🧩 Password Utilities (blocking)
 # ===============================================================
+# Request handlers should use app.core.hashing.password_hasher, which runs
+# these in a dedicated process pool; the sync forms are for scripts/seeding.
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against a hashed one using SHA256."""
-    hashed = hashlib.sha256(plain_password.encode()).hexdigest()
-    return hashed == hashed_password
+    """Verify a plain password against a bcrypt, argon2 or legacy SHA256 hash."""
+    return verify_password_sync(plain_password, hashed_password)
 
 
 def hash_password(password: str) -> str:
-    """Hash a plain password using SHA256."""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash a plain password with the configured scheme (bcrypt by default)."""
+    return hash_password_sync(password)
 
 
 # ===============================================================
@@ -30,11 +35,21 @@ def hash_password(password: str) -> str:
 def create_access_token(
     subject: Union[str, int],
     roles: List[str],
-    expires_minutes: Optional[int] = None
+    expires_minutes: Optional[int] = None,
+    user_id: Optional[int] = None,
 ) -> str:
     """Create a signed JWT access token."""
-    expire = datetime.utcnow() + timedelta(
+    now = datetime.utcnow()
+    expire = now + timedelta(
         minutes=expires_minutes or ACCESS_TOKEN_EXPIRE_MINUTES
     )
-    to_encode = {"sub": str(subject), "roles": roles, "exp": expire}
+    to_encode = {
+        "sub": str(subject),
+        "roles": roles,
+        "iat": now,
+        "exp": expire,
+        "jti": uuid.uuid4().hex,  # lets a single token be revoked
+    }
+    if user_id is not None:
+        to_encode["uid"] = user_id
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
@@ -0,0 +1,379 @@
+import hashlib
+import os
+import uuid
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Callable, Iterable, Iterator, NamedTuple, Optional
+from urllib.parse import quote
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.core import config
+
+# ===============================================================
+# 📦 Storage Abstraction
+# ===============================================================
+# Uploaded files are addressed by an opaque *key* ("evidence/<uuid>_<name>")
+# which is what the routers persist in the ``file_path`` columns. The
+# backend decides where the bytes actually live, so several app nodes can
+# run against the same shared object storage.
+
+
+class StoredObject(NamedTuple):
+    key: str
+    size: int
+    sha256: str
+
+
+class StorageBackend(ABC):
+    """Interface implemented by every storage driver."""
+
+    @abstractmethod
+    def save(self, key: str, chunks: Iterable[bytes]) -> StoredObject:
+        """Stream ``chunks`` into ``key`` and return its size and SHA-256."""
+
+    @abstractmethod
+    def read(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yield the bytes of ``key`` in ``[start, end)`` (``end=None`` means EOF)."""
+
+    @abstractmethod
+    def size(self, key: str) -> int:
+        """Return the size of ``key`` in bytes."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Return whether ``key`` is stored."""
+
+    @abstractmethod
+    def modified_at(self, key: str) -> float:
+        """Return the last-modified time of ``key`` as a Unix timestamp."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove ``key``; a missing key is not an error."""
+
+    @abstractmethod
+    def iter_keys(self, prefix: str = "") -> Iterator[str]:
+        """Yield every stored key starting with ``prefix``."""
+
+
+# ===============================================================
+# 💽 Local Driver (hashed subdirectory sharding)
+# ===============================================================
+class LocalStorage(StorageBackend):
+    """
+    Stores blobs under ``root`` with two levels of hashed subdirectories,
+    e.g. ``evidence/1f/a3/<uuid>_report.pdf``, so no directory ever holds
+    more than a few thousand entries.
+
+    Keys written before the storage layer existed are plain relative paths
+    (``uploaded_evidence/...``); they are still resolved from ``legacy_root``.
+    """
+
+    def __init__(self, root: str, legacy_root: str = ".", chunk_size: int = config.STORAGE_CHUNK_SIZE):
+        self.root = os.path.abspath(root)
+        self.legacy_root = os.path.abspath(legacy_root)
+        self.chunk_size = chunk_size
+        os.makedirs(self.root, exist_ok=True)
+
+    def _sharded_path(self, key: str) -> str:
+        if os.path.isabs(key) or ".." in key.replace("\\", "/").split("/"):
+            raise ValueError(f"Invalid storage key: {key!r}")
+        directory, name = os.path.split(key)
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.root, directory, digest[:2], digest[2:4], name)
+
+    def _path(self, key: str) -> str:
+        path = self._sharded_path(key)
+        if not os.path.exists(path):
+            # Legacy rows may carry Windows separators ("uploaded_evidence\\x.png")
+            legacy = os.path.join(self.legacy_root, *key.replace("\\", "/").split("/"))
+            if os.path.exists(legacy):
+                return legacy
+        return path
+
+    def save(self, key, chunks):
+        path = self._sharded_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(tmp_path, "wb") as out:
+                for chunk in chunks:
+                    out.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return StoredObject(key, size, digest.hexdigest())
+
+    def read(self, key, start=0, end=None):
+        with open(self._path(key), "rb") as f:
+            f.seek(start)
+            remaining = None if end is None else end - start
+            while remaining is None or remaining > 0:
+                n = self.chunk_size if remaining is None else min(self.chunk_size, remaining)
+                chunk = f.read(n)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def size(self, key):
+        return os.path.getsize(self._path(key))
+
+    def exists(self, key):
+        return os.path.isfile(self._path(key))
+
+    def modified_at(self, key):
+        return os.path.getmtime(self._path(key))
+
+    def delete(self, key):
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def iter_keys(self, prefix=""):
+        for dirpath, _dirnames, filenames in os.walk(self.root):
+            rel = os.path.relpath(dirpath, self.root)
+            parts = [] if rel == "." else rel.split(os.sep)
+            if len(parts) < 2:
+                continue
+            directory = "/".join(parts[:-2])
+            for name in filenames:
+                if name.endswith(".part"):
+                    continue
+                key = f"{directory}/{name}" if directory else name
+                if key.startswith(prefix):
+                    yield key
+
+
+# ===============================================================
+# ☁️ S3-Compatible Driver
+# ===============================================================
+class S3Storage(StorageBackend):
+    """
+    Stores blobs in an S3-compatible bucket (AWS S3, MinIO, Ceph, moto...).
+    Uploads use multipart upload so memory stays bounded by one part;
+    downloads use ranged GETs.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: str = config.S3_REGION,
+        part_size: int = config.S3_PART_SIZE,
+        chunk_size: int = config.STORAGE_CHUNK_SIZE,
+        client=None,
+    ):
+        if client is None:
+            try:
+                import boto3
+            except ImportError as exc:  # pragma: no cover - optional dependency
+                raise RuntimeError("The S3 storage backend requires boto3 (pip install boto3)") from exc
+            client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.part_size = part_size
+        self.chunk_size = chunk_size
+
+    def _object_key(self, key: str) -> str:
+        return self.prefix + key
+
+    def _is_missing(self, exc: Exception) -> bool:
+        error = getattr(exc, "response", {}).get("Error", {})
+        return error.get("Code") in ("404", "NoSuchKey", "NotFound")
+
+    def save(self, key, chunks):
+        object_key = self._object_key(key)
+        digest = hashlib.sha256()
+        size = 0
+        buffer = bytearray()
+        upload_id = None
+        parts = []
+
+        def flush_part():
+            nonlocal upload_id
+            if upload_id is None:
+                upload_id = self.client.create_multipart_upload(
+                    Bucket=self.bucket, Key=object_key
+                )["UploadId"]
+            number = len(parts) + 1
+            response = self.client.upload_part(
+                Bucket=self.bucket, Key=object_key, UploadId=upload_id,
+                PartNumber=number, Body=bytes(buffer),
+            )
+            parts.append({"PartNumber": number, "ETag": response["ETag"]})
+            buffer.clear()
+
+        try:
+            for chunk in chunks:
+                digest.update(chunk)
+                size += len(chunk)
+                buffer.extend(chunk)
+                if len(buffer) >= self.part_size:
+                    flush_part()
+
+            if upload_id is None:
+                # Small object: a single PUT is cheaper than a multipart upload
+                self.client.put_object(Bucket=self.bucket, Key=object_key, Body=bytes(buffer))
+            else:
+                if buffer:
+                    flush_part()
+                self.client.complete_multipart_upload(
+                    Bucket=self.bucket, Key=object_key, UploadId=upload_id,
+                    MultipartUpload={"Parts": parts},
+                )
+        except BaseException:
+            if upload_id is not None:
+                self.client.abort_multipart_upload(
+                    Bucket=self.bucket, Key=object_key, UploadId=upload_id
+                )
+            raise
+        return StoredObject(key, size, digest.hexdigest())
+
+    def read(self, key, start=0, end=None):
+        if end is not None and end <= start:
+            return
+        byte_range = f"bytes={start}-" if end is None else f"bytes={start}-{end - 1}"
+        response = self.client.get_object(
+            Bucket=self.bucket, Key=self._object_key(key), Range=byte_range
+        )
+        body = response["Body"]
+        try:
+            for chunk in body.iter_chunks(self.chunk_size):
+                yield chunk
+        finally:
+            body.close()
+
+    def size(self, key):
+        return self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))["ContentLength"]
+
+    def exists(self, key):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except Exception as exc:
+            if self._is_missing(exc):
+                return False
+            raise
+
+    def modified_at(self, key):
+        head = self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        return head["LastModified"].timestamp()
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+    def iter_keys(self, prefix=""):
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self._object_key(prefix)):
+            for item in page.get("Contents", []):
+                yield item["Key"][len(self.prefix):]
+
+
+# ===============================================================
+# 🔧 Helpers
+# ===============================================================
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    """Return the process-wide storage backend selected by configuration."""
+    global _storage
+    if _storage is None:
+        if config.STORAGE_BACKEND == "s3":
+            _storage = S3Storage(
+                bucket=config.S3_BUCKET,
+                prefix=config.S3_PREFIX,
+                endpoint_url=config.S3_ENDPOINT_URL,
+            )
+        else:
+            _storage = LocalStorage(config.STORAGE_ROOT)
+    return _storage
+
+
+def safe_filename(filename: Optional[str]) -> str:
+    """Strip any directory components from a client-supplied filename."""
+    return os.path.basename((filename or "").replace("\\", "/")) or "upload"
+
+
+def new_key(namespace: str, filename: Optional[str]) -> str:
+    """Build a unique, traversal-safe key for an uploaded file."""
+    return f"{namespace}/{uuid.uuid4().hex}_{safe_filename(filename)}"
+
+
+def iter_upload(fileobj: BinaryIO, chunk_size: int = config.STORAGE_CHUNK_SIZE) -> Iterator[bytes]:
+    """Read an uploaded file object in fixed-size chunks."""
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def parse_range(range_header: Optional[str], size: int):
+    """
+    Parse a single ``Range: bytes=...`` header into ``(start, end)``
+    (end exclusive). Returns ``None`` when the whole object is requested.
+    """
+    if not range_header:
+        return None
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first == "":
+            length = int(last)
+            if length <= 0:
+                raise ValueError
+            start, end = max(size - length, 0), size
+        else:
+            start = int(first)
+            end = min(int(last) + 1, size) if last else size
+    except ValueError:
+        start, end = size, size
+    if start >= size or start >= end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+def blob_response(
+    reader: Callable[[int, Optional[int]], Iterator[bytes]],
+    size: int,
+    filename: str,
+    media_type: Optional[str],
+    range_header: Optional[str] = None,
+) -> StreamingResponse:
+    """Stream a stored blob to the client, honouring a single byte range."""
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f"attachment; filename*=utf-8''{quote(filename)}",
+    }
+    byte_range = parse_range(range_header, size)
+    if byte_range is None:
+        start, end, status_code = 0, size, 200
+    else:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    headers["Content-Length"] = str(end - start)
+    return StreamingResponse(
+        reader(start, end),
+        status_code=status_code,
+        media_type=media_type or "application/octet-stream",
+        headers=headers,
+    )
@@ -0,0 +1,174 @@
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, func, inspect, select, text
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from app.core import config
+from app.database import engine
+from app.models import Case, CaseNote, Document, Evidence, Hearing, Payment, SyncSequence, SyncTombstone
+
+logger = logging.getLogger(__name__)
+
+# Rows exposed through /sync, keyed by table name
+TRACKED = {model.__tablename__: model for model in (Case, CaseNote, Evidence, Document, Hearing, Payment)}
+_TRACKED_MODELS = tuple(TRACKED.values())
+
+# Column backfilled into updated_at for rows that predate change tracking
+_CREATED = {"cases": "created_at", "case_notes": "created_at", "evidence": "uploaded_at",
+            "documents": "uploaded_at", "payments": "date"}
+
+CHANGES = "changes"  # counter handing out change_seq values
+PURGED = "tombstones_purged"  # highest change_seq of a purged tombstone
+
+
+# ===============================================================
+# 🔢 Change Sequence
+# ===============================================================
+_ALLOCATE = text(
+    "INSERT INTO sync_sequence (name, value) VALUES (:name, :count) "
+    "ON CONFLICT (name) DO UPDATE SET value = value + :count RETURNING value"
+)
+
+
+def allocate(conn_or_session, count: int) -> int:
+    """
+    Reserve ``count`` sequence values and return the last one. The counter
+    row stays write-locked until the transaction ends, so values become
+    visible in commit order and a reader never skips past an uncommitted one.
+    """
+    if isinstance(conn_or_session, Session):
+        conn_or_session = conn_or_session.connection()
+    return conn_or_session.execute(_ALLOCATE, {"name": CHANGES, "count": count}).scalar()
+
+
+# Writes take their change_seq inline instead of allocating it first: the
+# INSERT/UPDATE computes the next value itself and returns it through
+# RETURNING, and a trigger on the table moves the counter up to it in the
+# same statement. One statement per tracked row instead of two, and the
+# counter row is still locked until commit.
+_NEXT = select(SyncSequence.value + 1).where(SyncSequence.name == CHANGES).scalar_subquery()
+
+_ADVANCE = (
+    "UPDATE sync_sequence SET value = NEW.change_seq "
+    f"WHERE name = '{CHANGES}' AND value < NEW.change_seq"
+)
+
+
+def _install_triggers(conn):
+    for table in (*TRACKED, SyncTombstone.__tablename__):
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_change_seq_insert AFTER INSERT ON {table} "
+            f"BEGIN {_ADVANCE}; END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_change_seq_update AFTER UPDATE OF change_seq ON {table} "
+            f"BEGIN {_ADVANCE}; END"
+        ))
+
+
+def current(db: Session, name: str = CHANGES) -> int:
+    return db.query(SyncSequence.value).filter(SyncSequence.name == name).scalar() or 0
+
+
+def _audience(obj) -> str:
+    """Users who could see ``obj`` through its own columns (its case may be gone)."""
+    users = set()
+    case = obj if isinstance(obj, Case) else getattr(obj, "case", None)
+    if case is not None:
+        users.update((case.created_by_id, case.assigned_to_id))
+        users.update(h.judge_id for h in case.hearings)
+    if isinstance(obj, Hearing):
+        users.add(obj.judge_id)
+    users.discard(None)
+    return "," + ",".join(str(u) for u in sorted(users)) + "," if users else None
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_changes(session: Session, flush_context, instances):
+    """Give every inserted or updated tracked row the next change_seq; record deletes."""
+    new = session.new  # builds a fresh set on every access; read it once
+    changed = [obj for obj in new if isinstance(obj, _TRACKED_MODELS)] + [
+        obj for obj in session.dirty
+        if isinstance(obj, _TRACKED_MODELS) and session.is_modified(obj, include_collections=False)
+    ]
+    deleted = [obj for obj in session.deleted if isinstance(obj, _TRACKED_MODELS)]
+    if not changed and not deleted:
+        return
+
+    now = datetime.utcnow()
+    for obj in changed:
+        obj.change_seq = _NEXT
+        obj.updated_at = now
+    for obj in deleted:
+        state = inspect(obj)
+        session.add(SyncTombstone(
+            entity=type(obj).__tablename__,
+            entity_id=state.identity[0],
+            case_id=obj.id if isinstance(obj, Case) else obj.case_id,
+            audience=_audience(obj),
+            change_seq=_NEXT,
+            deleted_at=now,
+        ))
+
+
+# ===============================================================
+# 🧰 Startup Maintenance
+# ===============================================================
+def ensure_sync():
+    """
+    Install the counter triggers, number rows written before change
+    tracking existed and drop tombstones older than
+    ``SYNC_TOMBSTONE_RETENTION_DAYS``. Clients whose cursor is
+    older than the purged tombstones are told to resync from scratch.
+    """
+    with engine.begin() as conn:
+        conn.execute(
+            insert(SyncSequence).values(name=CHANGES, value=0).on_conflict_do_nothing(index_elements=["name"])
+        )
+        _install_triggers(conn)
+        for table, model in TRACKED.items():
+            top = conn.execute(
+                select(func.max(model.id)).where(model.change_seq.is_(None))
+            ).scalar()
+            if not top:
+                continue
+            base = allocate(conn, top) - top
+            created = _CREATED.get(table, "NULL")
+            conn.execute(
+                text(
+                    f"UPDATE {table} SET change_seq = :base + id, updated_at = COALESCE(updated_at, {created}) "
+                    "WHERE change_seq IS NULL"
+                ),
+                {"base": base},
+            )
+            logger.info("Assigned sync sequence numbers to existing %s rows", table)
+
+        cutoff = datetime.utcnow() - timedelta(days=config.SYNC_TOMBSTONE_RETENTION_DAYS)
+        purged = conn.execute(
+            select(func.max(SyncTombstone.change_seq)).where(SyncTombstone.deleted_at < cutoff)
+        ).scalar()
+        if purged:
+            conn.execute(SyncTombstone.__table__.delete().where(SyncTombstone.change_seq <= purged))
+            conn.execute(
+                insert(SyncSequence)
+                .values(name=PURGED, value=purged)
+                .on_conflict_do_update(index_elements=["name"], set_={"value": purged})
+            )
+
+
+# ===============================================================
+# 🔭 Visibility
+# ===============================================================
+def visible_case_ids(user_id: int):
+    """Cases a non-registrar follows: filed, assigned, or judging a hearing."""
+    return select(Case.id).where(
+        (Case.created_by_id == user_id)
+        | (Case.assigned_to_id == user_id)
+        | Case.id.in_(select(Hearing.case_id).where(Hearing.judge_id == user_id))
+    )
+
+
+def audience_contains(user_id: int):
+    return SyncTombstone.audience.like(f"%,{user_id},%")
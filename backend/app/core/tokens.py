@@ -0,0 +1,88 @@
+import hashlib
+import secrets
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core import config
+from app.models import RefreshToken, User
+
+# ===============================================================
+# 🔁 Rotating Refresh Tokens
+# ===============================================================
+# A refresh token is an opaque random string; only its SHA-256 is stored.
+# Each one can be used once: refreshing marks it used and issues its
+# successor in the same family. Presenting an already-used token means it
+# leaked, so the whole family (every session descended from that login) is
+# revoked.
+
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _invalid(detail: str = "Invalid refresh token") -> HTTPException:
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
+
+
+def issue_refresh_token(db: Session, user_id: int, family_id: Optional[str] = None) -> str:
+    """Add a new refresh token row; it is valid once the caller commits."""
+    token = secrets.token_urlsafe(32)
+    now = datetime.utcnow()
+    db.add(RefreshToken(
+        user_id=user_id,
+        token_hash=_hash(token),
+        family_id=family_id or uuid.uuid4().hex,
+        issued_at=now,
+        expires_at=now + timedelta(days=config.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+
+def revoke_family(db: Session, family_id: str):
+    db.query(RefreshToken).filter(
+        RefreshToken.family_id == family_id,
+        RefreshToken.revoked_at.is_(None),
+    ).update({"revoked_at": datetime.utcnow()}, synchronize_session=False)
+
+
+def rotate_refresh_token(db: Session, token: str) -> Tuple[Optional[User], Optional[str]]:
+    """
+    Exchange a refresh token for its successor in the caller's transaction.
+    Raises 401 for unknown, expired or revoked tokens and for disabled
+    users. A reused token revokes its family and returns ``(None, None)``:
+    the caller commits that revocation and then refuses the request.
+    """
+    row = db.query(RefreshToken).filter(RefreshToken.token_hash == _hash(token)).first()
+    now = datetime.utcnow()
+    if not row or row.revoked_at is not None or row.expires_at <= now:
+        raise _invalid()
+
+    # Claim the token atomically so two concurrent refreshes cannot both win
+    claimed = (
+        db.query(RefreshToken)
+        .filter(RefreshToken.id == row.id, RefreshToken.used_at.is_(None))
+        .update({"used_at": now}, synchronize_session=False)
+    )
+    if not claimed:
+        revoke_family(db, row.family_id)
+        return None, None
+
+    user = db.query(User).filter(User.id == row.user_id).first()
+    if not user or not user.is_active:
+        raise _invalid("Account is disabled")
+
+    successor = issue_refresh_token(db, user.id, row.family_id)
+    return user, successor
+
+
+def revoke_refresh_token(db: Session, token: str) -> bool:
+    """Log out: revoke the token's whole family in the caller's transaction."""
+    row = db.query(RefreshToken).filter(RefreshToken.token_hash == _hash(token)).first()
+    if not row:
+        return False
+    revoke_family(db, row.family_id)
+    return True
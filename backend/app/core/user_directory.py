@@ -0,0 +1,76 @@
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core import config
+from app.core.cache import MISSING, TTLCache
+from app.core.db_events import Change, on_commit
+from app.models import User
+
+
+# ===============================================================
+# 📇 User Directory Cache
+# ===============================================================
+class DirectoryEntry(NamedTuple):
+    id: int
+    email: str
+    role: str
+    is_active: bool
+
+
+class UserDirectory:
+    """
+    Process-local email -> (id, role, is_active) cache.
+
+    Unknown emails are cached too (for a shorter TTL) so repeated lookups
+    of a missing user do not reach the database either. Entries are dropped
+    as soon as a commit creates, updates or deletes the user; changes made
+    by other processes are bounded by the TTL.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = config.USER_CACHE_SIZE,
+        ttl: float = config.USER_CACHE_TTL_SECONDS,
+        negative_ttl: float = config.USER_CACHE_NEGATIVE_TTL_SECONDS,
+    ):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.negative_ttl = negative_ttl
+        self.invalidations = 0
+
+    def lookup(self, db: Session, email: str) -> Optional[DirectoryEntry]:
+        entry = self.cache.get(email)
+        if entry is not MISSING:
+            return entry
+
+        row = (
+            db.query(User.id, User.email, User.role, User.is_active)
+            .filter(User.email == email)
+            .first()
+        )
+        if row is None:
+            self.cache.set(email, None, ttl=self.negative_ttl)
+            return None
+        entry = DirectoryEntry(row.id, row.email, row.role, bool(row.is_active))
+        self.cache.set(email, entry)
+        return entry
+
+    def invalidate(self, email: Optional[str]):
+        if email and self.cache.delete(email):
+            self.invalidations += 1
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self) -> dict:
+        return {**self.cache.stats(), "invalidations": self.invalidations}
+
+
+user_directory = UserDirectory()
+
+
+@on_commit(User)
+def _invalidate_users(changes: List[Change]):
+    for change in changes:
+        user_directory.invalidate(change.values.get("email"))
+        user_directory.invalidate(change.previous.get("email"))
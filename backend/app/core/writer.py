@@ -0,0 +1,279 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, NamedTuple, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core import config, outbox
+from app.database import SQLALCHEMY_DATABASE_URL, enforce_foreign_keys
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows runs a single worker process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+Unit = Callable[[Session], Any]
+
+
+# ===============================================================
+# 🔌 Writer Connection
+# ===============================================================
+def writer_sessions(url: str = SQLALCHEMY_DATABASE_URL) -> sessionmaker:
+    """
+    Sessions whose transactions start with ``BEGIN IMMEDIATE``.
+
+    pysqlite defers BEGIN until the first INSERT/UPDATE and lets SAVEPOINT
+    open (and RELEASE commit) a transaction of its own, which would commit
+    every unit of a batch separately. Taking over BEGIN makes the batch one
+    transaction with a savepoint per unit, and takes the write lock up front
+    instead of failing to upgrade a read lock halfway through.
+    """
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    event.listen(engine, "connect", enforce_foreign_keys)
+
+    @event.listens_for(engine, "connect")
+    def _manual_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin_immediate(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
+
+
+class _Write(NamedTuple):
+    fn: Unit
+    actor: Any  # Principal the unit's domain events are attributed to
+    future: Future
+
+
+# ===============================================================
+# ✍️ Group-commit Writer
+# ===============================================================
+class WriteQueue:
+    """
+    Serializes write units of work on one thread and one connection.
+
+    ``unit(db)`` runs inside a savepoint of the current batch (or, alone in
+    its batch, directly in the transaction) and returns what the caller gets
+    back (plain data; call ``db.flush()`` first when it needs generated ids
+    or defaults). An exception rolls back that unit only and is raised to
+    its caller. A batch is every unit queued by the
+    time the writer is free plus whatever arrives within
+    ``WRITE_BATCH_WINDOW_MS``, up to ``WRITE_BATCH_SIZE``, and it commits
+    once, so concurrent requests share one fsync instead of queueing for
+    the SQLite write lock one by one.
+
+    Every worker process of ``serve.py`` has its own queue. Their writer
+    threads take turns through an exclusive ``flock`` on
+    ``<database>-writer.lock`` before each batch: a writer waiting in the
+    kernel wakes as soon as the lock is free, where SQLite's busy handler
+    sleeps and polls, and the units queued meanwhile join its next batch.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[sessionmaker] = None,
+        batch_size: int = config.WRITE_BATCH_SIZE,
+        window: float = config.WRITE_BATCH_WINDOW_MS / 1000,
+        max_pending: int = config.WRITE_QUEUE_SIZE,
+    ):
+        self._session_factory = session_factory
+        self.batch_size = batch_size
+        self.window = window
+        self._queue: "queue.Queue[Optional[_Write]]" = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._inline_lock = threading.Lock()
+        self.batches = 0
+        self.writes = 0
+        self.failed_units = 0
+        self.failed_commits = 0
+        self.largest_batch = 0
+
+    @property
+    def session_factory(self) -> sessionmaker:
+        if self._session_factory is None:
+            self._session_factory = writer_sessions()
+        return self._session_factory
+
+    # -----------------------------------------------------------
+    # Lifecycle
+    # -----------------------------------------------------------
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run_forever, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Finish queued writes, then stop the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    # -----------------------------------------------------------
+    # Submitting
+    # -----------------------------------------------------------
+    def submit(self, fn: Unit, actor=None) -> Future:
+        """Queue ``fn``; the future resolves once its batch has committed."""
+        write = _Write(fn, actor, Future())
+        if not self.running:
+            # No writer thread (scripts, WRITER_ENABLED=0): run it here
+            with self._inline_lock:
+                self._commit([write])
+            return write.future
+        try:
+            self._queue.put_nowait(write)
+        except queue.Full:
+            raise HTTPException(
+                status_code=503, detail="Too many pending writes, retry shortly", headers={"Retry-After": "1"}
+            )
+        return write.future
+
+    async def run(self, fn: Unit, actor=None):
+        """Awaitable ``submit``; returns ``fn``'s result or raises its exception."""
+        if not self.running:
+            return await asyncio.to_thread(self.call, fn, actor)
+        return await asyncio.wrap_future(self.submit(fn, actor))
+
+    def call(self, fn: Unit, actor=None):
+        """Blocking ``submit`` for sync code."""
+        return self.submit(fn, actor).result()
+
+    # -----------------------------------------------------------
+    # Writer thread
+    # -----------------------------------------------------------
+    def _open_process_lock(self):
+        database = self.session_factory.kw["bind"].url.database
+        if fcntl is None or not database or database == ":memory:":
+            return None
+        return open(f"{database}-writer.lock", "a")
+
+    def _gather(self, batch: List[_Write], window: float) -> bool:
+        """Add queued writes (waiting up to ``window``) to ``batch``; False once stopping."""
+        deadline = time.monotonic() + window
+        while len(batch) < self.batch_size:
+            try:
+                write = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    write = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if write is None:
+                return False
+            batch.append(write)
+        return True
+
+    def _run_forever(self):
+        process_lock = self._open_process_lock()
+        stopping = False
+        try:
+            while not stopping:
+                first = self._queue.get()
+                if first is None:
+                    break
+                batch = [first]
+                stopping = not self._gather(batch, self.window)
+                if process_lock is not None:
+                    fcntl.flock(process_lock, fcntl.LOCK_EX)
+                try:
+                    if not stopping:
+                        # Writes queued while another worker held the lock
+                        stopping = not self._gather(batch, 0)
+                    self._commit(batch)
+                except Exception:
+                    logger.exception("Writer batch crashed")
+                    for write in batch:
+                        if not write.future.done():
+                            write.future.set_exception(RuntimeError("write was not committed"))
+                finally:
+                    if process_lock is not None:
+                        fcntl.flock(process_lock, fcntl.LOCK_UN)
+        finally:
+            if process_lock is not None:
+                process_lock.close()
+
+    def _commit(self, batch: List[_Write], retry: bool = False):
+        outcomes = []
+        solo = len(batch) == 1  # nothing to isolate it from: skip the savepoint round trips
+        db = self.session_factory()
+        try:
+            for write in batch:
+                if not retry and not write.future.set_running_or_notify_cancel():
+                    continue  # cancelled while queued
+                actor = write.actor
+                outbox.set_actor(db, actor.id if actor else None, actor.email if actor else None)
+                try:
+                    if solo:
+                        result = write.fn(db)
+                    else:
+                        with db.begin_nested():
+                            result = write.fn(db)
+                    outcomes.append((write, result, None))
+                except Exception as exc:
+                    outcomes.append((write, None, exc))
+            if solo and outcomes and outcomes[0][2] is not None:
+                db.rollback()
+            else:
+                db.commit()
+        except Exception as exc:
+            db.rollback()
+            self.failed_commits += 1
+            unresolved = [write for write in batch if not write.future.done()]
+            if len(unresolved) > 1:
+                # Isolate the unit that broke the commit
+                logger.warning("Group commit of %s writes failed (%s); retrying one by one", len(unresolved), exc)
+                for write in unresolved:
+                    self._commit([write], retry=True)
+            else:
+                for write in unresolved:
+                    write.future.set_exception(exc)
+            return
+        finally:
+            db.close()
+
+        self.batches += 1
+        self.writes += len(outcomes)
+        self.largest_batch = max(self.largest_batch, len(outcomes))
+        for write, result, exc in outcomes:
+            if exc is not None:
+                self.failed_units += 1
+                write.future.set_exception(exc)
+            else:
+                write.future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "pending": self._queue.qsize(),
+            "batches": self.batches,
+            "writes": self.writes,
+            "average_batch": round(self.writes / self.batches, 2) if self.batches else 0,
+            "largest_batch": self.largest_batch,
+            "failed_units": self.failed_units,
+            "failed_commits": self.failed_commits,
+            "batch_size": self.batch_size,
+            "window_ms": self.window * 1000,
+        }
+
+
+writer = WriteQueue()
@@ -1,18 +1,47 @@
 # backend/app/database.py
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateColumn
+
+from app.core import config
 
 # SQLite database URL
 SQLALCHEMY_DATABASE_URL = "sqlite:///./app.db"
 
-# Create engine
+# Create engine (one pooled connection per threadpool thread, plus headroom
+# for background workers)
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    pool_size=config.SERVER_THREADS,
+    max_overflow=10,
 )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def enforce_foreign_keys(dbapi_connection, connection_record):
+    """
+    SQLite ignores FOREIGN KEY clauses unless each connection turns them
+    on, so writes naming a missing case or user fail instead of leaving
+    dangling rows (and routes need no SELECT to check the target first).
+    """
+    dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+
+event.listen(engine, "connect", enforce_foreign_keys)
+
+
+def foreign_key_violation(exc: IntegrityError) -> bool:
+    """True when ``exc`` is a row pointing at a parent that does not exist."""
+    return "FOREIGN KEY constraint failed" in str(exc.orig)
+
+
+# Create session factory. Sessions live for one unit of work and build
+# their response from the objects they just wrote: keeping them loaded
+# after commit saves a refresh SELECT per object (defaults and ids come
+# back through INSERT ... RETURNING)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Base class for models
 Base = declarative_base()
@@ -26,3 +55,24 @@ def get_db():
         db.close()
 
 
+def ensure_columns():
+    """
+    Add columns declared on the models but missing from an existing database.
+    create_all() only creates missing tables, so new nullable (or defaulted)
+    columns on existing tables are added here with ALTER TABLE, together
+    with any indexes declared on them.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
@@ -1,16 +1,31 @@
 # backend/app/main.py
 import logging
 from contextlib import asynccontextmanager
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 # Routers
-from app.api.routers import auth, cases, documents, hearings, payments, users, evidence
+from app.api.routers import admin, auth, cases, dockets, documents, hearings, jobs, notifications, payments, sync, users, evidence
 
 # Database + Models
-from app.database import Base, engine, SessionLocal
+from app.database import Base, engine, SessionLocal, ensure_columns
 from app.models import User
+from app.core import config
+from app.core.hashing import password_hasher
+from app.core.jobs import runner as job_runner
+from app.core.outbox import dispatcher
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.revocation import revocations
 from app.core.security import hash_password
+from app.core.sync import ensure_sync
+from app.core.writer import writer
+from app.services import case_workflow, domain_events  # noqa: F401 - register outbox producers/subscribers
+from app.services.availability import availability
+from app.services.dockets import ensure_dockets
+from app.services.document_index import ensure_index
+from app.services.scrubber import scrubber
+from app.services.workload import workload
 
 # ---------------------------------------------------------------------
 # Logging Configuration
@@ -24,11 +39,6 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------
 # ✅ Database Initialization
 # ---------------------------------------------------------------------
-# Automatically create all database tables if they don't exist
-Base.metadata.create_all(bind=engine)
-logger.info("✅ Database tables ensured (created if missing).")
-
-
 def seed_users():
     """
     Seed default system users if they don't already exist.
@@ -60,19 +70,61 @@ def seed_users():
     logger.info("✅ Default users seeded successfully.")
 
 
+def prepare_database():
+    """
+    One-time startup work: create missing tables, columns and indexes, then
+    seed the default users. ``serve.py`` runs it once in the master process
+    before forking workers; a plain ``uvicorn app.main:app`` runs it at import.
+    """
+    # Automatically create all database tables if they don't exist
+    Base.metadata.create_all(bind=engine)
+    ensure_columns()
+    ensure_index()
+    ensure_sync()
+    ensure_dockets()
+    logger.info("✅ Database tables ensured (created if missing).")
+    seed_users()
+
+
+if config.INIT_ON_IMPORT:
+    prepare_database()
+
+
 # ---------------------------------------------------------------------
 # ⚙️ Lifespan context (modern startup/shutdown management)
 # ---------------------------------------------------------------------
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
-    Handles startup and shutdown events cleanly.
-    - Creates DB tables
-    - Seeds default users
+    Handles startup and shutdown events cleanly (once per worker process).
+    - Sizes the threadpool that runs sync routes
+    - Queues the storage integrity scrub (one worker runs each pass)
+    - Warms up the password hashing pool
+    - Loads the token revocation list
+    - Loads the hearing availability bitmaps
+    - Loads the judge/prosecutor workload counters
+    - Starts the outbox dispatcher (domain event subscribers)
+    - Starts the background job workers
+    - Starts the single-writer queue for write routes
     """
     logger.info("🚀 Starting JIRAMS backend...")
-    seed_users()
+    to_thread.current_default_thread_limiter().total_tokens = config.SERVER_THREADS
+    revocations.load()
+    availability.load()
+    workload.load()
+    password_hasher.warm_up()
+    if config.SCRUB_ENABLED:
+        scrubber.start()
+    dispatcher.start()
+    job_runner.start()
+    if config.WRITER_ENABLED:
+        writer.start()
     yield
+    writer.stop()
+    scrubber.stop()
+    job_runner.stop()
+    await dispatcher.stop()
+    password_hasher.shutdown()
     logger.info("🛑 Shutting down JIRAMS backend...")
 
 
@@ -108,6 +160,10 @@ origins = [
     "https://your-frontend.netlify.app",
 ]
 
+# Added before CORS so that 429 responses still carry CORS headers
+if config.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -124,8 +180,13 @@ app.include_router(cases.router)
 app.include_router(evidence.router)
 app.include_router(documents.router)
 app.include_router(hearings.router)
+app.include_router(dockets.router)
 app.include_router(payments.router)
 app.include_router(users.router)
+app.include_router(admin.router)
+app.include_router(notifications.router)
+app.include_router(jobs.router)
+app.include_router(sync.router)
 
 # ---------------------------------------------------------------------
 # 🩺 Root Endpoint (Health Check)
@@ -1,17 +1,31 @@
 from sqlalchemy import (
     Column,
+    FetchedValue,
     Integer,
     String,
     Text,
     ForeignKey,
+    Date,
     DateTime,
     Float,
+    LargeBinary,
+    Index,
     func,
+    text,
 )
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 
+def _change_seq() -> Column:
+    """
+    A row's place in the /sync feed. The INSERT or UPDATE that stamps it
+    computes the value and hands it back through RETURNING, and a trigger
+    moves the counter past it (see app/core/sync.py).
+    """
+    return Column(Integer, nullable=True, index=True, server_default=FetchedValue(), server_onupdate=FetchedValue())
+
+
 # ===============================================================
 # 🧑 USER MODEL
 # ===============================================================
@@ -57,6 +71,11 @@ class User(Base):
         back_populates="registrar",
         foreign_keys="Hearing.registrar_id",
     )
+    refresh_tokens = relationship(
+        "RefreshToken",
+        back_populates="user",
+        cascade="all, delete-orphan",
+    )
 
 
 # ===============================================================
@@ -64,6 +83,7 @@ class User(Base):
 # ===============================================================
 class Case(Base):
     __tablename__ = "cases"
+    __mapper_args__ = {"eager_defaults": True}  # read change_seq back from the write
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
@@ -72,6 +92,8 @@ class Case(Base):
     notes = Column(Text, nullable=True)  # Optional notes from the civilian
     status = Column(String(100), default="Filed")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime, nullable=True)
+    change_seq = _change_seq()  # position in the /sync feed
 
     # Foreign keys
     created_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -120,12 +142,15 @@ class Case(Base):
 # ===============================================================
 class CaseNote(Base):
     __tablename__ = "case_notes"
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     case_id = Column(Integer, ForeignKey("cases.id"), nullable=False)
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     note = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime, nullable=True)
+    change_seq = _change_seq()
 
     # Relationships
     case = relationship("Case", back_populates="case_notes")
@@ -137,6 +162,7 @@ class CaseNote(Base):
 # ===============================================================
 class Evidence(Base):
     __tablename__ = "evidence"
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     case_id = Column(Integer, ForeignKey("cases.id"), nullable=False)
@@ -147,7 +173,11 @@ class Evidence(Base):
     category = Column(String(100), default="General")
     status = Column(String(50), default="PENDING")  # PENDING, APPROVED, REJECTED, UNDER_REVIEW
     remarks = Column(Text, nullable=True)
+    sha256 = Column(String(64), nullable=True)  # Hex digest of the stored blob
+    stored_size = Column(Integer, nullable=True)  # Bytes held in storage
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime, nullable=True)
+    change_seq = _change_seq()
 
     # Relationships
     case = relationship("Case", back_populates="evidences")
@@ -159,15 +189,26 @@ class Evidence(Base):
 # ===============================================================
 class Hearing(Base):
     __tablename__ = "hearings"
+    __table_args__ = (
+        # Conflict checks: a judge's / a courtroom's hearings by start time
+        Index("ix_hearings_judge_start", "judge_id", "scheduled_date"),
+        Index("ix_hearings_location_start", "location", "scheduled_date"),
+        # Calendar ranges across all judges and rooms
+        Index("ix_hearings_start", "scheduled_date"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     case_id = Column(Integer, ForeignKey("cases.id"), nullable=False)
     registrar_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     judge_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     scheduled_date = Column(DateTime, nullable=False)
+    duration_minutes = Column(Integer, nullable=True)  # NULL = HEARING_DEFAULT_MINUTES
     location = Column(String(255), nullable=False)
     notes = Column(Text, nullable=True)
     status = Column(String(100), default="Scheduled")
+    updated_at = Column(DateTime, nullable=True)
+    change_seq = _change_seq()
 
     # Relationships
     case = relationship("Case", back_populates="hearings")
@@ -180,6 +221,7 @@ class Hearing(Base):
 # ===============================================================
 class Payment(Base):
     __tablename__ = "payments"
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     case_id = Column(Integer, ForeignKey("cases.id"), nullable=False)
@@ -189,6 +231,8 @@ class Payment(Base):
     reference = Column(String(120), nullable=True)
     status = Column(String(50), default="Pending")  # Pending, Completed, Failed
     date = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime, nullable=True)
+    change_seq = _change_seq()
 
     # Relationships
     case = relationship("Case", back_populates="payments")
@@ -200,6 +244,7 @@ class Payment(Base):
 # ===============================================================
 class Document(Base):
     __tablename__ = "documents"
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String(255), nullable=False)
@@ -208,8 +253,200 @@ class Document(Base):
     case_id = Column(Integer, ForeignKey("cases.id"), nullable=False)
     file_type = Column(String(100), nullable=True)
     description = Column(Text, nullable=True)
+    sha256 = Column(String(64), nullable=True)  # Hex digest of the stored blob
+    stored_size = Column(Integer, nullable=True)  # Bytes held in storage
+    raw_size = Column(Integer, nullable=True)  # Bytes before compression
+    compression = Column(String(20), nullable=True)  # "zstd" or NULL when stored raw
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())  # ✅ renamed for consistency
+    updated_at = Column(DateTime, nullable=True)
+    change_seq = _change_seq()
 
     # Relationships
     uploader = relationship("User", back_populates="documents")
     case = relationship("Case", back_populates="documents")
+
+
+# ===============================================================
+# 🧹 STORAGE FINDING MODEL
+# ===============================================================
+class StorageFinding(Base):
+    """Integrity problem detected by the storage scrubber."""
+    __tablename__ = "storage_findings"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(30), nullable=False)  # MISSING_BLOB, HASH_MISMATCH, ORPHAN_BLOB
+    storage_key = Column(String(500), nullable=False, index=True)
+    entity = Column(String(30), nullable=True)  # "evidence" / "document" for row findings
+    entity_id = Column(Integer, nullable=True)
+    detail = Column(Text, nullable=True)
+    quarantined = Column(Integer, default=0, nullable=False)  # 1 = blob moved to quarantine/
+    detected_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_seen_at = Column(DateTime(timezone=True), server_default=func.now())
+    resolved_at = Column(DateTime(timezone=True), nullable=True)
+
+
+# ===============================================================
+# 🔁 REFRESH TOKEN MODEL
+# ===============================================================
+class RefreshToken(Base):
+    """Single-use refresh token; only its SHA-256 is stored."""
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
+    family_id = Column(String(32), index=True, nullable=False)  # shared by every rotation of one login
+    issued_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    used_at = Column(DateTime, nullable=True)  # set when rotated; reuse revokes the family
+    revoked_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    user = relationship("User", back_populates="refresh_tokens")
+
+
+# ===============================================================
+# 🚫 REVOKED TOKEN MODEL
+# ===============================================================
+class RevokedToken(Base):
+    """
+    Persisted deny-list behind the in-memory revocation bloom filter.
+    ``key`` is ``token:<jti>`` (one access token) or ``user:<id>`` (every
+    access token issued to the user up to ``revoked_at``).
+    """
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String(80), index=True, nullable=False)
+    reason = Column(String(50), nullable=True)
+    revoked_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, index=True, nullable=False)  # row is useless once every covered token expired
+
+
+# ===============================================================
+# 📮 OUTBOX EVENT MODEL
+# ===============================================================
+class OutboxEvent(Base):
+    """
+    Domain event written in the same transaction as the change it
+    describes, then delivered to subscribers by the outbox dispatcher.
+    """
+    __tablename__ = "outbox_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    type = Column(String(50), index=True, nullable=False)  # CaseFiled, CaseStatusChanged...
+    entity = Column(String(30), nullable=False)  # "case", "evidence", "hearing", "payment"...
+    entity_id = Column(Integer, nullable=True)
+    case_id = Column(Integer, index=True, nullable=True)
+    actor_id = Column(Integer, nullable=True)  # user who made the change, when known
+    payload = Column(Text, nullable=False)  # JSON
+    created_at = Column(DateTime, nullable=False)
+    dispatched_at = Column(DateTime, index=True, nullable=True)  # exclusive subscribers done (or gave up)
+    claimed_until = Column(DateTime, nullable=True)  # lease held by the worker dispatching it
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+
+
+# ===============================================================
+# 🧰 BACKGROUND JOB MODEL
+# ===============================================================
+class Job(Base):
+    """Unit of background work claimed and run by the job runner."""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Claim order: runnable jobs by priority, then age
+        Index("ix_jobs_claim", "status", "priority", "run_after"),
+        # At most one queued/running job per dedupe key
+        Index(
+            "ux_jobs_dedupe_active",
+            "dedupe_key",
+            unique=True,
+            sqlite_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), index=True, nullable=False)  # e.g. "document.extract"
+    payload = Column(Text, nullable=False)  # JSON
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, succeeded, failed
+    priority = Column(Integer, nullable=False, default=0)  # higher runs first
+    dedupe_key = Column(String(200), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_after = Column(DateTime, nullable=False)  # not claimed before this (backoff, scheduling)
+    lease_until = Column(DateTime, nullable=True)  # a running job past its lease is reclaimed
+    worker = Column(String(80), nullable=True)
+    result = Column(Text, nullable=True)  # JSON
+    last_error = Column(Text, nullable=True)
+    created_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+# ===============================================================
+# 🔄 SYNC FEED MODELS
+# ===============================================================
+class SyncSequence(Base):
+    """Named counters; ``changes`` hands out ``change_seq`` values."""
+    __tablename__ = "sync_sequence"
+
+    name = Column(String(30), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+
+class SyncTombstone(Base):
+    """Deleted row announced to /sync clients until it ages out."""
+    __tablename__ = "sync_tombstones"
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity = Column(String(30), nullable=False)  # table name: "cases", "evidence"...
+    entity_id = Column(Integer, nullable=False)
+    case_id = Column(Integer, nullable=True, index=True)
+    audience = Column(String(200), nullable=True)  # ",3,7," - users who saw the row without a case to check
+    change_seq = Column(Integer, nullable=False, index=True)
+    deleted_at = Column(DateTime, nullable=False)
+
+
+# ===============================================================
+# 📋 CAUSE LIST (DOCKET) MODELS
+# ===============================================================
+class CauseListEntry(Base):
+    """
+    One hearing as it appears on a day's cause list, with the case title,
+    parties and judge copied in so a docket is read without joins. Kept in
+    step with the hearings by ``app/services/dockets.py``.
+    """
+    __tablename__ = "cause_list_entries"
+    __table_args__ = (
+        # A courtroom's list for a day, in running order
+        Index("ix_cause_list_day_room", "day", "room", "starts_at"),
+    )
+
+    hearing_id = Column(Integer, primary_key=True)
+    day = Column(Date, nullable=False)
+    room = Column(String(255), nullable=False)
+    starts_at = Column(DateTime, nullable=False)
+    ends_at = Column(DateTime, nullable=False)
+    case_id = Column(Integer, index=True, nullable=False)
+    case_title = Column(String(255), nullable=True)
+    filed_by = Column(String(120), nullable=True)  # filer's email
+    assigned_to = Column(String(120), nullable=True)  # assignee's email
+    judge = Column(String(120), nullable=True)  # judge's email
+    status = Column(String(100), nullable=True)
+
+
+class Docket(Base):
+    """A courtroom's cause list for one day, pre-rendered as JSON, HTML and PDF."""
+    __tablename__ = "dockets"
+
+    day = Column(Date, primary_key=True)
+    room = Column(String(255), primary_key=True)
+    version = Column(Integer, nullable=False, default=1)  # bumped whenever its entries change
+    rendered_version = Column(Integer, nullable=True)  # version the artifacts below show
+    hearings = Column(Integer, nullable=False, default=0)
+    etag = Column(String(64), nullable=True)
+    json = Column(Text, nullable=True)
+    html = Column(Text, nullable=True)
+    pdf = Column(LargeBinary, nullable=True)
+    rendered_at = Column(DateTime, nullable=True)
@@ -0,0 +1,375 @@
+import logging
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, deque
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.core import config, jobs, outbox
+from app.core.identity import Principal
+from app.core.writer import writer
+from app.models import Case, Hearing, User
+from app.services.scheduling import INACTIVE_STATUSES
+
+logger = logging.getLogger(__name__)
+
+AUTO_SCHEDULE_JOB = "hearings.auto_schedule"
+
+
+class Assignment(NamedTuple):
+    case_id: int
+    judge_id: Optional[int]
+    location: str
+    starts_at: datetime
+    slot: int  # index into the plan's slot grid
+    preferred: bool  # the judge is the one the case is assigned to
+
+    def to_dict(self, minutes: int) -> dict:
+        return {
+            "case_id": self.case_id,
+            "judge_id": self.judge_id,
+            "location": self.location,
+            "scheduled_date": self.starts_at.isoformat(),
+            "duration_minutes": minutes,
+        }
+
+
+class Plan(NamedTuple):
+    starts: List[datetime]  # slot grid
+    slot_minutes: int
+    rooms: List[str]
+    judges: List[int]
+    assignments: List[Assignment]
+    unscheduled: List[int]  # case ids with no free slot in the window
+    judge_load: Dict[int, int]  # hearings per judge in the window, existing + planned
+    moves: int  # improvements made by the local search
+    elapsed_ms: float
+
+    def to_dict(self, include_assignments: bool = True) -> dict:
+        result = {
+            "window": {
+                "from": self.starts[0].isoformat() if self.starts else None,
+                "to": (self.starts[-1] + timedelta(minutes=self.slot_minutes)).isoformat() if self.starts else None,
+                "slot_minutes": self.slot_minutes,
+                "rooms": self.rooms,
+                "judges": self.judges,
+            },
+            "scheduled": len(self.assignments),
+            "unscheduled": self.unscheduled,
+            "preferred_judge": sum(1 for a in self.assignments if a.preferred),
+            "judge_load": self.judge_load,
+            "moves": self.moves,
+            "elapsed_ms": round(self.elapsed_ms, 1),
+        }
+        if include_assignments:
+            result["assignments"] = [a.to_dict(self.slot_minutes) for a in self.assignments]
+        return result
+
+
+# ===============================================================
+# 🧮 Inputs
+# ===============================================================
+def _clock(value: str) -> timedelta:
+    hours, minutes = value.split(":")
+    return timedelta(hours=int(hours), minutes=int(minutes))
+
+
+def slot_grid(start: date, days: int, slot_minutes: int) -> List[datetime]:
+    """Start of every bookable slot: weekdays, between the court's opening hours."""
+    opens, closes = _clock(config.HEARING_DAY_START), _clock(config.HEARING_DAY_END)
+    length = timedelta(minutes=slot_minutes)
+    starts = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        if day.weekday() >= 5:
+            continue
+        midnight = datetime(day.year, day.month, day.day)
+        at = midnight + opens
+        while at + length <= midnight + closes:
+            starts.append(at)
+            at += length
+    return starts
+
+
+def awaiting_cases(db: Session):
+    """REVIEWED cases with no active hearing, oldest first."""
+    active = db.query(Hearing.id).filter(
+        Hearing.case_id == Case.id,
+        or_(Hearing.status.is_(None), func.upper(Hearing.status).notin_(INACTIVE_STATUSES)),
+    )
+    return (
+        db.query(Case.id, Case.assigned_to_id)
+        .filter(func.upper(Case.status) == "REVIEWED", ~active.exists())
+        .order_by(Case.created_at, Case.id)
+        .all()
+    )
+
+
+def _occupied(starts: List[datetime], slot_minutes: int, begins: datetime, minutes: int) -> range:
+    """Indices of the slots that overlap ``[begins, begins + minutes)``."""
+    length = timedelta(minutes=slot_minutes)
+    first = bisect_right(starts, begins - length)  # slots ending after it begins
+    last = bisect_left(starts, begins + timedelta(minutes=minutes))  # slots starting before it ends
+    return range(first, last)
+
+
+# ===============================================================
+# 🗓️ Planning
+# ===============================================================
+def plan(
+    db: Session,
+    start: Optional[date] = None,
+    days: Optional[int] = None,
+    slot_minutes: Optional[int] = None,
+    rooms: Optional[List[str]] = None,
+    judge_ids: Optional[List[int]] = None,
+) -> Plan:
+    """
+    Book every case awaiting a hearing into the slot grid without double
+    booking a judge or a room.
+
+    Greedy first: slots are filled in time order, each free judge (least
+    loaded first) taking the oldest case that is either assigned to them or
+    to no judge, so cases are heard roughly in the order they were reviewed.
+    A local search then swaps judges within a slot to honour assignments and
+    moves hearings off the busiest judges while that narrows the spread.
+    Existing hearings are read once up front, so the whole plan costs a few
+    queries however many cases are waiting. Nothing is written.
+    """
+    began = time.perf_counter()
+    slot_minutes = slot_minutes or config.HEARING_DEFAULT_MINUTES
+    start = start or (datetime.utcnow() + timedelta(days=config.HEARING_LEAD_DAYS)).date()
+    starts = slot_grid(start, days or config.HEARING_HORIZON_DAYS, slot_minutes)
+    rooms = [r.strip() for r in (rooms or config.HEARING_ROOMS) if r.strip()]
+
+    judges_query = db.query(User.id).filter(User.role == "JUDGE", User.is_active == 1)
+    if judge_ids:
+        judges_query = judges_query.filter(User.id.in_(judge_ids))
+    judges = sorted(judge_id for (judge_id,) in judges_query)
+    cases = awaiting_cases(db)
+    # A case already assigned to a judge goes to that judge where possible
+    on_bench = set(judges)
+    preference = {case.id: case.assigned_to_id for case in cases if case.assigned_to_id in on_bench}
+
+    judge_busy = defaultdict(set)  # judge id -> occupied slot indices
+    room_busy = defaultdict(set)
+    load = {judge_id: 0 for judge_id in judges}
+    if starts:
+        window_end = starts[-1] + timedelta(minutes=slot_minutes)
+        existing = db.query(
+            Hearing.judge_id, Hearing.location, Hearing.scheduled_date, Hearing.duration_minutes
+        ).filter(
+            Hearing.scheduled_date > starts[0] - timedelta(minutes=config.HEARING_MAX_MINUTES),
+            Hearing.scheduled_date < window_end,
+            or_(Hearing.status.is_(None), func.upper(Hearing.status).notin_(INACTIVE_STATUSES)),
+            or_(Hearing.judge_id.in_(judges), Hearing.location.in_(rooms)),
+        )
+        for h in existing:
+            minutes = h.duration_minutes or config.HEARING_DEFAULT_MINUTES
+            taken = _occupied(starts, slot_minutes, h.scheduled_date, minutes)
+            if h.judge_id in load:
+                judge_busy[h.judge_id].update(taken)
+                if h.scheduled_date >= starts[0]:
+                    load[h.judge_id] += 1
+            if h.location in rooms:
+                room_busy[h.location].update(taken)
+
+    assignments = _greedy(starts, cases, preference, judges, rooms, judge_busy, room_busy, load)
+    moves = _improve(assignments, preference, judges, judge_busy, load) if judges else 0
+
+    assignments.sort(key=lambda a: (a.slot, a.location))
+    placed = {a.case_id for a in assignments}
+    return Plan(
+        starts=starts,
+        slot_minutes=slot_minutes,
+        rooms=rooms,
+        judges=judges,
+        assignments=assignments,
+        unscheduled=[case.id for case in cases if case.id not in placed],
+        judge_load=load,
+        moves=moves,
+        elapsed_ms=(time.perf_counter() - began) * 1000,
+    )
+
+
+def _greedy(starts, cases, preference, judges, rooms, judge_busy, room_busy, load) -> List[Assignment]:
+    # Queue position stands in for age: cases arrive oldest first
+    preferred = defaultdict(deque)  # judge id -> cases assigned to them
+    anyone = deque()
+    for order, case in enumerate(cases):
+        if case.id in preference:
+            preferred[preference[case.id]].append((order, case.id))
+        else:
+            anyone.append((order, case.id))
+    waiting = len(cases)
+
+    def take(judge_id):
+        own = preferred.get(judge_id)
+        queue = own if own and (not anyone or own[0][0] < anyone[0][0]) else anyone
+        if not queue:
+            # Nothing of their own left: help with the longest-waiting backlog
+            queue = min((q for q in preferred.values() if q), key=lambda q: q[0][0], default=None)
+        if not queue:
+            return None
+        return queue.popleft()[1], queue is own
+
+    assignments = []
+    for slot, at in enumerate(starts):
+        if not waiting:
+            break
+        free_rooms = [room for room in rooms if slot not in room_busy[room]]
+        if not free_rooms:
+            continue
+        if not judges:
+            # No judges on file yet: book rooms only, judges are assigned later
+            for room in free_rooms[:waiting]:
+                case_id = anyone.popleft()[1]
+                assignments.append(Assignment(case_id, None, room, at, slot, False))
+                room_busy[room].add(slot)
+                waiting -= 1
+            continue
+        free_judges = sorted((j for j in judges if slot not in judge_busy[j]), key=lambda j: (load[j], j))
+        for judge_id, room in zip(free_judges, free_rooms):
+            picked = take(judge_id)
+            if picked is None:
+                break
+            case_id, is_preferred = picked
+            assignments.append(Assignment(case_id, judge_id, room, at, slot, is_preferred))
+            judge_busy[judge_id].add(slot)
+            room_busy[room].add(slot)
+            load[judge_id] += 1
+            waiting -= 1
+    return assignments
+
+
+def _improve(assignments: List[Assignment], preference, judges, judge_busy, load, max_rounds: int = 10000) -> int:
+    """Local search over the greedy plan; returns the number of changes made."""
+    by_slot = defaultdict(list)
+    for index, a in enumerate(assignments):
+        by_slot[a.slot].append(index)
+    moves = 0
+
+    # 1. Swap judges between two hearings of one slot when that gives more
+    #    cases their assigned judge. Rooms and times stay put.
+    for indices in by_slot.values():
+        for i in indices:
+            for k in indices:
+                a, b = assignments[i], assignments[k]
+                if i == k or a.preferred:
+                    continue
+                if preference.get(a.case_id) == b.judge_id and not b.preferred:
+                    assignments[i] = a._replace(judge_id=b.judge_id, preferred=True)
+                    assignments[k] = b._replace(
+                        judge_id=a.judge_id, preferred=preference.get(b.case_id) == a.judge_id
+                    )
+                    moves += 1
+
+    # 2. Move hearings that nobody asked for from the busiest judge to a
+    #    judge who is free in the same slot and at least two hearings lighter.
+    movable = defaultdict(list)  # judge id -> assignment indices, latest first
+    for index in sorted(range(len(assignments)), key=lambda n: -assignments[n].slot):
+        if not assignments[index].preferred:
+            movable[assignments[index].judge_id].append(index)
+    for _ in range(max_rounds):
+        busiest = max(judges, key=lambda j: load[j])
+        moved = False
+        for index in movable[busiest]:
+            a = assignments[index]
+            lighter = [j for j in judges if load[j] < load[busiest] - 1 and a.slot not in judge_busy[j]]
+            if not lighter:
+                continue
+            target = min(lighter, key=lambda j: (load[j], j))
+            assignments[index] = a._replace(judge_id=target, preferred=preference.get(a.case_id) == target)
+            judge_busy[busiest].discard(a.slot)
+            judge_busy[target].add(a.slot)
+            load[busiest] -= 1
+            load[target] += 1
+            movable[busiest].remove(index)
+            if not assignments[index].preferred:
+                movable[target].append(index)
+            moves += 1
+            moved = True
+            break
+        if not moved:
+            break
+    return moves
+
+
+# ===============================================================
+# ✍️ Applying
+# ===============================================================
+def apply(db: Session, actor: Principal, reviewed_by: Optional[Dict[int, int]] = None, **options) -> Plan:
+    """
+    Plan and insert the hearings in one transaction. Run it on the writer
+    queue so no other booking can land between the plan and the inserts.
+    ``reviewed_by`` maps case ids to the registrar recorded on their hearing
+    (the requester otherwise).
+    """
+    result = plan(db, **options)
+    reviewed_by = reviewed_by or {}
+    db.add_all([
+        Hearing(
+            case_id=a.case_id,
+            registrar_id=reviewed_by.get(a.case_id, actor.id),
+            judge_id=a.judge_id,
+            scheduled_date=a.starts_at,
+            duration_minutes=result.slot_minutes,
+            location=a.location,
+            notes=f"Hearing automatically scheduled by {actor.email}",
+            status="SCHEDULED",
+        )
+        for a in result.assignments
+    ])
+    db.flush()
+    logger.info(
+        "Auto-scheduled %s hearings (%s cases left without a slot) in %.0f ms",
+        len(result.assignments), len(result.unscheduled), result.elapsed_ms,
+    )
+    return result
+
+
+def job_payload(
+    registrar_id: int,
+    start: Optional[date] = None,
+    days: Optional[int] = None,
+    slot_minutes: Optional[int] = None,
+    rooms: Optional[Iterable[str]] = None,
+    judge_ids: Optional[Iterable[int]] = None,
+    reviewed_by: Optional[Dict[int, int]] = None,
+) -> dict:
+    return {
+        "registrar_id": registrar_id,
+        "start": start.isoformat() if start else None,
+        "days": days,
+        "slot_minutes": slot_minutes,
+        "rooms": list(rooms) if rooms else None,
+        "judge_ids": list(judge_ids) if judge_ids else None,
+        "reviewed_by": {str(k): v for k, v in (reviewed_by or {}).items()},
+    }
+
+
+@jobs.handler(AUTO_SCHEDULE_JOB, pool="thread")
+def run_auto_schedule(payload: dict) -> dict:
+    """Background run of ``apply``; safe to repeat, booked cases no longer wait."""
+    def unit(db: Session):
+        registrar = db.get(User, payload["registrar_id"])
+        if registrar is None:
+            raise ValueError(f"Registrar {payload['registrar_id']} no longer exists")
+        actor = Principal(id=registrar.id, email=registrar.email, role=registrar.role)
+        outbox.set_actor(db, actor.id, actor.email)
+        result = apply(
+            db,
+            actor,
+            reviewed_by={int(k): v for k, v in (payload.get("reviewed_by") or {}).items()},
+            start=date.fromisoformat(payload["start"]) if payload.get("start") else None,
+            days=payload.get("days"),
+            slot_minutes=payload.get("slot_minutes"),
+            rooms=payload.get("rooms"),
+            judge_ids=payload.get("judge_ids"),
+        )
+        return result.to_dict(include_assignments=False)
+
+    return writer.call(unit)
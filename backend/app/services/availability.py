@@ -0,0 +1,300 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import func, or_
+
+from app.core import config, outbox
+from app.core.db_events import Change, on_commit
+from app.database import SessionLocal
+from app.models import Hearing
+from app.services.scheduling import INACTIVE_STATUSES
+
+logger = logging.getLogger(__name__)
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+Resource = Tuple[str, object]  # ("judge", user id) or ("room", location)
+
+
+class Booking(NamedTuple):
+    judge_id: Optional[int]
+    room: Optional[str]
+    starts_at: datetime
+    minutes: int
+
+    def resources(self) -> List[Resource]:
+        found = []
+        if self.judge_id is not None:
+            found.append(("judge", self.judge_id))
+        if self.room:
+            found.append(("room", self.room))
+        return found
+
+    def days(self) -> Iterable[Tuple[date, int]]:
+        """``(day, bitmap)`` for every day the hearing touches, one bit per slot."""
+        first = self.starts_at.hour * 60 + self.starts_at.minute
+        start = first // SLOT_MINUTES
+        end = -(-(first + self.minutes) // SLOT_MINUTES)  # round up: a partial slot is taken
+        day = self.starts_at.date()
+        while end > 0:
+            stop = min(end, SLOTS_PER_DAY)
+            yield day, ((1 << stop) - 1) ^ ((1 << start) - 1)
+            start, end, day = 0, end - SLOTS_PER_DAY, day + timedelta(days=1)
+
+
+def _booking(judge_id, location, scheduled_date, minutes, status) -> Optional[Booking]:
+    if scheduled_date is None or (status or "").upper() in INACTIVE_STATUSES:
+        return None
+    room = (location or "").strip() or None
+    return Booking(judge_id, room, scheduled_date, minutes or config.HEARING_DEFAULT_MINUTES)
+
+
+def _slot_of(clock: str) -> int:
+    hours, minutes = clock.split(":")
+    return (int(hours) * 60 + int(minutes)) // SLOT_MINUTES
+
+
+# ===============================================================
+# 🧮 Availability Index
+# ===============================================================
+class AvailabilityIndex:
+    """
+    Which 15-minute slots each judge and each courtroom is booked for.
+
+    One integer bitmap per resource and day (bit n = the slot starting
+    n * 15 minutes after midnight), so "is this judge free in that room for
+    two hours" is a few ANDs and shifts per day instead of a query. The
+    bitmaps are built once from upcoming active hearings and then patched
+    per hearing: commits in this worker arrive through ``on_commit`` with
+    the full row, and other workers' changes through the outbox, which
+    rereads just the hearings named.
+
+    Each hearing's last known ``change_seq`` is kept so a late, older copy
+    of a row never overwrites a newer one. A day's bitmap is rebuilt from
+    the hearings holding it rather than cleared bit by bit, so overlapping
+    legacy bookings stay correct when one of them moves.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._bookings: Dict[int, Booking] = {}
+        self._seq: Dict[int, float] = {}  # hearing id -> change_seq applied (inf once deleted)
+        self._holders: Dict[Tuple[Resource, date], Set[int]] = defaultdict(set)
+        self._bits: Dict[Tuple[Resource, date], int] = {}
+        self._loaded = False
+        self._pending: Optional[list] = None  # updates that arrive while loading
+        self.updates = 0
+        self.queries = 0
+        self.query_seconds = 0.0
+
+    # -----------------------------------------------------------
+    # Loading
+    # -----------------------------------------------------------
+    def load(self):
+        """Rebuild from every active hearing that has not yet ended."""
+        since = datetime.utcnow() - timedelta(minutes=config.HEARING_MAX_MINUTES)
+        with self._lock:
+            self._pending = []
+        db = self.session_factory()
+        try:
+            rows = db.query(
+                Hearing.id, Hearing.judge_id, Hearing.location, Hearing.scheduled_date,
+                Hearing.duration_minutes, Hearing.change_seq,
+            ).filter(
+                Hearing.scheduled_date >= since,
+                or_(Hearing.status.is_(None), func.upper(Hearing.status).notin_(INACTIVE_STATUSES)),
+            ).all()
+        finally:
+            db.close()
+        with self._lock:
+            self._bookings.clear()
+            self._seq.clear()
+            self._holders.clear()
+            self._bits.clear()
+            for row in rows:
+                booking = _booking(row.judge_id, row.location, row.scheduled_date, row.duration_minutes, None)
+                self._apply(row.id, booking, row.change_seq)
+            for update in self._pending:
+                self._apply(*update)  # committed after the read; change_seq drops stale ones
+            self._pending = None
+            self._loaded = True
+        logger.info("Loaded availability of %s upcoming hearings", len(rows))
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    # -----------------------------------------------------------
+    # Incremental updates
+    # -----------------------------------------------------------
+    def update(self, hearing_id: int, booking: Optional[Booking], seq: Optional[float]):
+        """Record the hearing's current booking (None: inactive or deleted)."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((hearing_id, booking, seq))
+            elif self._loaded:
+                self._apply(hearing_id, booking, seq)
+                self.updates += 1
+            # else: the first query loads the table, which includes this
+
+    def _apply(self, hearing_id: int, booking: Optional[Booking], seq: Optional[float]):
+        known = self._seq.get(hearing_id)
+        if known is not None and seq is not None and seq < known:
+            return  # an older copy of the row than the one applied
+        if seq is not None:
+            self._seq[hearing_id] = seq
+        old = self._bookings.pop(hearing_id, None)
+        if old == booking:
+            if booking is not None:
+                self._bookings[hearing_id] = booking
+            return  # e.g. only the notes changed
+        touched = set()
+        for held in (old, booking):
+            if held is None:
+                continue
+            for day, _ in held.days():
+                for resource in held.resources():
+                    touched.add((resource, day))
+        if old is not None:
+            for key in touched:
+                self._holders[key].discard(hearing_id)
+        if booking is not None:
+            self._bookings[hearing_id] = booking
+            for day, _ in booking.days():
+                for resource in booking.resources():
+                    self._holders[(resource, day)].add(hearing_id)
+        for key in touched:
+            self._rebuild(key)
+
+    def _rebuild(self, key: Tuple[Resource, date]):
+        holders = self._holders.get(key)
+        if not holders:
+            self._holders.pop(key, None)
+            self._bits.pop(key, None)
+            return
+        bits = 0
+        for hearing_id in holders:
+            for day, mask in self._bookings[hearing_id].days():
+                if day == key[1]:
+                    bits |= mask
+        self._bits[key] = bits
+
+    # -----------------------------------------------------------
+    # Queries
+    # -----------------------------------------------------------
+    def next_free(
+        self,
+        minutes: int,
+        judge_id: Optional[int] = None,
+        room: Optional[str] = None,
+        after: Optional[datetime] = None,
+        limit: int = 5,
+        days: Optional[int] = None,
+    ) -> List[datetime]:
+        """
+        Earliest ``limit`` starts, at or after ``after``, when the judge and
+        the room are both free for ``minutes`` within sitting hours on a
+        weekday. Suggestions don't overlap each other.
+        """
+        self._ensure_loaded()
+        began = time.perf_counter()
+        if after is None:
+            after = datetime.utcnow()
+        elif after.tzinfo is not None:
+            after = after.astimezone(timezone.utc).replace(tzinfo=None)
+        length = -(-minutes // SLOT_MINUTES)
+        opens, closes = _slot_of(config.HEARING_DAY_START), _slot_of(config.HEARING_DAY_END)
+        sitting = ((1 << closes) - 1) ^ ((1 << opens) - 1)
+        resources = [r for r in (("judge", judge_id), ("room", room)) if r[1] is not None]
+
+        with self._lock:
+            found = self._scan(resources, after, length, sitting, limit, days or config.HEARING_HORIZON_DAYS)
+        self.queries += 1
+        self.query_seconds += time.perf_counter() - began
+        return found
+
+    def _scan(self, resources, after: datetime, length: int, sitting: int, limit: int, days: int) -> List[datetime]:
+        found = []
+        bits = self._bits
+        for offset in range(days):
+            day = after.date() + timedelta(days=offset)
+            if day.weekday() >= 5:
+                continue
+            free = sitting
+            for resource in resources:
+                free &= ~bits.get((resource, day), 0)
+            if offset == 0:
+                minute = after.hour * 60 + after.minute + (1 if after.second or after.microsecond else 0)
+                free &= ~((1 << -(-minute // SLOT_MINUTES)) - 1)
+            starts = free
+            for shift in range(1, length):
+                starts &= free >> shift  # the following slots are free too
+            midnight = datetime(day.year, day.month, day.day)
+            while starts and len(found) < limit:
+                slot = (starts & -starts).bit_length() - 1
+                found.append(midnight + timedelta(minutes=slot * SLOT_MINUTES))
+                starts &= ~((1 << (slot + length)) - 1)
+            if len(found) >= limit:
+                break
+        return found
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._loaded,
+            "hearings": len(self._bookings),
+            "bitmaps": len(self._bits),
+            "updates": self.updates,
+            "queries": self.queries,
+            "avg_query_us": round(self.query_seconds / self.queries * 1e6, 1) if self.queries else None,
+        }
+
+
+availability = AvailabilityIndex()
+
+
+@on_commit(Hearing)
+def _track_hearings(changes: List[Change]):
+    for change in changes:
+        if change.op == "delete":
+            availability.update(change.id, None, float("inf"))
+            continue
+        v = change.values
+        booking = _booking(v.get("judge_id"), v.get("location"), v.get("scheduled_date"),
+                           v.get("duration_minutes"), v.get("status"))
+        availability.update(change.id, booking, v.get("change_seq"))
+
+
+@outbox.subscribe(outbox.HEARING_SCHEDULED, outbox.HEARING_UPDATED, outbox.HEARING_CANCELLED, broadcast=True)
+def refresh_hearings(events: List[outbox.DomainEvent]):
+    """
+    Hearings changed by other workers (this worker's commits are already
+    applied; rereading them is harmless). Rereads the rows named rather
+    than trusting the event payload, so the index always takes a committed
+    state and skips it if it is older than what it has.
+    """
+    if not availability._loaded:
+        return
+    ids = {e.entity_id for e in events}
+    db = availability.session_factory()
+    try:
+        rows = {
+            row.id: row for row in db.query(
+                Hearing.id, Hearing.judge_id, Hearing.location, Hearing.scheduled_date,
+                Hearing.duration_minutes, Hearing.status, Hearing.change_seq,
+            ).filter(Hearing.id.in_(ids))
+        }
+    finally:
+        db.close()
+    for hearing_id in ids:
+        row = rows.get(hearing_id)
+        if row is None:
+            availability.update(hearing_id, None, float("inf"))
+        else:
+            booking = _booking(row.judge_id, row.location, row.scheduled_date, row.duration_minutes, row.status)
+            availability.update(hearing_id, booking, row.change_seq)
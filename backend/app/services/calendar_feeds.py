@@ -0,0 +1,285 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from app.core import config, outbox
+from app.core.db_events import Change, on_commit
+from app.database import SessionLocal
+from app.models import Case, Hearing
+
+logger = logging.getLogger(__name__)
+
+FeedKey = Tuple[str, object]  # ("judge", user id) or ("room", location)
+CALLED_OFF = ("CANCELLED", "POSTPONED", "ADJOURNED")  # shown as cancelled events
+
+
+# ===============================================================
+# 🖨️ iCalendar Rendering (RFC 5545)
+# ===============================================================
+def _text(value) -> str:
+    return (
+        str(value or "")
+        .replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Split lines longer than 75 octets; continuation lines start with a space."""
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line
+    parts, limit = [], 75
+    while data:
+        cut = min(limit, len(data))
+        while cut < len(data) and data[cut] & 0xC0 == 0x80:  # never split a UTF-8 sequence
+            cut -= 1
+        parts.append(data[:cut].decode("utf-8"))
+        data, limit = data[cut:], 74
+    return "\r\n ".join(parts)
+
+
+def _local(value: datetime) -> str:
+    # Hearing times are stored as entered, without a zone: "floating" times
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def _utc(value: datetime) -> str:
+    # updated_at is stored as naive UTC
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+class HearingRow(NamedTuple):
+    id: int
+    case_id: int
+    case_title: Optional[str]
+    judge_id: Optional[int]
+    location: Optional[str]
+    scheduled_date: datetime
+    duration_minutes: Optional[int]
+    status: Optional[str]
+    updated_at: Optional[datetime]
+    change_seq: Optional[int]
+
+
+def render_event(h: HearingRow) -> str:
+    """
+    One VEVENT. DTSTAMP and LAST-MODIFIED are the row's ``updated_at`` and
+    SEQUENCE its ``change_seq``, so calendar clients see which events
+    changed. Everything in it is read from the row, and every update of a
+    hearing reaches every worker through the outbox, so all workers render
+    a hearing identically and agree on the feed's ETag.
+    """
+    minutes = h.duration_minutes or config.HEARING_DEFAULT_MINUTES
+    status = h.status or "Scheduled"
+    title = h.case_title or f"Case #{h.case_id}"
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:hearing-{h.id}@jirams",
+        # Required; rows written before change tracking may lack updated_at
+        f"DTSTAMP:{_utc(h.updated_at or h.scheduled_date)}",
+        f"SEQUENCE:{h.change_seq or 0}",
+        f"DTSTART:{_local(h.scheduled_date)}",
+        f"DTEND:{_local(h.scheduled_date + timedelta(minutes=minutes))}",
+        f"SUMMARY:{_text('Hearing: ' + title)}",
+        f"LOCATION:{_text(h.location)}",
+        f"DESCRIPTION:{_text(f'Case #{h.case_id}. Status: {status}.')}",
+        f"STATUS:{'CANCELLED' if status.upper() in CALLED_OFF else 'CONFIRMED'}",
+    ]
+    if h.updated_at:
+        lines.append(f"LAST-MODIFIED:{_utc(h.updated_at)}")
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) + "\r\n" for line in lines)
+
+
+def _feed_name(key: FeedKey) -> str:
+    kind, value = key
+    return f"JIRAMS hearings - judge #{value}" if kind == "judge" else f"JIRAMS hearings - {value}"
+
+
+def _keys_of(judge_id: Optional[int], location: Optional[str]) -> Set[FeedKey]:
+    keys = set()
+    if judge_id is not None:
+        keys.add(("judge", judge_id))
+    if location and location.strip():
+        keys.add(("room", location.strip()))
+    return keys
+
+
+# ===============================================================
+# 📅 Feed Cache
+# ===============================================================
+class Feed:
+    __slots__ = ("key", "events", "body", "etag", "built_at")
+
+    def __init__(self, key: FeedKey):
+        self.key = key
+        self.events: Dict[int, Tuple[datetime, int, str]] = {}  # hearing id -> (start, case id, VEVENT)
+        self.body: Optional[bytes] = None  # None: an event changed since the last render
+        self.etag: Optional[str] = None
+        self.built_at = time.monotonic()
+
+
+class CalendarFeeds:
+    """
+    Per-judge and per-room ``.ics`` feeds, rendered once and patched.
+
+    Each feed keeps one pre-rendered VEVENT per hearing. A hearing change
+    (committed here, or by another worker via the outbox) only marks the
+    hearing dirty; the next request for any feed rereads the dirty
+    hearings in one query, re-renders just those events in the loaded feeds
+    they leave or join, and reassembles only the feeds that changed. The
+    ETag is a hash of the body, which is rendered from row values only
+    (``updated_at`` and ``change_seq`` included), so every worker hands out
+    the same tag for the same content and an unchanged poll is a 304 with
+    no rendering.
+    Feeds are rebuilt from scratch after ``CALENDAR_MAX_AGE_SECONDS`` (case
+    titles, the trailing window) and the least recently used are dropped
+    beyond ``CALENDAR_CACHE_FEEDS``.
+    """
+
+    def __init__(self, session_factory=SessionLocal, max_feeds: int = config.CALENDAR_CACHE_FEEDS):
+        self.session_factory = session_factory
+        self.max_feeds = max_feeds
+        self._lock = threading.Lock()
+        self._feeds: "OrderedDict[FeedKey, Feed]" = OrderedDict()
+        self._dirty: Set[int] = set()
+        self._building = 0
+        self.builds = 0
+        self.patched_events = 0
+        self.renders = 0
+        self.not_modified = 0
+
+    # -----------------------------------------------------------
+    # Reading
+    # -----------------------------------------------------------
+    def _query(self, db):
+        return db.query(
+            Hearing.id, Hearing.case_id, Case.title, Hearing.judge_id, Hearing.location,
+            Hearing.scheduled_date, Hearing.duration_minutes, Hearing.status, Hearing.updated_at, Hearing.change_seq,
+        ).outerjoin(Case, Case.id == Hearing.case_id)
+
+    def _build(self, key: FeedKey) -> Feed:
+        since = datetime.utcnow() - timedelta(days=config.CALENDAR_PAST_DAYS)
+        kind, value = key
+        db = self.session_factory()
+        try:
+            same = Hearing.judge_id == value if kind == "judge" else Hearing.location == value
+            rows = [HearingRow(*row) for row in self._query(db).filter(same, Hearing.scheduled_date >= since)]
+        finally:
+            db.close()
+        feed = Feed(key)
+        for row in rows:
+            feed.events[row.id] = (row.scheduled_date, row.case_id, render_event(row))
+        self.builds += 1
+        return feed
+
+    def _patch(self):
+        """Re-render the hearings that changed since the last request."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        if not dirty:
+            return
+        db = self.session_factory()
+        try:
+            rows = {row[0]: HearingRow(*row) for row in self._query(db).filter(Hearing.id.in_(dirty))}
+        finally:
+            db.close()
+        since = datetime.utcnow() - timedelta(days=config.CALENDAR_PAST_DAYS)
+        with self._lock:
+            for hearing_id in dirty:
+                row = rows.get(hearing_id)
+                wanted = _keys_of(row.judge_id, row.location) if row and row.scheduled_date >= since else set()
+                event = render_event(row) if wanted else None
+                for key, feed in self._feeds.items():
+                    if key in wanted:
+                        entry = (row.scheduled_date, row.case_id, event)
+                        if feed.events.get(hearing_id) != entry:
+                            feed.events[hearing_id] = entry
+                            feed.body = None
+                    elif feed.events.pop(hearing_id, None) is not None:
+                        feed.body = None
+                self.patched_events += 1
+            if self._building:
+                self._dirty |= dirty  # a feed being read may predate these; patch it once it is in
+
+    def get(self, key: FeedKey) -> Tuple[bytes, str]:
+        """The feed's body and ETag, building or patching it as needed."""
+        self._patch()
+        with self._lock:
+            feed = self._feeds.get(key)
+            if feed is not None and time.monotonic() - feed.built_at > config.CALENDAR_MAX_AGE_SECONDS:
+                feed = None
+            if feed is not None:
+                self._feeds.move_to_end(key)
+        if feed is None:
+            with self._lock:
+                self._building += 1  # from here on, changes are marked dirty
+            try:
+                feed = self._build(key)
+            finally:
+                with self._lock:
+                    self._building -= 1
+            with self._lock:
+                self._feeds[key] = feed
+                self._feeds.move_to_end(key)
+                while len(self._feeds) > self.max_feeds:
+                    self._feeds.popitem(last=False)
+            # Changes committed while it was read are re-applied to it
+            self._patch()
+        with self._lock:
+            if feed.body is None:
+                feed.body = self._assemble(feed)
+                feed.etag = '"' + hashlib.sha1(feed.body).hexdigest()[:20] + '"'
+                self.renders += 1
+            return feed.body, feed.etag
+
+    def _assemble(self, feed: Feed) -> bytes:
+        head = [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            "PRODID:-//JIRAMS//Hearings//EN",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            _fold(f"X-WR-CALNAME:{_text(_feed_name(feed.key))}"),
+        ]
+        events = [text for _, _, text in sorted(feed.events.values())]  # same order in every worker
+        return ("\r\n".join(head) + "\r\n" + "".join(events) + "END:VCALENDAR\r\n").encode("utf-8")
+
+    # -----------------------------------------------------------
+    # Invalidation
+    # -----------------------------------------------------------
+    def mark(self, hearing_ids):
+        if not self._feeds and not self._building:
+            return  # nothing rendered yet; feeds are built fresh
+        with self._lock:
+            self._dirty.update(hearing_ids)
+
+    def stats(self) -> dict:
+        return {
+            "feeds": len(self._feeds),
+            "events": sum(len(f.events) for f in self._feeds.values()),
+            "dirty": len(self._dirty),
+            "builds": self.builds,
+            "patched_events": self.patched_events,
+            "renders": self.renders,
+            "not_modified": self.not_modified,
+        }
+
+
+calendar_feeds = CalendarFeeds()
+
+
+@on_commit(Hearing)
+def _hearings_changed(changes: List[Change]):
+    calendar_feeds.mark(change.id for change in changes)
+
+
+@outbox.subscribe(outbox.HEARING_SCHEDULED, outbox.HEARING_UPDATED, outbox.HEARING_CANCELLED, broadcast=True)
+def mark_remote_hearings(events: List[outbox.DomainEvent]):
+    """Hearings changed by other workers (this worker's are already marked)."""
+    calendar_feeds.mark(e.entity_id for e in events)
@@ -0,0 +1,42 @@
+import logging
+from typing import List
+
+from app.core import jobs, outbox
+from app.core.outbox import DomainEvent
+from app.services import auto_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+# ===============================================================
+# ⚖️ Case Workflow Side Effects
+# ===============================================================
+@outbox.subscribe(outbox.CASE_STATUS_CHANGED)
+def schedule_hearing_after_review(events: List[DomainEvent]):
+    """
+    Cases moved to REVIEWED are booked by a background auto-scheduler run
+    (judge, courtroom and time, see ``auto_scheduler``), each hearing
+    registered by the user who reviewed its case. A run books every case
+    still waiting, so retries and overlapping runs are safe.
+    """
+    reviewed = [
+        e for e in events
+        if (e.payload.get("to") or "").upper() == "REVIEWED" and (e.payload.get("from") or "").upper() != "REVIEWED"
+    ]
+    reviewed_by = {}
+    for event in reviewed:
+        if event.actor_id is None:
+            logger.warning("Case %s reviewed by an unknown user; it waits for the next run", event.case_id)
+            continue
+        reviewed_by[event.case_id] = event.actor_id
+    if not reviewed_by:
+        return
+
+    # No dedupe key: a run already in progress may have read the cases
+    # before these were reviewed, and an extra run that finds nothing is cheap
+    requester = list(reviewed_by.values())[-1]
+    jobs.submit(
+        auto_scheduler.AUTO_SCHEDULE_JOB,
+        auto_scheduler.job_payload(requester, reviewed_by=reviewed_by),
+        created_by_id=requester,
+    )
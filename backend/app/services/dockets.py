@@ -0,0 +1,429 @@
+import hashlib
+import html
+import io
+import json
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.orm import Session, aliased
+
+from app.core import config, outbox
+from app.core.cache import MISSING, TTLCache
+from app.core.writer import writer
+from app.database import SessionLocal, engine
+from app.models import Case, CauseListEntry, Docket, Hearing, User
+
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+except ImportError:  # pragma: no cover - optional dependency
+    canvas = None
+
+logger = logging.getLogger(__name__)
+
+DocketKey = Tuple[date, str]  # (day, courtroom)
+
+_Filer, _Assignee, _Judge = aliased(User), aliased(User), aliased(User)
+ENTRY_FIELDS = (
+    "day", "room", "starts_at", "ends_at", "case_id", "case_title", "filed_by", "assigned_to", "judge", "status",
+)
+# Case columns a cause list prints (besides the assignee, which has its own event)
+PRINTED_CASE_FIELDS = {"title", "created_by_id"}
+
+
+def _room(location: Optional[str]) -> str:
+    return (location or "").strip() or "Unassigned"
+
+
+def _entry_rows(db: Session):
+    """Hearings with everything a cause list prints, in one query."""
+    return (
+        db.query(
+            Hearing.id, Hearing.scheduled_date, Hearing.duration_minutes, Hearing.location, Hearing.status,
+            Hearing.case_id, Case.title, _Filer.email, _Assignee.email, _Judge.email,
+        )
+        .outerjoin(Case, Case.id == Hearing.case_id)
+        .outerjoin(_Filer, _Filer.id == Case.created_by_id)
+        .outerjoin(_Assignee, _Assignee.id == Case.assigned_to_id)
+        .outerjoin(_Judge, _Judge.id == Hearing.judge_id)
+    )
+
+
+def _entry_values(row) -> dict:
+    hearing_id, starts_at, minutes, location, status, case_id, title, filer, assignee, judge = row
+    return {
+        "day": starts_at.date(),
+        "room": _room(location),
+        "starts_at": starts_at,
+        "ends_at": starts_at + timedelta(minutes=minutes or config.HEARING_DEFAULT_MINUTES),
+        "case_id": case_id,
+        "case_title": title,
+        "filed_by": filer,
+        "assigned_to": assignee,
+        "judge": judge,
+        "status": status or "Scheduled",
+    }
+
+
+# ===============================================================
+# 🔁 Incremental Maintenance
+# ===============================================================
+def refresh(db: Session, hearing_ids: Iterable[int] = (), case_ids: Iterable[int] = ()) -> Set[DocketKey]:
+    """
+    Bring the entries of the given hearings (and of every hearing of the
+    given cases) in line with the hearings table, then re-render each
+    courtroom list that gained, lost or changed an entry. Idempotent, so
+    a redelivered event is harmless. Returns the dockets re-rendered.
+    """
+    ids = set(hearing_ids)
+    case_ids = set(case_ids)
+    if case_ids:
+        ids |= {hearing_id for (hearing_id,) in db.query(Hearing.id).filter(Hearing.case_id.in_(case_ids))}
+        ids |= {
+            hearing_id for (hearing_id,) in
+            db.query(CauseListEntry.hearing_id).filter(CauseListEntry.case_id.in_(case_ids))
+        }
+    if not ids:
+        return set()
+    current = {row[0]: _entry_values(row) for row in _entry_rows(db).filter(Hearing.id.in_(ids))}
+    existing = {e.hearing_id: e for e in db.query(CauseListEntry).filter(CauseListEntry.hearing_id.in_(ids))}
+
+    touched: Set[DocketKey] = set()
+    for hearing_id in ids:
+        entry, values = existing.get(hearing_id), current.get(hearing_id)
+        if entry is not None and values is not None:
+            if all(getattr(entry, field) == values[field] for field in ENTRY_FIELDS):
+                continue  # e.g. only the notes changed
+            touched.add((entry.day, entry.room))
+            for field in ENTRY_FIELDS:
+                setattr(entry, field, values[field])
+        elif entry is not None:
+            touched.add((entry.day, entry.room))
+            db.delete(entry)
+        elif values is not None:
+            db.add(CauseListEntry(hearing_id=hearing_id, **values))
+        else:
+            continue
+        if values is not None:
+            touched.add((values["day"], values["room"]))
+    if not touched:
+        return touched
+    db.flush()
+
+    dockets = {(d.day, d.room): d for d in _dockets(db, touched)}
+    for key in touched:
+        docket = dockets.get(key)
+        if docket is None:
+            docket = Docket(day=key[0], room=key[1], version=1)
+            _render_into(db, docket)
+            db.add(docket)
+        else:
+            docket.version += 1
+            _render_into(db, docket)
+    return touched
+
+
+def _dockets(db: Session, keys: Set[DocketKey]) -> List[Docket]:
+    days = {day for day, _ in keys}
+    return [d for d in db.query(Docket).filter(Docket.day.in_(days)) if (d.day, d.room) in keys]
+
+
+@outbox.subscribe(
+    outbox.HEARING_SCHEDULED, outbox.HEARING_UPDATED, outbox.HEARING_CANCELLED,
+    outbox.CASE_UPDATED, outbox.CASE_ASSIGNED, outbox.CASE_DELETED,
+)
+def refresh_dockets(events: List[outbox.DomainEvent]):
+    """
+    Re-render the cause lists a batch of hearing, case title or filer and
+    assignment changes touched, once for all workers. The clerks' and screens' reads that
+    follow are served from the stored artifacts.
+    """
+    hearing_ids = {e.entity_id for e in events if e.entity == "hearing"}
+    case_ids = {
+        e.entity_id for e in events
+        if e.entity == "case" and (e.type != outbox.CASE_UPDATED or PRINTED_CASE_FIELDS & set(e.payload["changed"]))
+    }
+    if not hearing_ids and not case_ids:
+        return  # e.g. only a case description changed
+    touched = writer.call(lambda db: refresh(db, hearing_ids, case_ids))
+    if touched:
+        logger.info("Re-rendered %s cause lists", len(touched))
+
+
+def ensure_dockets():
+    """
+    Fill the cause list from the hearings already booked, the first time
+    the table exists. Dockets are created unrendered and rendered on their
+    first request.
+    """
+    with engine.begin() as conn:
+        if conn.execute(select(CauseListEntry.hearing_id).limit(1)).first() is not None:
+            return
+        if conn.execute(select(Hearing.id).limit(1)).first() is None:
+            return
+        minutes = func.coalesce(Hearing.duration_minutes, config.HEARING_DEFAULT_MINUTES)
+        room = func.coalesce(func.nullif(func.trim(Hearing.location), ""), "Unassigned")
+        rows = (
+            select(
+                Hearing.id, func.date(Hearing.scheduled_date), room, Hearing.scheduled_date,
+                func.datetime(Hearing.scheduled_date, func.printf("+%d minutes", minutes)),
+                Hearing.case_id, Case.title, _Filer.email, _Assignee.email, _Judge.email,
+                func.coalesce(Hearing.status, "Scheduled"),
+            )
+            .select_from(Hearing)
+            .outerjoin(Case, Case.id == Hearing.case_id)
+            .outerjoin(_Filer, _Filer.id == Case.created_by_id)
+            .outerjoin(_Assignee, _Assignee.id == Case.assigned_to_id)
+            .outerjoin(_Judge, _Judge.id == Hearing.judge_id)
+        )
+        conn.execute(insert(CauseListEntry).from_select(("hearing_id",) + ENTRY_FIELDS, rows))
+        conn.execute(insert(Docket).from_select(
+            ("day", "room", "version", "hearings"),
+            select(CauseListEntry.day, CauseListEntry.room, literal(1), func.count())
+            .group_by(CauseListEntry.day, CauseListEntry.room),
+        ))
+    logger.info("Built cause list entries for existing hearings")
+
+
+# ===============================================================
+# 🖨️ Rendering
+# ===============================================================
+class Listing(NamedTuple):
+    position: int
+    hearing_id: int
+    case_id: int
+    case_title: Optional[str]
+    starts_at: datetime
+    ends_at: datetime
+    judge: Optional[str]
+    filed_by: Optional[str]
+    assigned_to: Optional[str]
+    status: Optional[str]
+
+
+def _listings(db: Session, day: date, room: str) -> List[Listing]:
+    rows = db.query(
+        CauseListEntry.hearing_id, CauseListEntry.case_id, CauseListEntry.case_title,
+        CauseListEntry.starts_at, CauseListEntry.ends_at, CauseListEntry.judge,
+        CauseListEntry.filed_by, CauseListEntry.assigned_to, CauseListEntry.status,
+    ).filter(
+        CauseListEntry.day == day, CauseListEntry.room == room
+    ).order_by(CauseListEntry.starts_at, CauseListEntry.hearing_id)
+    return [Listing(n, *row) for n, row in enumerate(rows, start=1)]
+
+
+def _render_into(db: Session, docket: Docket):
+    listings = _listings(db, docket.day, docket.room)
+    body = render_json(docket.day, docket.room, docket.version, listings)
+    docket.hearings = len(listings)
+    docket.json = body
+    docket.html = render_html(docket.day, docket.room, listings)
+    docket.pdf = render_pdf(docket.day, docket.room, listings)
+    docket.etag = hashlib.sha1(body.encode("utf-8")).hexdigest()[:20]
+    docket.rendered_version = docket.version
+    docket.rendered_at = datetime.utcnow()
+
+
+def render_json(day: date, room: str, version: int, listings: List[Listing]) -> str:
+    return json.dumps({
+        "date": day.isoformat(),
+        "room": room,
+        "version": version,
+        "hearings": [
+            {
+                "position": l.position,
+                "hearing_id": l.hearing_id,
+                "case_id": l.case_id,
+                "case_title": l.case_title,
+                "starts_at": l.starts_at.isoformat(),
+                "ends_at": l.ends_at.isoformat(),
+                "judge": l.judge,
+                "parties": {"filed_by": l.filed_by, "assigned_to": l.assigned_to},
+                "status": l.status,
+            }
+            for l in listings
+        ],
+    }, separators=(",", ":"))
+
+
+def _heading(day: date, room: str) -> Tuple[str, str]:
+    return f"{config.DOCKET_COURT_NAME} - Cause List", f"{room} - {day.strftime('%A %d %B %Y')}"
+
+
+def render_html(day: date, room: str, listings: List[Listing]) -> str:
+    title, subtitle = _heading(day, room)
+    rows = "".join(
+        "<tr>"
+        f"<td>{l.position}</td>"
+        f"<td>{l.starts_at:%H:%M}&ndash;{l.ends_at:%H:%M}</td>"
+        f"<td>#{l.case_id} {html.escape(l.case_title or '')}</td>"
+        f"<td>{html.escape(l.filed_by or '')}<br>{html.escape(l.assigned_to or '')}</td>"
+        f"<td>{html.escape(l.judge or '')}</td>"
+        f"<td>{html.escape(l.status or '')}</td>"
+        "</tr>"
+        for l in listings
+    ) or '<tr><td colspan="6">No hearings listed.</td></tr>'
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\">"
+        f"<title>{html.escape(subtitle)}</title>"
+        "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;width:100%}"
+        "th,td{border:1px solid #999;padding:4px 8px;text-align:left;vertical-align:top}</style>"
+        f"</head><body><h1>{html.escape(title)}</h1><h2>{html.escape(subtitle)}</h2>"
+        "<table><thead><tr><th>No.</th><th>Time</th><th>Case</th><th>Parties</th><th>Judge</th>"
+        f"<th>Status</th></tr></thead><tbody>{rows}</tbody></table></body></html>"
+    )
+
+
+def _text_lines(day: date, room: str, listings: List[Listing]) -> List[str]:
+    def cut(value, width):
+        value = value or ""
+        return value if len(value) <= width else value[:width - 1] + "~"
+
+    lines = list(_heading(day, room)) + ["", f"{'No.':<4} {'Time':<11} {'Case':<40} {'Judge':<24} Status"]
+    for l in listings:
+        case = cut(f"#{l.case_id} {l.case_title or ''}", 40)
+        time = f"{l.starts_at:%H:%M}-{l.ends_at:%H:%M}"
+        lines.append(f"{l.position:<4} {time} {case:<40} {cut(l.judge, 24):<24} {cut(l.status, 12)}")
+        lines.append(f"{'':<16} Parties: {cut(l.filed_by, 34)} / {cut(l.assigned_to, 34)}")
+    if not listings:
+        lines.append("No hearings listed.")
+    return lines
+
+
+def render_pdf(day: date, room: str, listings: List[Listing]) -> bytes:
+    """A4 PDF of the list: with reportlab when installed, else a plain text-only PDF."""
+    lines = _text_lines(day, room, listings)
+    if canvas is None:
+        return _basic_pdf(lines)
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4, invariant=1)  # invariant: same bytes for the same list
+    width, height = A4
+    y = height - 50
+    for number, line in enumerate(lines):
+        if y < 50:
+            pdf.showPage()
+            y = height - 50
+        pdf.setFont("Courier-Bold" if number < 2 else "Courier", 9)
+        pdf.drawString(40, y, line)
+        y -= 13
+    pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def _basic_pdf(lines: List[str], per_page: int = 58) -> bytes:
+    """Minimal PDF 1.4: Courier text, A4 pages, Latin-1 only."""
+    def escape(text: str) -> bytes:
+        raw = text.encode("latin-1", "replace")
+        return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+    pages = [lines[i:i + per_page] for i in range(0, len(lines), per_page)] or [[]]
+    font = b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>"
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, font]
+    kids = []
+    for page in pages:
+        stream = b"BT /F1 9 Tf 13 TL 40 792 Td " + b"".join(b"(" + escape(line) + b") '" for line in page) + b" ET"
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> "
+            b"/Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    out.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+# ===============================================================
+# 📋 Serving
+# ===============================================================
+class Rendered(NamedTuple):
+    version: int
+    etag: str
+    json: str
+    html: str
+    pdf: bytes
+
+
+class DocketCache:
+    """
+    Rendered courtroom lists held per worker. Each request reads just the
+    day's ``(room, version)`` pairs, one indexed query with no blobs, and
+    the artifacts come from memory unless the version moved on; a docket
+    never rendered (backfilled, or rendered by an older build) is rendered
+    once and stored for every worker.
+    """
+
+    def __init__(self, session_factory=SessionLocal, maxsize: int = config.DOCKET_CACHE_ENTRIES):
+        self.session_factory = session_factory
+        self.cache = TTLCache(maxsize=maxsize)
+        self.loads = 0
+        self.renders = 0
+        self.not_modified = 0
+
+    def day(self, db: Session, day: date, room: Optional[str] = None) -> Dict[str, Rendered]:
+        """The day's non-empty courtroom lists (or just ``room``'s), by room name."""
+        query = db.query(Docket.room, Docket.version, Docket.rendered_version).filter(
+            Docket.day == day, Docket.hearings > 0
+        )
+        if room is not None:
+            query = query.filter(Docket.room == room)
+        heads = query.order_by(Docket.room).all()
+
+        found: Dict[str, Rendered] = {}
+        missing = []
+        for name, version, rendered_version in heads:
+            cached = self.cache.get((day, name))
+            if cached is not MISSING and cached.version == version:
+                found[name] = cached
+            else:
+                missing.append((name, version, rendered_version))
+        stale = [name for name, version, rendered_version in missing if rendered_version != version]
+        if stale:
+            writer.call(lambda wdb: self._render(wdb, day, stale))
+            self.renders += len(stale)
+        if missing:
+            rows = db.query(
+                Docket.room, Docket.rendered_version, Docket.etag, Docket.json, Docket.html, Docket.pdf
+            ).filter(Docket.day == day, Docket.room.in_([name for name, _, _ in missing]))
+            db.expire_all()  # see what the writer just stored
+            for name, version, etag, body, page, pdf in rows:
+                found[name] = Rendered(version, etag, body, page, pdf)
+                self.cache.set((day, name), found[name])
+            self.loads += len(missing)
+        return {name: found[name] for name, _, _ in heads if name in found}
+
+    def room(self, db: Session, day: date, room: str) -> Rendered:
+        """One courtroom's list; an empty one when nothing is listed there that day."""
+        found = self.day(db, day, room)
+        if room in found:
+            return found[room]
+        body = render_json(day, room, 0, [])
+        return Rendered(
+            0, hashlib.sha1(body.encode("utf-8")).hexdigest()[:20], body,
+            render_html(day, room, []), render_pdf(day, room, []),
+        )
+
+    @staticmethod
+    def _render(db: Session, day: date, rooms: List[str]):
+        for docket in db.query(Docket).filter(Docket.day == day, Docket.room.in_(rooms)):
+            if docket.rendered_version != docket.version:
+                _render_into(db, docket)
+
+    def stats(self) -> dict:
+        return {**self.cache.stats(), "loads": self.loads, "renders": self.renders, "not_modified": self.not_modified}
+
+
+docket_cache = DocketCache()
@@ -0,0 +1,242 @@
+import io
+import logging
+import re
+import zipfile
+import zlib
+from typing import List, Optional
+from xml.etree import ElementTree
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core import config, jobs
+from app.core.compression import SeekableReader
+from app.core.storage import get_storage
+from app.database import SessionLocal, engine
+from app.models import Document
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "document_text"
+
+# ===============================================================
+# 📄 Text Extraction (runs inside worker processes)
+# ===============================================================
+_DOCX_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_PDF_STREAM = re.compile(rb"stream\r?\n(.*?)\r?\nendstream", re.S)
+_PDF_TEXT_BLOCK = re.compile(rb"BT(.*?)ET", re.S)
+_PDF_LITERAL = re.compile(rb"\(((?:\\.|[^\\)])*)\)", re.S)
+
+
+def _read_document(file_path: str, compression: Optional[str], stored_size: Optional[int]) -> bytes:
+    storage = get_storage()
+    if compression:
+        return b"".join(SeekableReader(storage, file_path, stored_size).read())
+    return b"".join(storage.read(file_path))
+
+
+def _extract_docx(data: bytes) -> str:
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        root = ElementTree.fromstring(archive.read("word/document.xml"))
+    paragraphs = []
+    for paragraph in root.iter(f"{_DOCX_NS}p"):
+        paragraphs.append("".join(node.text or "" for node in paragraph.iter(f"{_DOCX_NS}t")))
+    return "\n".join(p for p in paragraphs if p)
+
+
+def _extract_pdf(data: bytes) -> str:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return _extract_pdf_basic(data)
+    reader = PdfReader(io.BytesIO(data))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _extract_pdf_basic(data: bytes) -> str:
+    """Best-effort fallback when pypdf is not installed: literal strings in text blocks."""
+    chunks = []
+    for match in _PDF_STREAM.finditer(data):
+        stream = match.group(1)
+        try:
+            stream = zlib.decompress(stream)
+        except zlib.error:
+            pass
+        for block in _PDF_TEXT_BLOCK.findall(stream):
+            words = [
+                literal.replace(b"\\(", b"(").replace(b"\\)", b")").replace(b"\\\\", b"\\")
+                for literal in _PDF_LITERAL.findall(block)
+            ]
+            chunks.append(b"".join(words).decode("latin-1"))
+    return "\n".join(chunks)
+
+
+def extract_text(
+    file_path: str,
+    file_type: Optional[str],
+    filename: str,
+    compression: Optional[str] = None,
+    stored_size: Optional[int] = None,
+) -> str:
+    """Pull plain text out of a stored PDF, DOCX or text document."""
+    file_type = (file_type or "").lower()
+    name = filename.lower()
+    data = _read_document(file_path, compression, stored_size)
+
+    if file_type == "application/pdf" or name.endswith(".pdf"):
+        content = _extract_pdf(data)
+    elif "wordprocessingml" in file_type or name.endswith(".docx"):
+        content = _extract_docx(data)
+    elif file_type.startswith("text/") or name.endswith((".txt", ".md", ".csv")):
+        content = data.decode("utf-8", errors="replace")
+    else:
+        content = ""
+    return content[:config.EXTRACTION_MAX_CHARS]
+
+
+# ===============================================================
+# 🔎 FTS5 Index
+# ===============================================================
+def ensure_index():
+    """Create the FTS5 table holding extracted document text."""
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "filename, description, content, "
+            "document_id UNINDEXED, case_id UNINDEXED, "
+            "tokenize = 'porter unicode61')"
+        ))
+
+
+def store_text(document_id: int, case_id: int, filename: str, description: Optional[str], content: str):
+    with engine.begin() as conn:
+        conn.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": document_id})
+        conn.execute(
+            text(
+                f"INSERT INTO {FTS_TABLE} (rowid, filename, description, content, document_id, case_id) "
+                "VALUES (:id, :filename, :description, :content, :id, :case_id)"
+            ),
+            {
+                "id": document_id,
+                "case_id": case_id,
+                "filename": filename,
+                "description": description or "",
+                "content": content,
+            },
+        )
+
+
+def remove_text(db: Session, document_id: int):
+    """Drop a document's indexed text in the caller's transaction."""
+    db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": document_id})
+
+
+def _match_expression(query: str) -> str:
+    """Turn free text into a safe FTS5 query: every word must match (prefix on the last)."""
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search(db: Session, query: str, case_id: Optional[int] = None, limit: int = 20) -> List[dict]:
+    """Ranked full-text hits with highlighted snippets."""
+    match = _match_expression(query)
+    if not match:
+        return []
+    sql = (
+        f"SELECT d.id, d.case_id, d.filename, c.title, "
+        f"snippet({FTS_TABLE}, -1, '<mark>', '</mark>', '…', 16) AS snippet, "
+        f"bm25({FTS_TABLE}, 4.0, 2.0, 1.0) AS score "
+        f"FROM {FTS_TABLE} "
+        f"JOIN documents d ON d.id = {FTS_TABLE}.rowid "
+        f"LEFT JOIN cases c ON c.id = d.case_id "
+        f"WHERE {FTS_TABLE} MATCH :match "
+    )
+    params = {"match": match, "limit": limit}
+    if case_id is not None:
+        sql += f"AND {FTS_TABLE}.case_id = :case_id "
+        params["case_id"] = case_id
+    sql += "ORDER BY score LIMIT :limit"
+    return [
+        {
+            "document_id": row.id,
+            "case_id": row.case_id,
+            "filename": row.filename,
+            "case_title": row.title,
+            "snippet": row.snippet,
+            "score": round(-row.score, 4),
+        }
+        for row in db.execute(text(sql), params)
+    ]
+
+
+# ===============================================================
+# ⚙️ Extraction Pipeline
+# ===============================================================
+# Extraction runs as a process job so parsing large PDFs never blocks
+# request threads, and a document uploaded just before a restart is still
+# indexed once the server is back.
+EXTRACT_JOB = "document.extract"
+
+
+def queue_extraction(
+    db: Session, document_id: int, priority: int = 0, created_by_id: Optional[int] = None
+) -> int:
+    """Queue (re-)extraction of a document in the caller's transaction."""
+    return jobs.enqueue(
+        db, EXTRACT_JOB, {"document_id": document_id}, priority=priority,
+        dedupe_key=f"{EXTRACT_JOB}:{document_id}", created_by_id=created_by_id,
+    )
+
+
+@jobs.handler(EXTRACT_JOB, pool="process")
+def extract_document(payload: dict) -> dict:
+    """Extract a stored document's text and write it into the FTS5 table."""
+    db = SessionLocal()
+    try:
+        doc = db.get(Document, payload["document_id"])
+        if doc is None:
+            return {"indexed": False}  # deleted before its turn came
+        meta = (doc.id, doc.case_id, doc.filename, doc.description)
+        source = (doc.file_path, doc.file_type, doc.filename, doc.compression, doc.stored_size)
+    finally:
+        db.close()
+    try:
+        content = extract_text(*source)
+    except Exception:
+        # Unreadable files stay searchable by name and description
+        logger.exception("Text extraction failed for document %s", meta[0])
+        content = ""
+    store_text(*meta, content)
+    return {"indexed": True, "chars": len(content)}
+
+
+def reindex_all(batch_size: int = 100) -> int:
+    """Queue re-extraction of every stored document (backfill)."""
+    ensure_index()
+    db = SessionLocal()
+    queued = 0
+    last_id = 0
+    try:
+        while True:
+            ids = [
+                row.id
+                for row in db.query(Document.id)
+                .filter(Document.id > last_id)
+                .order_by(Document.id)
+                .limit(batch_size)
+            ]
+            if not ids:
+                break
+            for document_id in ids:
+                queue_extraction(db, document_id, priority=-1)  # behind fresh uploads
+            db.commit()
+            queued += len(ids)
+            last_id = ids[-1]
+        logger.info("Queued %s documents for reindexing", queued)
+    finally:
+        db.close()
+    return queued
@@ -0,0 +1,122 @@
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from app.core import outbox
+from app.core.db_events import Change, on_flush
+from app.models import Case, CaseNote, Evidence, Hearing, Payment
+
+
+# ===============================================================
+# 🧾 Row Changes -> Domain Events
+# ===============================================================
+# Runs at flush time, so each event is written by the same transaction as
+# the change it describes and disappears with it on rollback.
+
+_BOOKKEEPING = {"updated_at", "change_seq"}  # set on every tracked write
+
+# Case columns the cached case responses render; cause lists print the
+# title and filer
+_CASE_DETAILS = {"title", "description", "category", "notes", "created_by_id"}
+
+
+def _iso(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+@on_flush(Case)
+def _case_events(db: Session, changes: List[Change]):
+    for change in changes:
+        v, previous = change.values, change.previous
+        if change.op == "insert":
+            outbox.record(db, outbox.CASE_FILED, "case", change.id, change.id, {
+                "title": v.get("title"),
+                "category": v.get("category"),
+                "status": v.get("status"),
+                "created_by_id": v.get("created_by_id"),
+                "assigned_to_id": v.get("assigned_to_id"),
+            })
+        elif change.op == "delete":
+            outbox.record(db, outbox.CASE_DELETED, "case", change.id, change.id, {
+                "created_by_id": v.get("created_by_id"),
+                "assigned_to_id": v.get("assigned_to_id"),
+            })
+        else:
+            changed = previous.keys() & _CASE_DETAILS
+            if changed:
+                outbox.record(db, outbox.CASE_UPDATED, "case", change.id, change.id, {
+                    "title": v.get("title"),
+                    "created_by_id": v.get("created_by_id"),
+                    "changed": sorted(changed),
+                })
+            if "status" in previous:
+                outbox.record(db, outbox.CASE_STATUS_CHANGED, "case", change.id, change.id, {
+                    "from": previous["status"],
+                    "to": v.get("status"),
+                })
+            if "assigned_to_id" in previous:
+                outbox.record(db, outbox.CASE_ASSIGNED, "case", change.id, change.id, {
+                    "from": previous["assigned_to_id"],
+                    "to": v.get("assigned_to_id"),
+                })
+
+
+@on_flush(CaseNote)
+def _note_events(db: Session, changes: List[Change]):
+    for change in changes:
+        if change.op == "insert":
+            outbox.record(db, outbox.CASE_NOTE_ADDED, "case_note", change.id, change.values["case_id"], {
+                "author_id": change.values.get("author_id"),
+            })
+
+
+@on_flush(Evidence)
+def _evidence_events(db: Session, changes: List[Change]):
+    for change in changes:
+        v = change.values
+        if change.op == "insert":
+            outbox.record(db, outbox.EVIDENCE_UPLOADED, "evidence", change.id, v["case_id"], {
+                "filename": v.get("filename"),
+                "uploader_id": v.get("uploader_id"),
+            })
+        elif change.op == "update" and "status" in change.previous:
+            outbox.record(db, outbox.EVIDENCE_REVIEWED, "evidence", change.id, v["case_id"], {
+                "from": change.previous["status"],
+                "to": v.get("status"),
+                "uploader_id": v.get("uploader_id"),
+            })
+
+
+@on_flush(Hearing)
+def _hearing_events(db: Session, changes: List[Change]):
+    for change in changes:
+        v, previous = change.values, change.previous
+        details = {
+            "scheduled_date": _iso(v.get("scheduled_date")),
+            "location": v.get("location"),
+            "status": v.get("status"),
+            "judge_id": v.get("judge_id"),
+            "duration_minutes": v.get("duration_minutes"),
+        }
+        if change.op == "insert":
+            outbox.record(db, outbox.HEARING_SCHEDULED, "hearing", change.id, v["case_id"], details)
+        elif change.op == "delete":
+            outbox.record(db, outbox.HEARING_CANCELLED, "hearing", change.id, v["case_id"], details)
+        elif previous.keys() - _BOOKKEEPING:
+            # Notes-only edits too: calendar feeds stamp events with updated_at
+            details["changed"] = sorted(previous.keys() - _BOOKKEEPING)
+            details["previous_judge_id"] = previous.get("judge_id", v.get("judge_id"))
+            outbox.record(db, outbox.HEARING_UPDATED, "hearing", change.id, v["case_id"], details)
+
+
+@on_flush(Payment)
+def _payment_events(db: Session, changes: List[Change]):
+    for change in changes:
+        if change.op == "insert":
+            v = change.values
+            outbox.record(db, outbox.PAYMENT_RECORDED, "payment", change.id, v["case_id"], {
+                "amount": v.get("amount"),
+                "payment_type": v.get("payment_type"),
+                "status": v.get("status"),
+                "payer_id": v.get("payer_id"),
+            })
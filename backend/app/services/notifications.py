@@ -0,0 +1,102 @@
+from typing import Dict, Iterable, List, Tuple
+
+from app.core import outbox
+from app.core.cache import MISSING, TTLCache
+from app.core.event_bus import event_bus
+from app.core.outbox import DomainEvent
+from app.database import SessionLocal
+from app.models import Case
+
+# Staff who follow every case from their dashboards
+STAFF_ROLES = ("REGISTRAR",)
+
+
+# ===============================================================
+# 👥 Case Audience
+# ===============================================================
+# case id -> (created_by_id, assigned_to_id); kept current from case events
+_participants = TTLCache(maxsize=20000, ttl=600)
+
+
+def _audience(case_ids: Iterable[int]) -> Dict[int, Tuple]:
+    """Users attached to each case, loading unknown cases in one query."""
+    found, missing = {}, []
+    for case_id in set(case_ids):
+        cached = _participants.get(case_id)
+        if cached is MISSING:
+            missing.append(case_id)
+        else:
+            found[case_id] = cached
+    if missing:
+        db = SessionLocal()
+        try:
+            rows = db.query(Case.id, Case.created_by_id, Case.assigned_to_id).filter(Case.id.in_(missing)).all()
+        finally:
+            db.close()
+        for case_id, created_by_id, assigned_to_id in rows:
+            found[case_id] = (created_by_id, assigned_to_id)
+            _participants.set(case_id, found[case_id])
+    return found
+
+
+# ===============================================================
+# 🔔 Domain Events -> Push Messages
+# ===============================================================
+def _push_type(event: DomainEvent) -> str:
+    p = event.payload
+    if event.type == outbox.CASE_FILED:
+        return "case.created"
+    if event.type in (outbox.CASE_STATUS_CHANGED, outbox.CASE_ASSIGNED):
+        return "case.updated"
+    if event.type == outbox.CASE_DELETED:
+        return "case.deleted"
+    if event.type == outbox.CASE_NOTE_ADDED:
+        return "case.note_added"
+    if event.type == outbox.EVIDENCE_UPLOADED:
+        return "evidence.added"
+    if event.type == outbox.EVIDENCE_REVIEWED:
+        return "evidence.reviewed"
+    if event.type == outbox.HEARING_SCHEDULED:
+        return "hearing.scheduled"
+    if event.type == outbox.HEARING_CANCELLED:
+        return "hearing.cancelled"
+    if event.type == outbox.HEARING_UPDATED:
+        moved = {"scheduled_date", "location"} & set(p.get("changed", ()))
+        return "hearing.rescheduled" if moved else "hearing.updated"
+    return "payment.recorded"
+
+
+def _push_data(event: DomainEvent) -> dict:
+    p = event.payload
+    if event.type == outbox.CASE_STATUS_CHANGED:
+        return {"status": p["to"]}
+    if event.type == outbox.CASE_ASSIGNED:
+        return {"assigned_to_id": p["to"]}
+    if event.type == outbox.CASE_NOTE_ADDED:
+        return {"note_id": event.entity_id, "author_id": p.get("author_id")}
+    if event.entity in ("evidence", "hearing", "payment"):
+        data = {k: v for k, v in p.items() if k not in ("actor_email", "previous_judge_id")}
+        return {f"{event.entity}_id": event.entity_id, **data}
+    return {k: v for k, v in p.items() if k in ("title", "status")}
+
+
+@outbox.subscribe(
+    outbox.CASE_FILED, outbox.CASE_STATUS_CHANGED, outbox.CASE_ASSIGNED, outbox.CASE_DELETED,
+    outbox.CASE_NOTE_ADDED, outbox.EVIDENCE_UPLOADED, outbox.EVIDENCE_REVIEWED,
+    outbox.HEARING_SCHEDULED, outbox.HEARING_UPDATED, outbox.HEARING_CANCELLED, outbox.PAYMENT_RECORDED,
+    broadcast=True,
+)
+def push_notifications(events: List[DomainEvent]):
+    for event in events:
+        if event.type in (outbox.CASE_FILED, outbox.CASE_ASSIGNED, outbox.CASE_DELETED):
+            _participants.delete(event.case_id)  # reloaded from the row below
+
+    audience = _audience(e.case_id for e in events if e.type != outbox.CASE_DELETED)
+    for event in events:
+        p = event.payload
+        users = list(audience.get(event.case_id, ()))
+        users += [p.get("created_by_id"), p.get("assigned_to_id"), p.get("uploader_id"), p.get("payer_id")]
+        users += [p.get("judge_id"), p.get("previous_judge_id")]
+        if event.type == outbox.CASE_ASSIGNED:
+            users.append(p.get("from"))
+        event_bus.publish(_push_type(event), event.case_id, _push_data(event), users, STAFF_ROLES)
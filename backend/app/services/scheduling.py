@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.core import config
+from app.models import Hearing
+
+# Hearings in these states no longer hold their judge or courtroom
+INACTIVE_STATUSES = ("CANCELLED", "POSTPONED", "ADJOURNED", "COMPLETED")
+
+
+class Conflict(NamedTuple):
+    hearing_id: int
+    case_id: int
+    resource: str  # "judge" or "room"
+    starts_at: datetime
+    ends_at: datetime
+
+    def to_dict(self) -> dict:
+        return {
+            "hearing_id": self.hearing_id,
+            "case_id": self.case_id,
+            "resource": self.resource,
+            "starts_at": self.starts_at.isoformat(),
+            "ends_at": self.ends_at.isoformat(),
+        }
+
+
+# ===============================================================
+# ⏱️ Hearing Windows
+# ===============================================================
+def duration_of(hearing: Hearing) -> int:
+    return hearing.duration_minutes or config.HEARING_DEFAULT_MINUTES
+
+
+def ends_at(hearing: Hearing) -> datetime:
+    return hearing.scheduled_date + timedelta(minutes=duration_of(hearing))
+
+
+def is_active(hearing: Hearing) -> bool:
+    return (hearing.status or "").upper() not in INACTIVE_STATUSES
+
+
+def validate_duration(minutes: Optional[int]):
+    if minutes is not None and not 1 <= minutes <= config.HEARING_MAX_MINUTES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Hearing duration must be between 1 and {config.HEARING_MAX_MINUTES} minutes",
+        )
+
+
+# ===============================================================
+# 🚧 Conflict Detection
+# ===============================================================
+def find_conflicts(
+    db: Session,
+    start: datetime,
+    minutes: int,
+    judge_id: Optional[int] = None,
+    location: Optional[str] = None,
+    exclude_id: Optional[int] = None,
+) -> List[Conflict]:
+    """
+    Active hearings of the same judge or in the same courtroom that overlap
+    ``[start, start + minutes)``.
+
+    No hearing is longer than ``HEARING_MAX_MINUTES``, so anything that
+    overlaps starts in ``(start - max, end)``: one range scan of the
+    (judge_id, scheduled_date) or (location, scheduled_date) index per
+    resource, however many years of hearings are on file.
+    """
+    end = start + timedelta(minutes=minutes)
+    earliest = start - timedelta(minutes=config.HEARING_MAX_MINUTES)
+    resources = []
+    if judge_id is not None:
+        resources.append(("judge", Hearing.judge_id == judge_id))
+    if location:
+        resources.append(("room", Hearing.location == location))
+
+    conflicts = []
+    for resource, same in resources:
+        query = db.query(Hearing.id, Hearing.case_id, Hearing.scheduled_date, Hearing.duration_minutes).filter(
+            same,
+            Hearing.scheduled_date > earliest,
+            Hearing.scheduled_date < end,
+            or_(Hearing.status.is_(None), func.upper(Hearing.status).notin_(INACTIVE_STATUSES)),
+        )
+        if exclude_id is not None:
+            query = query.filter(Hearing.id != exclude_id)
+        for other in query:
+            minutes_booked = other.duration_minutes or config.HEARING_DEFAULT_MINUTES
+            other_end = other.scheduled_date + timedelta(minutes=minutes_booked)
+            if other_end > start:
+                conflicts.append(Conflict(other.id, other.case_id, resource, other.scheduled_date, other_end))
+    return conflicts
+
+
+def ensure_bookable(db: Session, hearing: Hearing):
+    """
+    Reject (409) a hearing whose judge or courtroom is already booked for
+    part of its time. Call it in the transaction that writes the hearing;
+    through the writer queue the check and the write cannot interleave with
+    another booking.
+    """
+    if not is_active(hearing):
+        return
+    conflicts = find_conflicts(
+        db, hearing.scheduled_date, duration_of(hearing), hearing.judge_id, hearing.location, hearing.id
+    )
+    if conflicts:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "message": "Judge or courtroom is already booked at that time",
+                "conflicts": [c.to_dict() for c in conflicts],
+            },
+        )
@@ -0,0 +1,367 @@
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from app.core import config, jobs
+from app.core.storage import StorageBackend, get_storage
+from app.database import SessionLocal
+from app.models import Document, Evidence, Job, StorageFinding
+
+logger = logging.getLogger(__name__)
+
+QUARANTINE_PREFIX = "quarantine/"
+
+SCRUB_JOB = "storage.scrub"
+
+# (entity name, model) pairs whose ``file_path`` column references a blob
+TRACKED_MODELS = (("evidence", Evidence), ("document", Document))
+
+
+# ===============================================================
+# 🧹 Storage Integrity Scrubber
+# ===============================================================
+class StorageScrubber:
+    """
+    Background reconciler between the database and the storage backend.
+
+    Each pass walks the evidence and document rows in id order, checking that
+    their blob exists and still matches the recorded SHA-256 (hashes missing
+    on older rows are backfilled), then walks every stored key and flags blobs
+    no row references. Work is done in small batches under a byte budget so
+    scrubbing never starves request I/O. Findings are kept in the
+    ``storage_findings`` table; in ``quarantine`` mode orphan blobs are also
+    moved under ``quarantine/``.
+
+    Passes run as ``storage.scrub`` jobs, so one worker in the deployment
+    scrubs each interval however many worker processes serve requests.
+    """
+
+    def __init__(
+        self,
+        storage: Optional[StorageBackend] = None,
+        session_factory=SessionLocal,
+        mode: str = config.SCRUB_MODE,
+        interval: float = config.SCRUB_INTERVAL_SECONDS,
+        batch_size: int = config.SCRUB_BATCH_SIZE,
+        bytes_per_second: int = config.SCRUB_BYTES_PER_SECOND,
+        batch_pause: float = config.SCRUB_BATCH_PAUSE_SECONDS,
+        orphan_grace: float = config.SCRUB_ORPHAN_GRACE_SECONDS,
+    ):
+        self._storage = storage
+        self.session_factory = session_factory
+        self.mode = mode
+        self.interval = interval
+        self.batch_size = batch_size
+        self.bytes_per_second = bytes_per_second
+        self.batch_pause = batch_pause
+        self.orphan_grace = orphan_grace
+
+        self._stop = threading.Event()
+        self._running = False
+        self._lock = threading.Lock()
+        self._io_deadline = 0.0
+        self._progress = self._empty_progress()
+        self.passes_completed = 0
+        self.last_pass_started_at: Optional[datetime] = None
+        self.last_pass_finished_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def storage(self) -> StorageBackend:
+        return self._storage or get_storage()
+
+    # -----------------------------------------------------------
+    # Lifecycle
+    # -----------------------------------------------------------
+    def start(self):
+        """Allow passes in this worker and make sure the deployment's next ones are queued."""
+        self._stop.clear()
+        self.schedule()
+
+    def stop(self):
+        """Interrupt a pass running in this worker; its job is retried elsewhere."""
+        self._stop.set()
+
+    def trigger(self) -> int:
+        """Queue a pass to run now, on whichever worker claims it."""
+        return jobs.submit(SCRUB_JOB, dedupe_key=f"{SCRUB_JOB}:now")
+
+    # -----------------------------------------------------------
+    # Scheduling
+    # -----------------------------------------------------------
+    # Time is cut into intervals and each one's pass has its own dedupe
+    # key. Every worker queues the current and the next interval at startup
+    # and after each pass; whichever gets there first wins, and a worker
+    # started mid-interval finds that interval's job already queued or done.
+    def _period_key(self, period: int) -> str:
+        return f"{SCRUB_JOB}:{period}"
+
+    def schedule(self):
+        period = int(time.time() // self.interval)
+        keys = {self._period_key(p): p for p in (period, period + 1)}
+        db = self.session_factory()
+        try:
+            seen = {key for (key,) in db.query(Job.dedupe_key).filter(Job.dedupe_key.in_(keys))}
+            for key, p in keys.items():
+                if key not in seen:
+                    jobs.enqueue(db, SCRUB_JOB, dedupe_key=key, run_after=datetime.utcfromtimestamp(p * self.interval))
+            db.commit()
+        finally:
+            db.close()
+
+    # -----------------------------------------------------------
+    # Progress reporting
+    # -----------------------------------------------------------
+    @staticmethod
+    def _empty_progress():
+        return {
+            "phase": "idle",
+            "cursor": None,
+            "rows_checked": 0,
+            "blobs_checked": 0,
+            "bytes_hashed": 0,
+            "hashes_backfilled": 0,
+            "findings": 0,
+        }
+
+    def _update(self, **changes):
+        with self._lock:
+            for name, value in changes.items():
+                if name in ("phase", "cursor"):
+                    self._progress[name] = value
+                else:
+                    self._progress[name] += value
+
+    def status(self) -> dict:
+        with self._lock:
+            progress = dict(self._progress)
+        db = self.session_factory()
+        try:
+            queued = (
+                db.query(Job)
+                .filter(Job.kind == SCRUB_JOB, Job.status.in_((jobs.QUEUED, jobs.RUNNING)))
+                .order_by(Job.run_after)
+                .all()
+            )
+        finally:
+            db.close()
+        return {
+            "running": self._running,
+            "mode": self.mode,
+            "progress": progress,
+            "passes_completed": self.passes_completed,
+            "last_pass_started_at": self.last_pass_started_at.isoformat() if self.last_pass_started_at else None,
+            "last_pass_finished_at": self.last_pass_finished_at.isoformat() if self.last_pass_finished_at else None,
+            "last_error": self.last_error,
+            # Passes run in whichever worker claims them; this worker's
+            # progress above is idle when another one is scrubbing
+            "jobs": [
+                {
+                    "id": job.id,
+                    "status": job.status,
+                    "run_after": job.run_after.isoformat(),
+                    "worker": job.worker,
+                }
+                for job in queued
+            ],
+        }
+
+    # -----------------------------------------------------------
+    # Rate limiting
+    # -----------------------------------------------------------
+    def _throttle(self, nbytes: int):
+        """Sleep as needed so hashing stays within ``bytes_per_second``."""
+        if self.bytes_per_second <= 0:
+            return
+        now = time.monotonic()
+        self._io_deadline = max(self._io_deadline, now) + nbytes / self.bytes_per_second
+        delay = self._io_deadline - now
+        if delay > 0.05:
+            self._stop.wait(delay)
+
+    def _pause(self):
+        if self.batch_pause > 0:
+            self._stop.wait(self.batch_pause)
+
+    # -----------------------------------------------------------
+    # Scrub pass
+    # -----------------------------------------------------------
+    def run_pass(self):
+        """Run one full pass over the database rows and the stored blobs."""
+        with self._lock:
+            self._progress = self._empty_progress()
+        self._running = True
+        self.last_pass_started_at = datetime.utcnow()
+        self.last_error = None
+        try:
+            for entity, model in TRACKED_MODELS:
+                self._scrub_rows(entity, model)
+            self._scrub_blobs()
+            if self._stop.is_set():
+                raise RuntimeError("Scrub pass interrupted by shutdown")
+        except Exception as exc:
+            self.last_error = str(exc)
+            raise
+        finally:
+            self._running = False
+            self._update(phase="idle", cursor=None)
+        self.passes_completed += 1
+        self.last_pass_finished_at = datetime.utcnow()
+
+    def _hash_blob(self, key: str):
+        digest = hashlib.sha256()
+        size = 0
+        for chunk in self.storage.read(key):
+            digest.update(chunk)
+            size += len(chunk)
+            self._throttle(len(chunk))
+            if self._stop.is_set():
+                return None
+        self._update(bytes_hashed=size)
+        return digest.hexdigest(), size
+
+    def _scrub_rows(self, entity: str, model):
+        last_id = 0
+        while not self._stop.is_set():
+            db = self.session_factory()
+            try:
+                rows = (
+                    db.query(model)
+                    .filter(model.id > last_id, model.file_path.isnot(None))
+                    .order_by(model.id)
+                    .limit(self.batch_size)
+                    .all()
+                )
+                if not rows:
+                    return
+                for row in rows:
+                    if self._stop.is_set():
+                        return
+                    self._check_row(db, entity, row)
+                    last_id = row.id
+                self._update(phase=f"{entity}_rows", cursor=last_id, rows_checked=len(rows))
+                try:
+                    db.commit()
+                except Exception:
+                    # e.g. a row deleted while it was being hashed
+                    db.rollback()
+                    logger.warning("Discarded scrub results for %s batch ending at id %s", entity, last_id)
+            finally:
+                db.close()
+            self._pause()
+
+    def _check_row(self, db, entity: str, row):
+        key = row.file_path
+        if not self.storage.exists(key):
+            self._record(db, "MISSING_BLOB", key, entity, row.id, "Row references a blob that is not in storage")
+            return
+
+        hashed = self._hash_blob(key)
+        if hashed is None:
+            return
+        sha256, size = hashed
+        if row.sha256 is None:
+            # Rows uploaded before hashes were recorded: trust the current bytes
+            row.sha256 = sha256
+            row.stored_size = size
+            self._update(hashes_backfilled=1)
+        elif row.sha256 != sha256:
+            self._record(
+                db, "HASH_MISMATCH", key, entity, row.id,
+                f"Expected sha256 {row.sha256}, found {sha256}",
+            )
+            return
+        self._resolve(db, key)
+
+    def _scrub_blobs(self):
+        batch = []
+        for key in self.storage.iter_keys():
+            if self._stop.is_set():
+                return
+            if key.startswith(QUARANTINE_PREFIX):
+                continue
+            batch.append(key)
+            if len(batch) >= self.batch_size:
+                self._check_blobs(batch)
+                batch = []
+                self._pause()
+        if batch:
+            self._check_blobs(batch)
+
+    def _check_blobs(self, keys):
+        db = self.session_factory()
+        try:
+            referenced = set()
+            for _entity, model in TRACKED_MODELS:
+                referenced.update(
+                    path for (path,) in db.query(model.file_path).filter(model.file_path.in_(keys))
+                )
+            cutoff = time.time() - self.orphan_grace
+            for key in keys:
+                if key in referenced:
+                    continue
+                if self.storage.modified_at(key) > cutoff:
+                    continue  # upload may still be committing its row
+                finding = self._record(db, "ORPHAN_BLOB", key, None, None, "Blob is not referenced by any row")
+                if self.mode == "quarantine" and not finding.quarantined:
+                    self._quarantine(key)
+                    finding.quarantined = 1
+            self._update(phase="blobs", cursor=keys[-1], blobs_checked=len(keys))
+            db.commit()
+        finally:
+            db.close()
+
+    def _quarantine(self, key: str):
+        self.storage.save(QUARANTINE_PREFIX + key, self.storage.read(key))
+        self.storage.delete(key)
+        logger.warning("Quarantined orphan blob %s", key)
+
+    # -----------------------------------------------------------
+    # Findings
+    # -----------------------------------------------------------
+    def _record(self, db, kind, key, entity, entity_id, detail) -> StorageFinding:
+        finding = (
+            db.query(StorageFinding)
+            .filter(
+                StorageFinding.kind == kind,
+                StorageFinding.storage_key == key,
+                StorageFinding.resolved_at.is_(None),
+            )
+            .first()
+        )
+        if finding:
+            finding.last_seen_at = datetime.utcnow()
+            finding.detail = detail
+        else:
+            finding = StorageFinding(
+                kind=kind, storage_key=key, entity=entity, entity_id=entity_id, detail=detail
+            )
+            db.add(finding)
+            self._update(findings=1)
+            logger.warning("Storage finding %s for %s: %s", kind, key, detail)
+        return finding
+
+    def _resolve(self, db, key: str):
+        db.query(StorageFinding).filter(
+            StorageFinding.storage_key == key,
+            StorageFinding.kind.in_(("MISSING_BLOB", "HASH_MISMATCH")),
+            StorageFinding.resolved_at.is_(None),
+        ).update({"resolved_at": datetime.utcnow()}, synchronize_session=False)
+
+
+scrubber = StorageScrubber()
+
+
+@jobs.handler(SCRUB_JOB, pool="thread")
+def run_scrub_pass(payload: dict) -> dict:
+    """One scrub pass, then make sure the next interval's pass is queued."""
+    if not config.SCRUB_ENABLED:
+        return {"skipped": True}  # queued before scrubbing was turned off
+    try:
+        scrubber.run_pass()
+    finally:
+        scrubber.schedule()
+    return scrubber.status()["progress"]
@@ -0,0 +1,473 @@
+import heapq
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, or_
+
+from app.core import config, outbox
+from app.core.db_events import Change, on_commit
+from app.database import SessionLocal
+from app.models import Case, Evidence, Hearing, User
+from app.services.scheduling import INACTIVE_STATUSES
+
+logger = logging.getLogger(__name__)
+
+ASSIGNABLE_ROLES = ("JUDGE", "PROSECUTOR")
+CLOSED_CASE_STATUSES = ("CLOSED", "COMPLETED", "DISMISSED", "WITHDRAWN")
+PENDING_EVIDENCE_STATUSES = ("PENDING", "UNDER_REVIEW", "UNDER REVIEW")
+
+Key = Tuple[str, int]  # ("case" | "evidence" | "hearing" | "user", id)
+
+
+def _is_open(status: Optional[str]) -> bool:
+    return (status or "").upper() not in CLOSED_CASE_STATUSES
+
+
+def _case_owner(assigned_to_id, status) -> Optional[int]:
+    """Who an open case counts against; closed and unassigned cases count for nobody."""
+    return assigned_to_id if assigned_to_id is not None and _is_open(status) else None
+
+
+def _pending_case(case_id, status) -> Optional[int]:
+    return case_id if (status or "PENDING").upper() in PENDING_EVIDENCE_STATUSES else None
+
+
+def _upcoming_judge(judge_id, scheduled_date, status) -> Optional[int]:
+    if judge_id is None or scheduled_date is None or (status or "").upper() in INACTIVE_STATUSES:
+        return None
+    if scheduled_date.tzinfo is not None:
+        scheduled_date = scheduled_date.astimezone(timezone.utc).replace(tzinfo=None)
+    return judge_id if scheduled_date >= datetime.utcnow() else None
+
+
+def _member(role, is_active) -> Optional[str]:
+    role = (role or "").upper()
+    return role if role in ASSIGNABLE_ROLES and is_active else None
+
+
+class Load:
+    __slots__ = ("open_cases", "upcoming_hearings", "pending_evidence")
+
+    def __init__(self):
+        self.open_cases = 0
+        self.upcoming_hearings = 0
+        self.pending_evidence = 0
+
+    def score(self) -> float:
+        return (
+            self.open_cases * config.WORKLOAD_CASE_WEIGHT
+            + self.upcoming_hearings * config.WORKLOAD_HEARING_WEIGHT
+            + self.pending_evidence * config.WORKLOAD_EVIDENCE_WEIGHT
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "open_cases": self.open_cases,
+            "upcoming_hearings": self.upcoming_hearings,
+            "pending_evidence": self.pending_evidence,
+            "score": round(self.score(), 2),
+        }
+
+
+class Suggestion(NamedTuple):
+    user_id: int
+    email: str
+    role: str
+    load: dict
+
+
+# ===============================================================
+# ⚖️ Workload Index
+# ===============================================================
+class WorkloadIndex:
+    """
+    Live per-user workload: open cases assigned, upcoming hearings on the
+    bench, and pending evidence on those open cases.
+
+    Loaded once from the tables, then kept current one row at a time:
+    commits in this worker arrive through ``on_commit`` with the full row,
+    and other workers' case, evidence and hearing changes through the
+    outbox, which rereads just the rows named. The index remembers what
+    each row last contributed (whose case it is, which case a pending
+    exhibit belongs to, whose hearing), so applying a row subtracts the old
+    contribution and adds the new one, and seeing the same row twice is a
+    no-op. ``change_seq`` keeps a late, older copy from winning.
+
+    Judges and prosecutors sit in one min-heap per role keyed by score;
+    a changed user gets a fresh entry and the old one is skipped when it
+    surfaces, so picking the least-loaded user is O(log n). Hearings drift
+    out of "upcoming" as time passes and evidence deletes are not outbox
+    events, so the whole index is reloaded every ``WORKLOAD_RELOAD_SECONDS``
+    off the request path.
+    """
+
+    def __init__(self, session_factory=SessionLocal, reload_interval: float = config.WORKLOAD_RELOAD_SECONDS):
+        self.session_factory = session_factory
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._reset()
+        self._loaded = False
+        self._loaded_at = 0.0
+        self._pending: Optional[list] = None  # updates that arrive while loading
+        self.updates = 0
+        self.picks = 0
+
+    def _reset(self):
+        self._loads: Dict[int, Load] = defaultdict(Load)
+        self._case_owner: Dict[int, int] = {}  # open assigned case -> assignee
+        self._case_pending: Dict[int, int] = defaultdict(int)  # case -> pending exhibits
+        self._evidence_case: Dict[int, int] = {}  # pending exhibit -> case
+        self._hearing_judge: Dict[int, int] = {}  # upcoming hearing -> judge
+        self._members: Dict[int, Tuple[str, str]] = {}  # assignable user -> (email, role)
+        self._seq: Dict[Key, float] = {}
+        self._heaps: Dict[str, list] = {role: [] for role in ASSIGNABLE_ROLES}
+        self._version: Dict[int, int] = defaultdict(int)
+
+    # -----------------------------------------------------------
+    # Loading
+    # -----------------------------------------------------------
+    def load(self):
+        """Rebuild from open assigned cases, pending evidence and upcoming hearings."""
+        with self._lock:
+            self._pending = []
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            users = db.query(User.id, User.email, User.role, User.is_active).filter(
+                func.upper(User.role).in_(ASSIGNABLE_ROLES)
+            ).all()
+            cases = db.query(Case.id, Case.assigned_to_id, Case.status, Case.change_seq).filter(
+                Case.assigned_to_id.isnot(None),
+                or_(Case.status.is_(None), func.upper(Case.status).notin_(CLOSED_CASE_STATUSES)),
+            ).all()
+            evidence = db.query(Evidence.id, Evidence.case_id, Evidence.change_seq).filter(
+                or_(Evidence.status.is_(None), func.upper(Evidence.status).in_(PENDING_EVIDENCE_STATUSES))
+            ).all()
+            hearings = db.query(Hearing.id, Hearing.judge_id, Hearing.change_seq).filter(
+                Hearing.judge_id.isnot(None),
+                Hearing.scheduled_date >= now,
+                or_(Hearing.status.is_(None), func.upper(Hearing.status).notin_(INACTIVE_STATUSES)),
+            ).all()
+        finally:
+            db.close()
+        with self._lock:
+            self._reset()
+            for row in users:
+                self._apply(("user", row.id), (row.email, _member(row.role, row.is_active)), None)
+            for row in cases:
+                self._apply(("case", row.id), row.assigned_to_id, row.change_seq)
+            for row in evidence:
+                self._apply(("evidence", row.id), row.case_id, row.change_seq)
+            for row in hearings:
+                self._apply(("hearing", row.id), row.judge_id, row.change_seq)
+            for update in self._pending:
+                self._apply(*update)  # committed after the read; change_seq drops stale ones
+            self._pending = None
+            self._loaded = True
+            self._loaded_at = time.monotonic()
+        logger.info(
+            "Loaded workload of %s users: %s open cases, %s pending exhibits, %s upcoming hearings",
+            len(users), len(cases), len(evidence), len(hearings),
+        )
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+            return
+        if time.monotonic() - self._loaded_at < self.reload_interval:
+            return
+        with self._lock:
+            if time.monotonic() - self._loaded_at < self.reload_interval:
+                return
+            self._loaded_at = time.monotonic()  # one reloader; others keep the current counts
+        threading.Thread(target=self._reload, name="workload-reload", daemon=True).start()
+
+    def _reload(self):
+        try:
+            self.load()
+        except Exception:
+            logger.exception("Reloading workload counters failed")
+
+    # -----------------------------------------------------------
+    # Incremental updates
+    # -----------------------------------------------------------
+    def update(self, key: Key, value, seq: Optional[float]):
+        """
+        Record a row's current contribution: a case's owner, a pending
+        exhibit's case, an upcoming hearing's judge, or a user's
+        ``(email, role)`` (None: contributes nothing, or deleted).
+        """
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((key, value, seq))
+            elif self._loaded:
+                self._apply(key, value, seq)
+                self.updates += 1
+            # else: the first query loads the tables, which include this
+
+    def _apply(self, key: Key, value, seq: Optional[float]):
+        known = self._seq.get(key)
+        if known is not None and seq is not None and seq < known:
+            return  # an older copy of the row than the one applied
+        if seq is not None:
+            self._seq[key] = seq
+        kind, row_id = key
+        if kind == "case":
+            self._set_case(row_id, value)
+        elif kind == "evidence":
+            self._set_evidence(row_id, value)
+        elif kind == "hearing":
+            self._set_hearing(row_id, value)
+        else:
+            self._set_member(row_id, value)
+
+    def _set_case(self, case_id: int, owner: Optional[int]):
+        old = self._case_owner.get(case_id)
+        if old == owner:
+            return
+        pending = self._case_pending.get(case_id, 0)
+        if old is not None:
+            del self._case_owner[case_id]
+            self._add(old, cases=-1, evidence=-pending)
+        if owner is not None:
+            self._case_owner[case_id] = owner
+            self._add(owner, cases=1, evidence=pending)
+
+    def _set_evidence(self, evidence_id: int, case_id: Optional[int]):
+        old = self._evidence_case.get(evidence_id)
+        if old == case_id:
+            return
+        if old is not None:
+            del self._evidence_case[evidence_id]
+            self._case_pending[old] -= 1
+            if not self._case_pending[old]:
+                del self._case_pending[old]
+            if old in self._case_owner:
+                self._add(self._case_owner[old], evidence=-1)
+        if case_id is not None:
+            self._evidence_case[evidence_id] = case_id
+            self._case_pending[case_id] += 1
+            if case_id in self._case_owner:
+                self._add(self._case_owner[case_id], evidence=1)
+
+    def _set_hearing(self, hearing_id: int, judge_id: Optional[int]):
+        old = self._hearing_judge.get(hearing_id)
+        if old == judge_id:
+            return
+        if old is not None:
+            del self._hearing_judge[hearing_id]
+            self._add(old, hearings=-1)
+        if judge_id is not None:
+            self._hearing_judge[hearing_id] = judge_id
+            self._add(judge_id, hearings=1)
+
+    def _set_member(self, user_id: int, value: Optional[Tuple[str, Optional[str]]]):
+        email, role = value or (None, None)
+        if role is None:
+            self._members.pop(user_id, None)
+            self._version[user_id] += 1  # drops any heap entry
+            return
+        if self._members.get(user_id) == (email, role):
+            return
+        self._members[user_id] = (email, role)
+        self._push(user_id)
+
+    def _add(self, user_id: int, cases: int = 0, hearings: int = 0, evidence: int = 0):
+        load = self._loads[user_id]
+        load.open_cases += cases
+        load.upcoming_hearings += hearings
+        load.pending_evidence += evidence
+        if user_id in self._members:
+            self._push(user_id)
+
+    def _push(self, user_id: int):
+        self._version[user_id] += 1
+        role = self._members[user_id][1]
+        heap = self._heaps[role]
+        heapq.heappush(heap, (self._loads[user_id].score(), user_id, self._version[user_id]))
+        if len(heap) > 4 * len(self._members) + 64:
+            self._compact(role)
+
+    def _compact(self, role: str):
+        """Drop superseded entries once they outnumber the live ones."""
+        heap = [
+            (self._loads[user_id].score(), user_id, self._version[user_id])
+            for user_id, (_, member_role) in self._members.items() if member_role == role
+        ]
+        heapq.heapify(heap)
+        self._heaps[role] = heap
+
+    # -----------------------------------------------------------
+    # Queries
+    # -----------------------------------------------------------
+    def load_of(self, user_id: int) -> dict:
+        self._ensure_loaded()
+        with self._lock:
+            return self._loads[user_id].to_dict() if user_id in self._loads else Load().to_dict()
+
+    def least_loaded(self, role: str, limit: int = 1, exclude: Iterable[int] = ()) -> List[Suggestion]:
+        """The ``limit`` active users of ``role`` with the lowest scores, lightest first."""
+        self._ensure_loaded()
+        role = role.upper()
+        exclude = set(exclude)
+        found, popped = [], []
+        with self._lock:
+            heap = self._heaps.get(role, [])
+            while heap and len(found) < limit:
+                entry = heapq.heappop(heap)
+                _, user_id, version = entry
+                if version != self._version[user_id]:
+                    continue  # superseded by a newer score
+                popped.append(entry)
+                if user_id not in exclude:
+                    email, _ = self._members[user_id]
+                    found.append(Suggestion(user_id, email, role, self._loads[user_id].to_dict()))
+            for entry in popped:
+                heapq.heappush(heap, entry)
+            self.picks += 1
+        return found
+
+    def plan(self, role: str, cases: List[Tuple[int, int]]) -> Dict[int, Suggestion]:
+        """
+        Assign ``(case_id, pending exhibits)`` pairs in order, each to the
+        user of ``role`` who is least loaded counting the cases handed out
+        before it. One heap pop and push per case; the live counters only
+        move once the assignments are committed.
+        """
+        self._ensure_loaded()
+        role = role.upper()
+        with self._lock:
+            heap = [
+                (self._loads[user_id].score(), user_id)
+                for user_id, (_, member_role) in self._members.items() if member_role == role
+            ]
+            members = {user_id: self._members[user_id][0] for _, user_id in heap}
+        if not heap:
+            return {}
+        heapq.heapify(heap)
+        added = defaultdict(lambda: [0, 0])  # user -> [cases, exhibits] from this plan
+        assigned = {}
+        for case_id, exhibits in cases:
+            score, user_id = heap[0]
+            extra = added[user_id]
+            extra[0] += 1
+            extra[1] += exhibits
+            heapq.heapreplace(heap, (
+                score + config.WORKLOAD_CASE_WEIGHT + exhibits * config.WORKLOAD_EVIDENCE_WEIGHT, user_id
+            ))
+            assigned[case_id] = user_id
+        with self._lock:
+            planned = {}
+            for user_id, (cases_added, exhibits_added) in added.items():
+                load = self._loads[user_id].to_dict() if user_id in self._loads else Load().to_dict()
+                load["open_cases"] += cases_added
+                load["pending_evidence"] += exhibits_added
+                load["score"] = round(
+                    load["score"] + cases_added * config.WORKLOAD_CASE_WEIGHT
+                    + exhibits_added * config.WORKLOAD_EVIDENCE_WEIGHT, 2
+                )
+                planned[user_id] = Suggestion(user_id, members[user_id], role, load)
+        return {case_id: planned[user_id] for case_id, user_id in assigned.items()}
+
+    def pending_evidence(self, case_ids: Iterable[int]) -> Dict[int, int]:
+        self._ensure_loaded()
+        with self._lock:
+            return {case_id: self._case_pending.get(case_id, 0) for case_id in case_ids}
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._loaded,
+            "members": len(self._members),
+            "open_cases": len(self._case_owner),
+            "pending_evidence": len(self._evidence_case),
+            "upcoming_hearings": len(self._hearing_judge),
+            "heap_entries": sum(len(heap) for heap in self._heaps.values()),
+            "updates": self.updates,
+            "picks": self.picks,
+        }
+
+
+workload = WorkloadIndex()
+
+
+# ===============================================================
+# 🔁 Keeping It Current
+# ===============================================================
+@on_commit(Case, Evidence, Hearing, User)
+def _track_workload(changes: List[Change]):
+    for change in changes:
+        model = change.model
+        kind = {Case: "case", Evidence: "evidence", Hearing: "hearing", User: "user"}[model]
+        if change.op == "delete":
+            workload.update((kind, change.id), None, float("inf"))
+            continue
+        v = change.values
+        if model is Case:
+            value = _case_owner(v.get("assigned_to_id"), v.get("status"))
+        elif model is Evidence:
+            value = _pending_case(v.get("case_id"), v.get("status"))
+        elif model is Hearing:
+            value = _upcoming_judge(v.get("judge_id"), v.get("scheduled_date"), v.get("status"))
+        else:
+            value = (v.get("email"), _member(v.get("role"), v.get("is_active")))
+        workload.update((kind, change.id), value, None if model is User else v.get("change_seq"))
+
+
+@outbox.subscribe(
+    outbox.CASE_FILED, outbox.CASE_ASSIGNED, outbox.CASE_STATUS_CHANGED, outbox.CASE_DELETED,
+    outbox.EVIDENCE_UPLOADED, outbox.EVIDENCE_REVIEWED,
+    outbox.HEARING_SCHEDULED, outbox.HEARING_UPDATED, outbox.HEARING_CANCELLED,
+    broadcast=True,
+)
+def refresh_workload(events: List[outbox.DomainEvent]):
+    """
+    Rows changed by other workers (this worker's commits are already
+    applied; rereading them is harmless). Rereads the rows named rather
+    than trusting the payload, so the counters only ever take committed
+    state.
+    """
+    if not workload._loaded:
+        return
+    ids = defaultdict(set)
+    for e in events:
+        ids[e.entity].add(e.entity_id)
+    db = workload.session_factory()
+    try:
+        cases = {
+            row.id: row for row in db.query(Case.id, Case.assigned_to_id, Case.status, Case.change_seq)
+            .filter(Case.id.in_(ids["case"]))
+        } if ids["case"] else {}
+        evidence = {
+            row.id: row for row in db.query(Evidence.id, Evidence.case_id, Evidence.status, Evidence.change_seq)
+            .filter(Evidence.id.in_(ids["evidence"]))
+        } if ids["evidence"] else {}
+        hearings = {
+            row.id: row for row in db.query(
+                Hearing.id, Hearing.judge_id, Hearing.scheduled_date, Hearing.status, Hearing.change_seq
+            ).filter(Hearing.id.in_(ids["hearing"]))
+        } if ids["hearing"] else {}
+    finally:
+        db.close()
+    for case_id in ids["case"]:
+        row = cases.get(case_id)
+        if row is None:
+            workload.update(("case", case_id), None, float("inf"))
+        else:
+            workload.update(("case", case_id), _case_owner(row.assigned_to_id, row.status), row.change_seq)
+    for evidence_id in ids["evidence"]:
+        row = evidence.get(evidence_id)
+        if row is None:
+            workload.update(("evidence", evidence_id), None, float("inf"))
+        else:
+            workload.update(("evidence", evidence_id), _pending_case(row.case_id, row.status), row.change_seq)
+    for hearing_id in ids["hearing"]:
+        row = hearings.get(hearing_id)
+        if row is None:
+            workload.update(("hearing", hearing_id), None, float("inf"))
+        else:
+            value = _upcoming_judge(row.judge_id, row.scheduled_date, row.status)
+            workload.update(("hearing", hearing_id), value, row.change_seq)
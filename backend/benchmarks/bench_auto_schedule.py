@@ -0,0 +1,116 @@
+"""
+Auto-scheduler time and plan quality for a large backlog.
+
+Seeds a scratch database with ``--judges`` judges, ``--cases`` REVIEWED
+cases (a third of them already assigned to a judge) and a few existing
+hearings per judge, then times a dry-run plan and an applied run over
+``--rooms`` courtrooms. Checks that the saved hearings never double book a
+judge or a room (each other or the hearings already there) and exits
+non-zero if they do.
+
+    python -m benchmarks.bench_auto_schedule --cases 5000 --judges 20 --rooms 12
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=5000)
+    parser.add_argument("--judges", type=int, default=20)
+    parser.add_argument("--rooms", type=int, default=12)
+    parser.add_argument("--days", type=int, default=90)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())  # app.db is relative to the working directory
+    from app.core import config
+
+    config.INIT_ON_IMPORT = False
+    from app.database import SessionLocal
+    from app.main import prepare_database
+    from app.models import Case, Hearing, User
+    from app.services import auto_scheduler
+
+    prepare_database()
+    rooms = [f"Room {n}" for n in range(1, args.rooms + 1)]
+    start = date.today() + timedelta(days=7)
+    rng = random.Random(7)
+
+    db = SessionLocal()
+    db.bulk_insert_mappings(User, [
+        dict(username=f"bj{n}", email=f"bj{n}@court.com", password_hash="-", role="JUDGE", is_active=1)
+        for n in range(args.judges)
+    ])
+    db.commit()
+    judges = [judge_id for (judge_id,) in db.query(User.id).filter(User.role == "JUDGE")]
+    heard = Case(title="Already heard", status="Filed", created_by_id=1)
+    db.add(heard)
+    db.flush()
+    db.bulk_insert_mappings(Case, [
+        dict(title=f"Backlog {n}", status="REVIEWED", created_by_id=1,
+             assigned_to_id=rng.choice(judges) if n % 3 == 0 else None)
+        for n in range(args.cases)
+    ])
+    db.bulk_insert_mappings(Hearing, [
+        dict(case_id=heard.id, registrar_id=4, judge_id=judge_id, location=rng.choice(rooms),
+             scheduled_date=datetime(start.year, start.month, start.day, 9) + timedelta(days=rng.randrange(args.days)),
+             duration_minutes=120, status="SCHEDULED")
+        for judge_id in judges for _ in range(5)
+    ])
+    db.commit()
+
+    began = time.perf_counter()
+    plan = auto_scheduler.plan(db, start, args.days, rooms=rooms)
+    planned = time.perf_counter() - began
+    print(f"{args.cases} cases, {len(plan.judges)} judges, {len(rooms)} rooms, {len(plan.starts)} slots")
+    print(f"dry run   {planned * 1000:8.0f} ms  scheduled {len(plan.assignments)}  "
+          f"unscheduled {len(plan.unscheduled)}  preferred judge {sum(a.preferred for a in plan.assignments)}  "
+          f"local-search moves {plan.moves}")
+    loads = sorted(plan.judge_load.values())
+    print(f"judge load min {loads[0]}  max {loads[-1]}")
+    db.close()
+
+    payload = auto_scheduler.job_payload(4, start, args.days, rooms=rooms)
+    began = time.perf_counter()
+    result = auto_scheduler.run_auto_schedule(payload)
+    print(f"applied   {(time.perf_counter() - began) * 1000:8.0f} ms  scheduled {result['scheduled']}")
+
+    db = SessionLocal()
+    rows = db.query(
+        Hearing.judge_id, Hearing.location, Hearing.scheduled_date, Hearing.duration_minutes, Hearing.notes
+    ).all()
+    db.close()
+    clashes = _overlaps(rows)
+    print(f"saved {result['scheduled']} hearings, double bookings: {clashes}")
+    if clashes:
+        raise SystemExit("auto-scheduler double booked a judge or a room")
+
+
+def _overlaps(rows) -> int:
+    """Overlapping pairs of hearings of one judge or room, at least one of them auto-scheduled."""
+    by_resource = defaultdict(list)
+    for r in rows:
+        automatic = (r.notes or "").startswith("Hearing automatically scheduled")
+        window = (r.scheduled_date, r.scheduled_date + timedelta(minutes=r.duration_minutes or 60), automatic)
+        if r.judge_id is not None:
+            by_resource[("judge", r.judge_id)].append(window)
+        by_resource[("room", r.location)].append(window)
+    clashes = 0
+    for windows in by_resource.values():
+        windows.sort()
+        latest_end, latest_automatic = None, False
+        for begins, ends, automatic in windows:
+            if latest_end is not None and begins < latest_end and (automatic or latest_automatic):
+                clashes += 1
+            if latest_end is None or ends > latest_end:
+                latest_end, latest_automatic = ends, automatic
+    return clashes
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Cause list reads during the morning rush: materialized dockets vs the hearings scan.
+
+Seeds a scratch database with ``--rooms`` courtrooms of ``--per-room``
+hearings each on one day, materializes their cause lists, then times
+``--reads`` reads of the whole day's list both ways: the old way (the
+day's hearings, then ``h.case.title`` and the judge lazy-loaded per row)
+and ``/dockets/{day}`` served from the stored, pre-rendered dockets.
+Also times re-rendering one courtroom after a hearing moves.
+
+    python -m benchmarks.bench_dockets --rooms 20 --per-room 30 --reads 200
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--per-room", type=int, default=30)
+    parser.add_argument("--reads", type=int, default=200)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())  # app.db is relative to the working directory
+    from app.core import config
+
+    config.INIT_ON_IMPORT = False
+    from app.database import SessionLocal
+    from app.main import prepare_database
+    from app.models import Case, Hearing
+    from app.services import dockets
+
+    prepare_database()
+    day = date.today() + timedelta(days=1)
+    db = SessionLocal()
+    db.bulk_insert_mappings(Case, [
+        dict(title=f"Rush {n}", status="REVIEWED", created_by_id=1, assigned_to_id=2)
+        for n in range(args.rooms * args.per_room)
+    ])
+    db.commit()
+    case_ids = [case_id for (case_id,) in db.query(Case.id).filter(Case.title.like("Rush %"))]
+    db.bulk_insert_mappings(Hearing, [
+        dict(case_id=case_ids[n], registrar_id=4, judge_id=3, location=f"Room {n % args.rooms + 1}",
+             scheduled_date=datetime(day.year, day.month, day.day, 9) + timedelta(minutes=15 * (n // args.rooms)),
+             duration_minutes=15, status="SCHEDULED")
+        for n in range(len(case_ids))
+    ])
+    db.commit()
+    hearing_ids = [hearing_id for (hearing_id,) in db.query(Hearing.id)]
+
+    began = time.perf_counter()
+    dockets.refresh(db, hearing_ids)
+    db.commit()
+    print(f"materialize {(time.perf_counter() - began) * 1000:8.1f} ms  {args.rooms} rooms, {len(hearing_ids)} hearings")
+
+    midnight = datetime(day.year, day.month, day.day)
+    began = time.perf_counter()
+    for _ in range(args.reads):
+        scan = SessionLocal()
+        rows = scan.query(Hearing).filter(
+            Hearing.scheduled_date >= midnight, Hearing.scheduled_date < midnight + timedelta(days=1)
+        ).all()
+        listing = [(h.location, h.case.title, h.judge.email if h.judge else None) for h in rows]
+        scan.close()
+    scanned = (time.perf_counter() - began) / args.reads
+    print(f"scan        {scanned * 1000:8.2f} ms per read  ({len(listing)} hearings, lazy loads per row)")
+
+    began = time.perf_counter()
+    for _ in range(args.reads):
+        read = SessionLocal()
+        rooms = dockets.docket_cache.day(read, day)
+        body = ",".join(r.json for r in rooms.values())
+        read.close()
+    served = (time.perf_counter() - began) / args.reads
+    print(f"docket      {served * 1000:8.2f} ms per read  ({len(rooms)} rooms, {len(body)} bytes)  "
+          f"{scanned / served:.0f}x faster")
+
+    db.get(Hearing, hearing_ids[0]).location = "Room 2"
+    db.commit()
+    began = time.perf_counter()
+    touched = dockets.refresh(db, [hearing_ids[0]])
+    db.commit()
+    print(f"move        {(time.perf_counter() - began) * 1000:8.1f} ms  re-rendered {len(touched)} courtroom lists")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Background job throughput.
+
+Queues N jobs into a scratch SQLite database and times a job runner
+draining them: no-op jobs on the thread pool (the cost of claiming,
+leasing and completing a job) and small CPU-bound jobs on the process
+pool. A final round queues every job under a handful of dedupe keys to
+show duplicates collapsing at enqueue time.
+
+    python -m benchmarks.bench_jobs --jobs 2000 --threads 4 --processes 2
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.core import jobs
+from app.database import Base
+from app.models import Job
+
+
+@jobs.handler("bench.noop")
+def noop(payload: dict):
+    return None
+
+
+@jobs.handler("bench.hash", pool="process")
+def hash_block(payload: dict):
+    digest = b""
+    for _ in range(payload["rounds"]):
+        digest = hashlib.sha256(digest + b"x" * 1024).digest()
+    return digest.hex()[:8]
+
+
+def _drain(runner: jobs.JobRunner, Session, timeout: float = 600) -> float:
+    start = time.perf_counter()
+    runner.start()
+    try:
+        while time.perf_counter() - start < timeout:
+            db = Session()
+            try:
+                left = db.query(func.count(Job.id)).filter(Job.status.in_((jobs.QUEUED, jobs.RUNNING))).scalar()
+            finally:
+                db.close()
+            if not left:
+                break
+            time.sleep(0.05)
+    finally:
+        runner.stop()
+    return time.perf_counter() - start
+
+
+def _enqueue(Session, kind: str, count: int, payload: dict, dedupe_keys: int = 0) -> float:
+    db = Session()
+    start = time.perf_counter()
+    try:
+        for i in range(count):
+            key = f"{kind}:{i % dedupe_keys}" if dedupe_keys else None
+            jobs.enqueue(db, kind, payload, dedupe_key=key)
+        db.commit()
+    finally:
+        db.close()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--rounds", type=int, default=2000, help="sha256 rounds per CPU-bound job")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        engine = create_engine(f"sqlite:///{os.path.join(scratch, 'jobs.db')}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+        for label, kind, count, payload, threads, processes in (
+            ("no-op, thread pool", "bench.noop", args.jobs, {}, args.threads, 0),
+            ("sha256, process pool", "bench.hash", max(1, args.jobs // 4), {"rounds": args.rounds}, 0, args.processes),
+        ):
+            enqueue_time = _enqueue(Session, kind, count, payload)
+            runner = jobs.JobRunner(threads=threads, processes=processes, poll_interval=0.05, session_factory=Session)
+            elapsed = _drain(runner, Session)
+            print(
+                f"{label:<22} {count} jobs: enqueue {count / enqueue_time:8.0f}/s, "
+                f"run {runner.completed / elapsed:7.0f}/s ({runner.completed} completed, {runner.failed} failed)"
+            )
+
+        start = time.perf_counter()
+        _enqueue(Session, "bench.noop", args.jobs, {}, dedupe_keys=10)
+        db = Session()
+        try:
+            queued = db.query(func.count(Job.id)).filter(Job.status == jobs.QUEUED).scalar()
+        finally:
+            db.close()
+        print(f"dedupe: {args.jobs} enqueues over 10 keys -> {queued} queued jobs in {time.perf_counter() - start:.2f}s")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
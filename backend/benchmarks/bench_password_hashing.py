@@ -0,0 +1,50 @@
+"""
+Login throughput benchmark for the password hashing service.
+
+Measures how many password verifications (the CPU cost of one login) per
+second the process pool sustains at the configured scheme and cost, for
+1..N worker processes, and reports the per-core figure.
+
+    python -m benchmarks.bench_password_hashing --logins 200 --max-workers 4
+    JIRAMS_BCRYPT_ROUNDS=10 python -m benchmarks.bench_password_hashing
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from app.core import config
+from app.core.hashing import PasswordHasher, hash_password_sync
+
+
+async def _run(workers: int, logins: int, stored_hash: str) -> float:
+    hasher = PasswordHasher(workers=workers, max_concurrency=workers * 2, max_queue=logins)
+    hasher.warm_up()
+    await hasher.verify("warm-up", stored_hash)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(hasher.verify("correct horse", stored_hash) for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    hasher.shutdown()
+    assert all(valid for valid, _ in results)
+    return logins / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    cost = config.BCRYPT_ROUNDS if config.PASSWORD_SCHEME == "bcrypt" else (
+        f"t={config.ARGON2_TIME_COST},m={config.ARGON2_MEMORY_KIB}KiB"
+    )
+    stored_hash = hash_password_sync("correct horse")
+    print(f"scheme={config.PASSWORD_SCHEME} cost={cost} logins={args.logins}")
+    print(f"{'workers':>7} {'logins/s':>10} {'per core':>10}")
+    for workers in range(1, args.max_workers + 1):
+        rate = asyncio.run(_run(workers, args.logins, stored_hash))
+        print(f"{workers:>7} {rate:>10.1f} {rate / workers:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Cost of idle push connections and of fanning events out to them.
+
+Opens N in-process subscriptions on the event bus, each parked in
+``next_batch`` like an idle SSE/WebSocket handler, then reports memory
+per connection and the time to publish and deliver an event addressed to
+one case's participants versus one every registrar sees. A final round
+floods a single slow client to show its backlog staying bounded.
+
+    python -m benchmarks.bench_push --connections 20000 --registrars 50
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from app.core.event_bus import EventBus
+from app.core.identity import Principal
+
+
+async def _idle(subscription, stop: asyncio.Event, received: list):
+    while not stop.is_set():
+        batch = await subscription.next_batch(3600)
+        if batch:
+            received.append(time.perf_counter())
+
+
+async def _run(connections: int, registrars: int, events: int):
+    bus = EventBus(queue_size=100, history=1000)
+    stop = asyncio.Event()
+    received = []
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    subscriptions, tasks = [], []
+    for user_id in range(1, connections + 1):
+        role = "REGISTRAR" if user_id <= registrars else "CIVILIAN"
+        subscription = bus.subscribe(Principal(id=user_id, email=f"u{user_id}@court.com", role=role))
+        subscriptions.append(subscription)
+        tasks.append(asyncio.create_task(_idle(subscription, stop, received)))
+    await asyncio.sleep(0.1)  # let every handler park
+    per_connection = (tracemalloc.get_traced_memory()[0] - before) / connections
+    tracemalloc.stop()
+    print(f"{connections} idle connections: {per_connection / 1024:.2f} KiB each (bus + handler task)")
+
+    for label, user_ids, roles in (
+        ("case participants (2 users)", lambda i: (registrars + 1 + i % 1000, registrars + 2 + i % 1000), ()),
+        ("case participants + registrars", lambda i: (registrars + 1 + i % 1000,), ("REGISTRAR",)),
+    ):
+        received.clear()
+        start = time.perf_counter()
+        for i in range(events):
+            bus.publish("case.updated", i, {"status": "Under Review"}, user_ids(i), roles)
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.05)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<32} {events / elapsed:9.0f} events/s, {len(received)} handler wakeups")
+
+    # A client that never reads: backlog is capped, the rest become one resync
+    slow = subscriptions[0]
+    tasks[0].cancel()
+    for i in range(5000):
+        bus.publish("case.updated", i, {}, (), ("REGISTRAR",))
+    await asyncio.sleep(0)
+    print(f"slow client after 5000 events: backlog={len(slow.pending)} dropped={slow.dropped}")
+
+    stop.set()
+    for subscription in subscriptions:
+        subscription.wakeup.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=20000)
+    parser.add_argument("--registrars", type=int, default=50)
+    parser.add_argument("--events", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(_run(args.connections, args.registrars, args.events))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Requests per second of the production launcher for 1..N workers.
+
+For each worker count, starts ``serve.py`` on a scratch database (created
+and seeded by the master, as in production), then C client processes send
+keep-alive GETs for a fixed time to ``/`` (framework overhead) and to
+``/cases/`` (a sync route with a database read), with rate limiting off.
+Reports requests/s and p50/p99 latency per endpoint and worker count. The
+clients share the machine with the server, so absolute numbers understate
+a real deployment; compare the rows with each other, and expect extra
+workers to help only up to the number of free cores.
+
+    python -m benchmarks.bench_server --workers 1,2,4 --clients 8 --seconds 10
+"""
+import argparse
+import http.client
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENDPOINTS = ("/", "/cases/")
+
+
+def _client(port: int, path: str, seconds: float, results):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    latencies, errors = [], 0
+    stop = time.perf_counter() + seconds
+    while time.perf_counter() < stop:
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.close()
+    results.put((latencies, errors))
+
+
+def _load(port: int, path: str, clients: int, seconds: float) -> str:
+    results = multiprocessing.Queue()
+    procs = [
+        multiprocessing.Process(target=_client, args=(port, path, seconds, results)) for _ in range(clients)
+    ]
+    for p in procs:
+        p.start()
+    latencies, errors = [], 0
+    for _ in procs:
+        local, failed = results.get()
+        latencies.extend(local)
+        errors += failed
+    for p in procs:
+        p.join()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] if latencies else 0
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0
+    return (
+        f"{path:<8} {len(latencies) / seconds:8.0f} req/s  "
+        f"p50 {p50 * 1000:7.1f} ms  p99 {p99 * 1000:7.1f} ms  errors {errors}"
+    )
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(port: int, server: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("serve.py exited during startup")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("serve.py did not start in time")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default=",".join(str(n) for n in (1, 2, 4)), help="comma-separated counts")
+    parser.add_argument("--threads", type=int, default=40)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.clients} client processes, {args.seconds:.0f}s per run")
+    scratch = tempfile.mkdtemp()
+    try:
+        for workers in [int(n) for n in args.workers.split(",")]:
+            port = _free_port()
+            server = subprocess.Popen(
+                [sys.executable, os.path.join(BACKEND, "serve.py"), "--host", "127.0.0.1", "--port", str(port),
+                 "--workers", str(workers), "--threads", str(args.threads), "--log-level", "warning"],
+                cwd=scratch,
+                # every client comes from 127.0.0.1; the per-IP limit would cap the run
+                env={**os.environ, "PYTHONPATH": BACKEND, "JIRAMS_RATE_LIMIT_ENABLED": "0"},
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                _wait_ready(port, server)
+                time.sleep(2)  # let every worker finish its lifespan startup
+                print(f"--- {workers} worker(s)")
+                for path in ENDPOINTS:
+                    print(_load(port, path, args.clients, args.seconds))
+            finally:
+                server.send_signal(signal.SIGTERM)
+                server.wait(60)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
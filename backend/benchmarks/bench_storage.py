@@ -0,0 +1,211 @@
+"""
+Storage drivers against their contract: S3 (on moto) and local.
+
+S3Storage runs against moto's in-process S3, so no bucket or credentials
+are needed. Checks that
+
+* objects of at least ``part_size`` go up as a multipart upload (one part per
+  ``part_size``) and smaller ones as a single PUT, with the size and
+  SHA-256 of what was sent;
+* an upload that fails halfway aborts its multipart upload and leaves no
+  object behind;
+* ranged reads send a ``Range`` header and return exactly ``[start, end)``,
+  across part boundaries too;
+* ``exists``/``size``/``iter_keys``/``delete`` see keys without the prefix.
+
+LocalStorage runs in a scratch directory. Checks that keys are sharded
+into hashed subdirectories, and that legacy relative paths (Windows
+separators included) are still found, read and deleted under
+``legacy_root``. Unsafe keys are rejected.
+
+The S3 part is skipped when moto or boto3 is not installed; the local
+part always runs. Exits non-zero if any check fails.
+
+    python -m benchmarks.bench_storage
+"""
+import hashlib
+import os
+import tempfile
+
+from app.core.storage import LocalStorage, S3Storage
+
+MiB = 1024 * 1024
+PART_SIZE = 5 * MiB  # smallest part S3 accepts (except the last one)
+
+failures = []
+
+
+def check(label: str, ok: bool, detail: str = ""):
+    print(f"{'ok' if ok else 'FAIL':<5} {label}{f'  ({detail})' if detail and not ok else ''}")
+    if not ok:
+        failures.append(label)
+
+
+def _payload(size: int) -> bytes:
+    block = hashlib.sha256(str(size).encode()).digest() * 2048  # 64 KiB
+    return (block * (size // len(block) + 1))[:size]
+
+
+def _chunks(data: bytes, size: int = MiB):
+    for offset in range(0, len(data), size):
+        yield data[offset:offset + size]
+
+
+def _read(storage, key: str, start: int = 0, end=None) -> bytes:
+    return b"".join(storage.read(key, start, end))
+
+
+# ===============================================================
+# ☁️ S3 (moto)
+# ===============================================================
+def _mock_s3():
+    try:
+        import boto3  # noqa: F401
+        import moto
+    except ImportError:
+        return None
+    # moto 5 replaced the per-service decorators with mock_aws
+    return moto.mock_aws() if hasattr(moto, "mock_aws") else moto.mock_s3()
+
+
+def check_s3():
+    mock = _mock_s3()
+    if mock is None:
+        print("skip  S3Storage: needs moto and boto3 (pip install moto boto3)")
+        return
+
+    import boto3
+
+    with mock:
+        client = boto3.client(
+            "s3", region_name="us-east-1", aws_access_key_id="bench", aws_secret_access_key="bench"
+        )
+        client.create_bucket(Bucket="jirams-bench")
+        storage = S3Storage("jirams-bench", prefix="/tenant/", part_size=PART_SIZE, client=client)
+
+        calls = []
+        for operation in ("PutObject", "CreateMultipartUpload", "UploadPart", "CompleteMultipartUpload",
+                          "AbortMultipartUpload", "GetObject"):
+            client.meta.events.register(
+                f"before-parameter-build.s3.{operation}",
+                lambda params, model, **_: calls.append((model.name, params.get("Range"))),
+            )
+
+        def called(name):
+            return [call for call in calls if call[0] == name]
+
+        # Multipart upload
+        big = _payload(12 * MiB + 123)
+        stored = storage.save("evidence/big.bin", _chunks(big))
+        check("multipart: 3 parts for 12 MiB at 5 MiB parts", len(called("UploadPart")) == 3,
+              f"{len(called('UploadPart'))} parts")
+        check("multipart: completed, no single PUT",
+              len(called("CompleteMultipartUpload")) == 1 and not called("PutObject"))
+        check("multipart: size and sha256 of the bytes sent",
+              stored.size == len(big) and stored.sha256 == hashlib.sha256(big).hexdigest())
+        check("multipart: object stored under the prefix",
+              client.head_object(Bucket="jirams-bench", Key="tenant/evidence/big.bin")["ContentLength"] == len(big))
+        check("multipart: whole read matches", _read(storage, "evidence/big.bin") == big)
+
+        # Small object
+        calls.clear()
+        small = b"small exhibit"
+        stored = storage.save("evidence/small.txt", iter([small]))
+        check("small object: one PUT, no multipart upload",
+              len(called("PutObject")) == 1 and not called("CreateMultipartUpload"))
+        check("small object: size and sha256", stored == ("evidence/small.txt", len(small),
+                                                          hashlib.sha256(small).hexdigest()))
+
+        # Failed upload
+        calls.clear()
+
+        def broken():
+            yield from _chunks(_payload(6 * MiB))
+            raise IOError("client went away")
+
+        try:
+            storage.save("evidence/broken.bin", broken())
+            check("failed upload: error raised", False, "save() returned")
+        except IOError:
+            check("failed upload: error raised", True)
+        check("failed upload: multipart upload aborted", len(called("AbortMultipartUpload")) == 1)
+        check("failed upload: no upload left open",
+              not client.list_multipart_uploads(Bucket="jirams-bench").get("Uploads"))
+        check("failed upload: no object", not storage.exists("evidence/broken.bin"))
+
+        # Ranged GETs
+        for start, end, header in (
+            (0, 10, "bytes=0-9"),
+            (PART_SIZE - 5, PART_SIZE + 5, f"bytes={PART_SIZE - 5}-{PART_SIZE + 4}"),  # across a part boundary
+            (len(big) - 100, None, f"bytes={len(big) - 100}-"),
+        ):
+            calls.clear()
+            data = _read(storage, "evidence/big.bin", start, end)
+            check(f"ranged GET [{start}, {end}): bytes match", data == big[start:end],
+                  f"{len(data)} bytes")
+            check(f"ranged GET [{start}, {end}): sends {header}", called("GetObject") == [("GetObject", header)],
+                  str(called("GetObject")))
+        calls.clear()
+        check("ranged GET: empty range makes no request",
+              _read(storage, "evidence/big.bin", 10, 10) == b"" and not called("GetObject"))
+
+        # Metadata and listing
+        check("exists / missing", storage.exists("evidence/small.txt") and not storage.exists("evidence/nope"))
+        check("size", storage.size("evidence/big.bin") == len(big))
+        check("modified_at", storage.modified_at("evidence/small.txt") > 0)
+        keys = sorted(storage.iter_keys("evidence/"))
+        check("iter_keys strips the prefix", keys == ["evidence/big.bin", "evidence/small.txt"], str(keys))
+        storage.delete("evidence/small.txt")
+        storage.delete("evidence/small.txt")  # already gone: not an error
+        check("delete", not storage.exists("evidence/small.txt"))
+
+
+# ===============================================================
+# 💽 Local (sharded + legacy)
+# ===============================================================
+def check_local():
+    with tempfile.TemporaryDirectory() as scratch:
+        legacy_root = os.path.join(scratch, "app")
+        storage = LocalStorage(os.path.join(scratch, "storage"), legacy_root=legacy_root, chunk_size=4096)
+
+        data = _payload(100_000)
+        stored = storage.save("evidence/abc_report.pdf", _chunks(data, 8192))
+        digest = hashlib.sha1(b"evidence/abc_report.pdf").hexdigest()
+        sharded = os.path.join(storage.root, "evidence", digest[:2], digest[2:4], "abc_report.pdf")
+        check("sharded: stored under evidence/<h>/<h>/", os.path.isfile(sharded))
+        check("sharded: size and sha256",
+              stored.size == len(data) and stored.sha256 == hashlib.sha256(data).hexdigest())
+        check("sharded: ranged read", _read(storage, "evidence/abc_report.pdf", 5000, 9000) == data[5000:9000])
+        check("sharded: no temporary files left",
+              not [n for n in os.listdir(os.path.dirname(sharded)) if n.endswith(".part")])
+
+        os.makedirs(os.path.join(legacy_root, "uploaded_evidence"))
+        legacy = os.path.join(legacy_root, "uploaded_evidence", "old.png")
+        with open(legacy, "wb") as f:
+            f.write(b"legacy bytes")
+        for key in ("uploaded_evidence/old.png", "uploaded_evidence\\old.png"):
+            check(f"legacy: {key!r} found", storage.exists(key) and storage.size(key) == 12)
+            check(f"legacy: {key!r} ranged read", _read(storage, key, 7) == b"bytes")
+        check("legacy: not listed as a sharded key", sorted(storage.iter_keys()) == ["evidence/abc_report.pdf"],
+              str(sorted(storage.iter_keys())))
+        storage.delete("uploaded_evidence\\old.png")
+        check("legacy: delete removes the old file", not os.path.exists(legacy))
+        check("missing key", not storage.exists("evidence/missing.pdf"))
+
+        for key in ("../outside.txt", "evidence/../../outside.txt", os.path.abspath("outside.txt")):
+            try:
+                storage.save(key, iter([b"x"]))
+                check(f"unsafe key {key!r} rejected", False, "saved")
+            except ValueError:
+                check(f"unsafe key {key!r} rejected", True)
+
+
+def main():
+    check_s3()
+    check_local()
+    if failures:
+        raise SystemExit(f"{len(failures)} storage check(s) failed")
+
+
+if __name__ == "__main__":
+    main()
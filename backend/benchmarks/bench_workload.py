@@ -0,0 +1,115 @@
+"""
+Workload balancer: suggestion latency, bulk assignment and counter drift.
+
+Seeds a scratch database with ``--judges`` judges, ``--cases`` open cases
+(half of them already assigned), pending evidence and upcoming hearings,
+then times ``least_loaded`` lookups and a bulk plan over every unassigned
+case. Applies ``--changes`` random reassignments, closures, evidence
+reviews and hearing moves through ordinary commits and checks the
+incrementally kept counters against a fresh load; exits non-zero if they
+differ.
+
+    python -m benchmarks.bench_workload --cases 20000 --judges 200
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=20000)
+    parser.add_argument("--judges", type=int, default=200)
+    parser.add_argument("--changes", type=int, default=2000)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())  # app.db is relative to the working directory
+    from app.core import config
+
+    config.INIT_ON_IMPORT = False
+    from app.database import SessionLocal
+    from app.main import prepare_database
+    from app.models import Case, Evidence, Hearing, User
+    from app.services.workload import WorkloadIndex, workload
+
+    prepare_database()
+    rng = random.Random(7)
+    db = SessionLocal()
+    db.bulk_insert_mappings(User, [
+        dict(username=f"wj{n}", email=f"wj{n}@court.com", password_hash="-", role="JUDGE", is_active=1)
+        for n in range(args.judges)
+    ])
+    db.commit()
+    judges = [judge_id for (judge_id,) in db.query(User.id).filter(User.role == "JUDGE")]
+    db.bulk_insert_mappings(Case, [
+        dict(title=f"Load {n}", status="Filed", created_by_id=1,
+             assigned_to_id=rng.choice(judges) if n % 2 else None)
+        for n in range(args.cases)
+    ])
+    db.commit()
+    case_ids = [case_id for (case_id,) in db.query(Case.id)]
+    db.bulk_insert_mappings(Evidence, [
+        dict(case_id=rng.choice(case_ids), uploader_id=1, filename=f"e{n}.pdf", status="PENDING")
+        for n in range(args.cases // 2)
+    ])
+    soon = datetime.utcnow() + timedelta(days=1)
+    db.bulk_insert_mappings(Hearing, [
+        dict(case_id=rng.choice(case_ids), registrar_id=4, judge_id=rng.choice(judges), location="Room 1",
+             scheduled_date=soon + timedelta(hours=n), status="SCHEDULED")
+        for n in range(args.cases // 4)
+    ])
+    db.commit()
+
+    began = time.perf_counter()
+    workload.load()
+    print(f"load      {(time.perf_counter() - began) * 1000:8.1f} ms  {workload.stats()}")
+
+    rounds = 10000
+    began = time.perf_counter()
+    for _ in range(rounds):
+        workload.least_loaded("JUDGE", 3)
+    print(f"suggest   {(time.perf_counter() - began) / rounds * 1e6:8.1f} us per lookup of 3")
+
+    unassigned = [case_id for (case_id,) in db.query(Case.id).filter(Case.assigned_to_id.is_(None))]
+    exhibits = workload.pending_evidence(unassigned)
+    began = time.perf_counter()
+    plan = workload.plan("JUDGE", [(case_id, exhibits[case_id]) for case_id in unassigned])
+    planned = time.perf_counter() - began
+    scores = sorted(s.load["score"] for s in {s.user_id: s for s in plan.values()}.values())
+    print(f"bulk plan {planned * 1000:8.1f} ms  {len(plan)} cases  score spread {scores[0]}..{scores[-1]}")
+
+    hearing_ids = [hearing_id for (hearing_id,) in db.query(Hearing.id)]
+    evidence_ids = [evidence_id for (evidence_id,) in db.query(Evidence.id)]
+    for n in range(args.changes):
+        kind = n % 4
+        if kind == 0:
+            db.get(Case, rng.choice(case_ids)).assigned_to_id = rng.choice(judges)
+        elif kind == 1:
+            db.get(Case, rng.choice(case_ids)).status = rng.choice(["Closed", "Filed", "Reviewed"])
+        elif kind == 2:
+            db.get(Evidence, rng.choice(evidence_ids)).status = rng.choice(["APPROVED", "PENDING", "UNDER_REVIEW"])
+        else:
+            hearing = db.get(Hearing, rng.choice(hearing_ids))
+            hearing.judge_id = rng.choice(judges)
+            hearing.status = rng.choice(["SCHEDULED", "CANCELLED"])
+        if n % 50 == 49:
+            db.commit()
+    db.commit()
+    db.close()
+
+    fresh = WorkloadIndex()
+    fresh.load()
+    drift = [
+        user_id for user_id in judges
+        if workload.load_of(user_id) != fresh.load_of(user_id)
+    ]
+    print(f"{args.changes} changes applied incrementally, users whose counters drifted: {len(drift)}")
+    if drift:
+        raise SystemExit("incremental workload counters differ from a fresh load")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+SQL statements and commits per write request.
+
+Runs each write route once against a scratch database through the ASGI
+test client (no lifespan, so writes run inline and no background worker
+adds queries), counting every statement sent to SQLite and every commit.
+Exits non-zero when a route goes over its budget in ``BUDGET`` or the ten
+routes together issue more than half the statements of the original routes
+(``BASELINE``), so a change that brings back a refresh, a lazy load per row
+or a separate change_seq allocation shows up here.
+
+Transaction control (the writer's BEGIN IMMEDIATE, savepoints) is listed
+but not counted against the budgets, because the original routes' BEGIN was
+not counted either: pysqlite issued it implicitly, without going through the
+cursor. Each write is now its row (with its change_seq computed inline),
+its outbox event, and the SELECT of the row it updates.
+
+    python -m benchmarks.bench_write_queries
+"""
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+# Most statements and commits each route may issue. Every write costs its
+# row and (for domain events) an outbox row; an update first loads the row
+# it changes. Foreign keys reject a missing case, so inserts do not look it
+# up unless the response needs it. Anything above that is overhead.
+BUDGET = {
+    "POST /auth/register": (2, 1),  # taken username/email check before hashing
+    "POST /cases/": (2, 1),
+    "PUT /cases/{id}/civilian": (3, 1),
+    "PUT /cases/{id}": (4, 1),  # reassigning loads the new assignee
+    "PUT /cases/admin/{id}": (3, 1),
+    "POST /cases/admin/feedback": (2, 1),
+    "POST /hearings/": (6, 1),  # case title, judge + room conflict checks, the judge it names
+    "PUT /hearings/{id}": (3, 1),  # any edit is an outbox event; a move adds the conflict checks
+    "POST /payments/": (3, 1),  # the response names the case
+    "PUT /payments/{id}": (2, 1),
+}
+
+# Statements the same ten routes issued before they were reworked, and the
+# most they may issue together now
+BASELINE = 63
+TOTAL_BUDGET = BASELINE // 2
+
+_TRANSACTION_CONTROL = ("BEGIN", "SAVEPOINT", "RELEASE", "ROLLBACK", "COMMIT")
+
+
+class Counter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.statements = []
+        self.control = 0
+        self.commits = 0
+
+    def reset(self):
+        with self.lock:
+            self.statements = []
+            self.control = 0
+            self.commits = 0
+
+    def on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        with self.lock:
+            if statement.lstrip().upper().startswith(_TRANSACTION_CONTROL):
+                self.control += 1
+            else:
+                self.statements.append(statement.split("\n")[0][:100])
+
+    def on_commit(self, conn):
+        with self.lock:
+            self.commits += 1
+
+
+def main():
+    verbose = "-v" in sys.argv
+    scratch = tempfile.mkdtemp()
+    os.chdir(scratch)  # app.db is relative to the working directory
+    os.environ["JIRAMS_RATE_LIMIT_ENABLED"] = "0"
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    from app.main import app
+
+    counter = Counter()
+    event.listen(Engine, "before_cursor_execute", counter.on_execute)
+    event.listen(Engine, "commit", counter.on_commit)
+    client = TestClient(app)
+
+    def token(email, password):
+        response = client.post("/auth/token", data={"username": email, "password": password})
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    civilian = token("civil@court.com", "ci1234")
+    registrar = token("regis@court.com", "re1234")
+    client.get("/auth/me", headers=civilian)  # first authenticated request loads the revocation list
+    when = (datetime.utcnow() + timedelta(days=30)).isoformat()
+    results = {}
+
+    def measure(label, method, url, **kwargs):
+        counter.reset()
+        response = client.request(method, url, **kwargs)
+        if response.status_code >= 400:
+            raise SystemExit(f"{label} failed: {response.status_code} {response.text}")
+        results[label] = (list(counter.statements), counter.control, counter.commits)
+        return response.json()
+
+    measure("POST /auth/register", "POST", "/auth/register", json={
+        "username": "bench-user", "email": "bench@court.com", "password": "bench123", "role": "CIVILIAN",
+    })
+    case = measure("POST /cases/", "POST", "/cases/", headers=civilian, json={"title": "Benchmark case"})
+    measure("PUT /cases/{id}/civilian", "PUT", f"/cases/{case['id']}/civilian", headers=civilian,
+            json={"description": "updated"})
+    measure("PUT /cases/{id}", "PUT", f"/cases/{case['id']}", json={"assigned_to_id": 3})
+    measure("PUT /cases/admin/{id}", "PUT", f"/cases/admin/{case['id']}", headers=registrar,
+            json={"status": "REVIEWED"})
+    measure("POST /cases/admin/feedback", "POST", "/cases/admin/feedback", headers=registrar,
+            json={"case_id": case["id"], "note": "looks complete"})
+    hearing = measure("POST /hearings/", "POST", "/hearings/", headers=registrar,
+                      json={"case_id": case["id"], "scheduled_date": when, "location": "Room 1", "judge_id": 3})
+    measure("PUT /hearings/{id}", "PUT", f"/hearings/{hearing['id']}", json={"notes": "bring exhibits"})
+    payment = measure("POST /payments/", "POST", "/payments/", headers=civilian,
+                      json={"case_id": case["id"], "amount": 50, "payment_type": "FILING_FEE"})
+    measure("PUT /payments/{id}", "PUT", f"/payments/{payment['id']}", json={"status": "CONFIRMED"})
+
+    over = []
+    print(f"{'route':<28} {'statements':>10} {'BEGIN etc':>9} {'commits':>8}  budget")
+    for label, (statements, control, commits) in results.items():
+        max_statements, max_commits = BUDGET[label]
+        flag = ""
+        if len(statements) > max_statements or commits > max_commits:
+            flag = "  OVER"
+            over.append(label)
+        print(f"{label:<28} {len(statements):>10} {control:>9} {commits:>8}  {max_statements}/{max_commits}{flag}")
+        if verbose or flag:
+            for statement in statements:
+                print(f"    {statement}")
+    total = sum(len(s) for s, _, _ in results.values())
+    print(f"{'total':<28} {total:>10} {sum(c for _, c, _ in results.values()):>9} "
+          f"{sum(c for _, _, c in results.values()):>8}  {TOTAL_BUDGET}")
+    print(f"{BASELINE} statements before, {1 - total / BASELINE:.0%} fewer (target 50%)")
+    if over:
+        raise SystemExit(f"{len(over)} route(s) over budget")
+    if total > TOTAL_BUDGET:
+        raise SystemExit(f"{total} statements in total, over the budget of {TOTAL_BUDGET}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+After-commit hooks under group commit: when they fire and how often.
+
+Queues 2-unit batches on the writer against a scratch SQLite database and
+records every ``on_commit`` delivery together with what a second
+connection can see at that moment. Checks that
+
+* hooks run once per committed row, only after the batch's real COMMIT
+  (the rows are already visible elsewhere), not as each unit's SAVEPOINT
+  is released;
+* a unit that fails rolls back its own changes and they are never
+  delivered, while the other unit's still are;
+* a batch whose COMMIT fails and is retried unit by unit delivers each
+  change exactly once.
+
+Exits non-zero if any check fails.
+
+    python -m benchmarks.bench_writer_hooks --rounds 20
+"""
+import argparse
+import os
+import tempfile
+from datetime import datetime
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core import db_events
+from app.core.writer import WriteQueue, writer_sessions
+from app.database import Base
+from app.models import Case, CaseNote, User
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        url = f"sqlite:///{os.path.join(scratch, 'hooks.db')}"
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+        db = Session()
+        db.add(User(id=1, username="hooks-user", email="hooks@court.com", password_hash="x", role="CIVILIAN"))
+        db.add(Case(id=1, title="Hooks", created_by_id=1))
+        db.commit()
+        db.close()
+
+        delivered = []  # (note text, visible to another connection)
+
+        @db_events.on_commit(CaseNote)
+        def _observe(changes):
+            with engine.connect() as other:
+                for change in changes:
+                    seen = other.execute(
+                        select(func.count()).select_from(CaseNote).where(CaseNote.id == change.id)
+                    ).scalar()
+                    delivered.append((change.values["note"], bool(seen)))
+
+        def add(text):
+            def unit(db):
+                db.add(CaseNote(case_id=1, author_id=1, note=text, created_at=datetime.utcnow()))
+                db.flush()
+            return unit
+
+        def fail(text):
+            def unit(db):
+                add(text)(db)
+                raise ValueError(text)
+            return unit
+
+        def fail_commit(text):
+            failed = []
+
+            def unit(db):
+                add(text)(db)
+
+                def _boom(session):
+                    # Only the batch's own COMMIT, and only the first time
+                    if not session.in_nested_transaction() and not failed:
+                        failed.append(text)
+                        raise RuntimeError("commit failed")
+
+                event.listen(db, "before_commit", _boom)
+            return unit
+
+        # A long window so both units of each round share one batch
+        writer = WriteQueue(writer_sessions(url), batch_size=2, window=0.5)
+        writer.start()
+        expected = []
+        try:
+            for n in range(args.rounds):
+                kind = n % 3
+                if kind == 0:
+                    units, ok = [add(f"a{n}"), add(f"b{n}")], [f"a{n}", f"b{n}"]
+                elif kind == 1:
+                    units, ok = [add(f"a{n}"), fail(f"x{n}")], [f"a{n}"]
+                else:
+                    units, ok = [add(f"a{n}"), fail_commit(f"b{n}")], [f"a{n}", f"b{n}"]
+                futures = [writer.submit(unit) for unit in units]
+                for future in futures:
+                    try:
+                        future.result()
+                    except ValueError:
+                        pass
+                expected.extend(ok)
+        finally:
+            writer.stop()
+        stats = writer.stats()
+        engine.dispose()
+
+    early = [text for text, seen in delivered if not seen]
+    texts = [text for text, _ in delivered]
+    duplicated = sorted({text for text in texts if texts.count(text) > 1})
+    missing = sorted(set(expected) - set(texts))
+    unexpected = sorted(set(texts) - set(expected))
+    print(f"{args.rounds} batches ({stats['batches']} commits, {stats['failed_commits']} failed and retried), "
+          f"{len(delivered)} changes delivered")
+    print(f"before COMMIT {len(early)}  duplicated {len(duplicated)}  "
+          f"missing {len(missing)}  from rolled-back units {len(unexpected)}")
+    if early or duplicated or missing or unexpected:
+        raise SystemExit("after-commit hooks did not match the committed rows")
+
+
+if __name__ == "__main__":
+    main()
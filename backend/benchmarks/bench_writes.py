@@ -0,0 +1,168 @@
+"""
+Concurrent small writes: one transaction per request versus the writer queue.
+
+T client threads each add case notes to a scratch SQLite database for a
+fixed time. The "direct" path is what routes did before: every write opens
+its own session and commits, competing for the database write lock. The
+"writer" path hands the same unit of work to the group-commit writer.
+Reports sustained writes/s, p50/p99 latency and "database is locked"
+failures for each.
+
+``--processes N`` adds a run shaped like ``serve.py --workers N``: N
+processes, each with its own writer queue and its share of the client
+threads, all writing the same database file.
+
+    python -m benchmarks.bench_writes --threads 32 --seconds 10 --processes 4
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.core import sync  # noqa: F401 - change_seq stamping, as in the app
+from app.core.writer import WriteQueue, writer_sessions
+from app.database import Base
+from app.models import Case, CaseNote, User
+from app.services import domain_events  # noqa: F401 - outbox rows, as in the app
+
+
+def _add_note(db, i: int):
+    note = CaseNote(case_id=1, author_id=1, note=f"benchmark note {i}", created_at=datetime.utcnow())
+    db.add(note)
+    db.flush()
+    return note.id
+
+
+def _load(threads: int, seconds: float, write, first_client: int = 0):
+    latencies, errors = [], []
+    lock = threading.Lock()
+    stop = time.perf_counter() + seconds
+
+    def client(n: int):
+        local, failed, i = [], 0, 0
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            try:
+                write(n * 10_000_000 + i)
+                local.append(time.perf_counter() - start)
+            except OperationalError:
+                failed += 1
+            i += 1
+        with lock:
+            latencies.extend(local)
+            errors.append(failed)
+
+    workers = [threading.Thread(target=client, args=(n,)) for n in range(first_client, first_client + threads)]
+    began = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return latencies, sum(errors), time.perf_counter() - began
+
+
+def _report(label: str, latencies, errors: int, elapsed: float):
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0
+    print(
+        f"{label:<8} {len(latencies) / elapsed:8.0f} writes/s  "
+        f"p50 {statistics.median(latencies) * 1000 if latencies else 0:7.1f} ms  "
+        f"p99 {p99 * 1000:7.1f} ms  locked errors {errors}"
+    )
+
+
+def _writer_process(url: str, index: int, threads: int, seconds: float, batch_size: int, window: float, results):
+    queue = WriteQueue(writer_sessions(url), batch_size=batch_size, window=window)
+    queue.start()
+    try:
+        latencies, errors, elapsed = _load(
+            threads, seconds, lambda i: queue.call(lambda db: _add_note(db, i)), first_client=index * threads
+        )
+    finally:
+        queue.stop()
+    stats = queue.stats()
+    results.put((latencies, errors, elapsed, stats["batches"], stats["writes"]))
+
+
+def _multi_process(url: str, processes: int, args):
+    """One writer queue per process, as with ``serve.py --workers N``."""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    threads = max(1, args.threads // processes)
+    workers = [
+        context.Process(
+            target=_writer_process,
+            args=(url, index, threads, args.seconds, args.batch_size, args.window_ms / 1000, results),
+        )
+        for index in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    latencies, errors, elapsed, batches, writes = [], 0, 0.0, 0, 0
+    for _ in workers:
+        part = results.get()
+        latencies.extend(part[0])
+        errors += part[1]
+        elapsed = max(elapsed, part[2])
+        batches += part[3]
+        writes += part[4]
+    for worker in workers:
+        worker.join()
+    _report(f"{processes}x writer", latencies, errors, elapsed)
+    print(f"writer batches: {batches} across {processes} processes, average {writes / batches if batches else 0:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--window-ms", type=float, default=2)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--processes", type=int, default=1, help="also run N writer processes (serve.py --workers N)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        url = f"sqlite:///{os.path.join(scratch, 'writes.db')}"
+        engine = create_engine(url, connect_args={"check_same_thread": False}, pool_size=args.threads)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+        db = Session()
+        db.add(User(id=1, username="bench-user", email="bench@court.com", password_hash="x", role="CIVILIAN"))
+        db.add(Case(id=1, title="Benchmark", created_by_id=1))
+        db.commit()
+        db.close()
+
+        def direct(i: int):
+            db = Session()
+            try:
+                _add_note(db, i)
+                db.commit()
+            finally:
+                db.close()
+
+        _report("direct", *_load(args.threads, args.seconds, direct))
+
+        queue = WriteQueue(writer_sessions(url), batch_size=args.batch_size, window=args.window_ms / 1000)
+        queue.start()
+        try:
+            _report("writer", *_load(args.threads, args.seconds, lambda i: queue.call(lambda db: _add_note(db, i))))
+        finally:
+            queue.stop()
+        stats = queue.stats()
+        print(f"writer batches: {stats['batches']}, average {stats['average_batch']}, largest {stats['largest_batch']}")
+        engine.dispose()
+
+        if args.processes > 1:
+            _multi_process(url, args.processes, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Backfill the document full-text index.
+
+Queues re-extraction of every stored document and works through the queue
+with a local job runner (a running server's workers help out). Run from
+the backend directory:
+
+    python reindex_documents.py
+"""
+import logging
+import time
+
+from app.core.jobs import runner
+from app.services.document_index import reindex_all
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+if __name__ == "__main__":
+    count = reindex_all()
+    runner.start()
+    try:
+        while True:
+            pending = runner.stats()["jobs"]
+            if not pending["queued"] and not pending["running"]:
+                break
+            time.sleep(1)
+    finally:
+        runner.stop()
+    print(f"✅ Reindexed {count} documents")
@@ -0,0 +1,216 @@
+"""
+Production launcher: one master, N preloaded uvicorn workers.
+
+The master creates and migrates the database and seeds users once, imports
+the app, then forks the workers, so they share the imported code and data
+copy-on-write and never race each other through DDL. Each worker runs its
+own lifespan (writer, job runner, outbox dispatcher) and a threadpool of
+``--threads`` for sync routes; the workers' writers take turns through a
+file lock next to the database. Run from the backend directory:
+
+    python serve.py --workers 4 --port 8000
+
+Signals to the master:
+    TERM / INT  graceful stop: workers finish in-flight requests first
+    HUP         graceful reload: re-exec the master with the new code on the
+                same listening socket, start new workers, then retire the old
+                ones (skipped when the new code fails to import)
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+LISTEN_FD_ENV = "JIRAMS_LISTEN_FD"
+RETIRE_ENV = "JIRAMS_RETIRE_PIDS"
+
+logger = logging.getLogger("jirams.serve")
+
+
+def _parse_args(config):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=config.SERVER_WORKERS)
+    parser.add_argument("--threads", type=int, default=config.SERVER_THREADS, help="sync-route threadpool per worker")
+    parser.add_argument("--graceful-timeout", type=float, default=config.SERVER_GRACEFUL_TIMEOUT)
+    parser.add_argument("--log-level", default="info")
+    return parser.parse_args()
+
+
+def _listen(host: str, port: int) -> socket.socket:
+    """Reuse the socket handed over by a reloading master, or bind a new one."""
+    inherited = os.environ.pop(LISTEN_FD_ENV, None)
+    if inherited:
+        sock = socket.socket(fileno=int(inherited))
+    else:
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        # IPPROTO_TCP explicitly: asyncio only sets TCP_NODELAY on accepted
+        # sockets whose proto says TCP, and Nagle would delay keep-alive replies
+        sock = socket.socket(family, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+# ===============================================================
+# 👷 Worker
+# ===============================================================
+def _run_worker(app, sock: socket.socket, args):
+    import uvicorn
+
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGCHLD):
+        signal.signal(sig, signal.SIG_DFL)  # uvicorn installs its own graceful handlers
+    server = uvicorn.Server(uvicorn.Config(
+        app,
+        lifespan="on",
+        log_level=args.log_level,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    ))
+    server.run(sockets=[sock])
+
+
+# ===============================================================
+# 🧑‍✈️ Master
+# ===============================================================
+class Master:
+    def __init__(self, app, sock: socket.socket, args):
+        self.app = app
+        self.sock = sock
+        self.args = args
+        self.workers = {}  # pid -> started at
+        self.retiring = {}  # pid -> kill deadline
+        self.stopping = False
+        self.reloading = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(self.app, self.sock, self.args)
+            except BaseException:
+                logger.exception("Worker %s crashed", os.getpid())
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+        logger.info("Started worker %s", pid)
+
+    def retire(self, pids):
+        deadline = time.monotonic() + self.args.graceful_timeout
+        for pid in pids:
+            self.workers.pop(pid, None)
+            self.retiring[pid] = deadline
+            _signal(pid, signal.SIGTERM)
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+
+        for _ in range(self.args.workers):
+            self.spawn()
+        # Workers of the master image this one replaced (graceful reload)
+        old = [int(pid) for pid in os.environ.pop(RETIRE_ENV, "").split(",") if pid]
+        if old:
+            logger.info("Retiring %s workers of the previous master", len(old))
+            self.retire(old)
+
+        while self.workers or self.retiring:
+            self._reap()
+            if self.stopping:
+                if self.workers:
+                    self.retire(list(self.workers))
+            elif self.reloading:
+                self.reloading = False
+                self._reexec()
+            else:
+                while len(self.workers) < self.args.workers:
+                    self.spawn()
+            for pid, deadline in list(self.retiring.items()):
+                if time.monotonic() > deadline:
+                    logger.warning("Worker %s did not stop in time; killing it", pid)
+                    _signal(pid, signal.SIGKILL)
+                    self.retiring[pid] = float("inf")
+            time.sleep(0.2)
+        logger.info("All workers stopped")
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if self.retiring.pop(pid, None) is not None:
+                continue
+            started = self.workers.pop(pid, None)
+            if started is not None and not self.stopping:
+                logger.warning("Worker %s exited unexpectedly (status %s)", pid, status)
+                if time.monotonic() - started < 1:
+                    time.sleep(1)  # don't spin on a worker that dies during startup
+
+    def _on_stop(self, signum, frame):
+        logger.info("Received %s; stopping gracefully", signal.Signals(signum).name)
+        self.stopping = True
+
+    def _on_reload(self, signum, frame):
+        self.reloading = True
+
+    def _reexec(self):
+        check = subprocess.run(
+            [sys.executable, "-c", "import app.main"],
+            env={**os.environ, "JIRAMS_INIT_ON_IMPORT": "0"},
+            capture_output=True,
+            text=True,
+        )
+        if check.returncode != 0:
+            logger.error("Reload aborted, the new code does not import:\n%s", check.stderr[-2000:])
+            return
+        logger.info("Reloading: re-executing the master on the same socket")
+        os.environ[LISTEN_FD_ENV] = str(self.sock.fileno())
+        os.environ[RETIRE_ENV] = ",".join(str(pid) for pid in self.workers)
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+
+
+def _signal(pid: int, sig):
+    try:
+        os.kill(pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+def main():
+    from app.core import config
+
+    args = _parse_args(config)
+    # Must be set before app.database sizes its connection pool
+    config.SERVER_THREADS = args.threads
+    config.INIT_ON_IMPORT = False
+
+    # Preload: everything below is shared copy-on-write with the workers
+    from app.database import engine
+    from app.main import app, prepare_database
+
+    prepare_database()
+    engine.dispose()  # workers open their own connections
+    sock = _listen(args.host, args.port)
+    gc.freeze()  # keep preloaded objects out of GC passes so their pages stay shared
+    logger.info(
+        "JIRAMS master %s serving on %s:%s with %s workers x %s threads",
+        os.getpid(), args.host, args.port, args.workers, args.threads,
+    )
+    Master(app, sock, args).run()
+
+
+if __name__ == "__main__":
+    main()
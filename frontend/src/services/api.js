@@ -39,6 +39,11 @@ export const CaseAPI = {
   details: (id, token) => request(`/cases/${id}`, "GET", null, token),
   update: (id, data, token) => request(`/cases/${id}`, "PUT", data, token),
   delete: (id, token) => request(`/cases/${id}`, "DELETE", null, token),
+  // role: "JUDGE" | "PROSECUTOR" -> { suggestions: [{ user_id, email, load }] }
+  suggestAssignee: (id, role, token) =>
+    request(`/cases/${id}/suggest-assignee?role=${role}`, "GET", null, token),
+  // data: { role, case_ids?, limit?, dry_run? }
+  autoAssign: (data, token) => request("/cases/admin/auto-assign", "POST", data, token),
 };
 
 // =====================================================
@@ -83,8 +88,24 @@ export const EvidenceAPI = {
 export const HearingAPI = {
   create: (data, token) => request("/hearings/", "POST", data, token),
   list: (token) => request("/hearings/", "GET", null, token),
+  // params: { from, to, judge_id, room }
+  range: (params, token) => request(`/hearings/?${new URLSearchParams(params)}`, "GET", null, token),
   update: (id, data, token) => request(`/hearings/${id}`, "PUT", data, token),
   delete: (id, token) => request(`/hearings/${id}`, "DELETE", null, token),
+  // params: { judge_id, room, duration, after, limit } -> { slots: [{ scheduled_date, ends_at }] }
+  availability: (params, token) =>
+    request(`/hearings/availability?${new URLSearchParams(params)}`, "GET", null, token),
+};
+
+// =====================================================
+// 📋 DOCKETS (daily cause lists)
+// =====================================================
+export const DocketAPI = {
+  // day: "YYYY-MM-DD" -> { date, rooms: [{ room, hearings: [...] }] }
+  day: (day, token, room) =>
+    request(`/dockets/${day}${room ? `?room=${encodeURIComponent(room)}` : ""}`, "GET", null, token),
+  htmlUrl: (day, room) => `${API_BASE_URL}/dockets/${day}/${encodeURIComponent(room)}.html`,
+  pdfUrl: (day, room) => `${API_BASE_URL}/dockets/${day}/${encodeURIComponent(room)}.pdf`,
 };
 
 // =====================================================
@@ -113,10 +134,11 @@ export const UserAPI = {
 export const API_ROUTES = {
   AUTH: ["/auth/register", "/auth/login", "/auth/me"],
   USERS: ["/users/", "/users/{id}", "/users/role/{role}"],
-  CASES: ["/cases/", "/cases/{id}", "/cases/file"],
+  CASES: ["/cases/", "/cases/{id}", "/cases/file", "/cases/{id}/suggest-assignee", "/cases/admin/auto-assign"],
   DOCUMENTS: ["/documents/upload", "/documents/{case_id}", "/documents/{doc_id}"],
   EVIDENCE: ["/evidence/upload", "/evidence/{case_id}", "/evidence/{id}"],
-  HEARINGS: ["/hearings/", "/hearings/{case_id}", "/hearings/{hearing_id}"],
+  HEARINGS: ["/hearings/", "/hearings/{case_id}", "/hearings/{hearing_id}", "/hearings/availability"],
+  DOCKETS: ["/dockets/{date}", "/dockets/{date}/{room}.html", "/dockets/{date}/{room}.pdf"],
   PAYMENTS: ["/payments/", "/payments/{case_id}", "/payments/{payment_id}"],
 };
 